@@ -1,91 +1,145 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QListWidgetItem, QWidget, QCheckBox, QLabel, QMenu, QAction, QInputDialog, QFileDialog
-from PyQt5.QtGui import QIcon, QPixmap, QImage, QKeySequence
-from PyQt5.QtCore import Qt, pyqtSignal, QPoint
-from PIL import Image
-import win32gui
-import win32ui
-import win32con
+from PyQt5.QtWidgets import QCheckBox, QComboBox, QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QListView, QLineEdit
+from PyQt5.QtCore import Qt, pyqtSignal, QSize
 import os  # Import the os module
+from IconCache import IconCache
+from ScanResultsModel import ScanResultsModel, ScanResultsProxy
+from MetadataThread import MetadataThread
+from GameCatalog import normalize_path
 
 class AddGamesWindow(QDialog):
     games_added = pyqtSignal(list)  # Signal to emit when games are added
+    games_tagged = pyqtSignal(list, str)  # Checked games and the collection they should be put in
+    duplicates_merged = pyqtSignal(list)  # (kept path, [dropped library paths]) for groups with a game already in the library
 
-    def __init__(self, parent, games):
+    def __init__(self, parent, games=(), collections=(), library_games=None):
         super().__init__(parent)
+        library_games = library_games or {}  # Path -> name of the games already in the library
+        self.library_paths = list(library_games)  # Compared against the scan results when looking for duplicates
+        self.library_names = {normalize_path(path): name for path, name in library_games.items()}
         self.setWindowTitle("Add Games")
         self.setGeometry(100, 100, 600, 400)
-        self.games = sorted(games, key=lambda game: os.path.basename(game).lower())  # Sort games alphabetically
+
+        # Check state lives in the model, rows are painted by the view without per-row widgets
+        self.icon_cache = IconCache.instance()
+        self.model = ScanResultsModel(self.icon_cache, QSize(32, 32), self)
+        self.proxy_model = ScanResultsProxy(self)  # Games alphabetically, helper exes after them
+        self.proxy_model.setSourceModel(self.model)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy_model.setDynamicSortFilter(True)
+        self.proxy_model.sort(0, Qt.AscendingOrder)
 
         self.layout = QVBoxLayout()
-        self.list_widget = QListWidget()
-        self.layout.addWidget(self.list_widget)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name or path")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.proxy_model.setFilterFixedString)
+        self.layout.addWidget(self.filter_edit)
+
+        # Names and helper ranks improve as version info is read from the exes in the background
+        self.metadata_thread = MetadataThread(self)
+        self.metadata_thread.metadata_ready.connect(self.model.set_metadata)
+        self.metadata_thread.start()
+        self.finished.connect(self.metadata_thread.stop)
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.proxy_model)
+        self.list_view.setIconSize(QSize(32, 32))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QListView.ExtendedSelection)
+        self.layout.addWidget(self.list_view)
 
         self.button_layout = QHBoxLayout()
+        self.check_shown_button = QPushButton("Check Shown")
+        self.uncheck_shown_button = QPushButton("Uncheck Shown")
+        self.duplicates_button = QPushButton("Find Duplicates")
         self.add_button = QPushButton("Add Selected Games")
         self.cancel_button = QPushButton("Cancel")
+        self.button_layout.addWidget(self.check_shown_button)
+        self.button_layout.addWidget(self.uncheck_shown_button)
+        self.button_layout.addWidget(self.duplicates_button)
+        self.show_hidden_check = QCheckBox("Show Helpers")
+        self.show_hidden_check.setToolTip("Also list crash handlers, uninstallers and redistributables")
+        self.show_hidden_check.toggled.connect(self.proxy_model.set_show_hidden)
+        self.button_layout.addWidget(self.show_hidden_check)
+        self.button_layout.addStretch()
+        # Checked games, new or already in the library, are all put in this collection
+        self.collection_combo = QComboBox()
+        self.collection_combo.setEditable(True)
+        self.collection_combo.addItems([""] + list(collections))
+        self.collection_combo.lineEdit().setPlaceholderText("Add to collection")
+        self.button_layout.addWidget(self.collection_combo)
         self.button_layout.addWidget(self.add_button)
         self.button_layout.addWidget(self.cancel_button)
         self.layout.addLayout(self.button_layout)
 
         self.setLayout(self.layout)
-        self.populate_list(self.games)
+        self.populate_list(games)
 
+        self.check_shown_button.clicked.connect(lambda: self.set_shown_checked(True))
+        self.uncheck_shown_button.clicked.connect(lambda: self.set_shown_checked(False))
+        self.duplicates_button.clicked.connect(self.find_duplicates)
         self.add_button.clicked.connect(self.add_selected_games)
         self.cancel_button.clicked.connect(self.reject)
-        self.list_widget.setContextMenuPolicy(Qt.CustomContextMenu)
-        # Removed the connection to show_context_menu
-        # self.list_widget.customContextMenuRequested.connect(self.show_context_menu)
 
     def populate_list(self, games):
-        self.list_widget.clear()
-        for game in games:
-            icon = self.extract_icon(game)
-            item_widget = self.create_item_widget(icon, os.path.basename(game), game)
-            item = QListWidgetItem(self.list_widget)
-            item.setSizeHint(item_widget.sizeHint())
-            self.list_widget.setItemWidget(item, item_widget)
-
-    def create_item_widget(self, icon, game_name, game_path):
-        widget = QWidget()
-        layout = QHBoxLayout()
-        checkbox = QCheckBox()
-        icon_label = QLabel()
-        icon_label.setPixmap(icon)
-        name_label = QLabel(game_name)
-        layout.addWidget(checkbox)
-        layout.addWidget(icon_label)
-        layout.addWidget(name_label)
-        layout.addStretch()
-        widget.setLayout(layout)
-        widget.checkbox = checkbox
-        widget.game_path = game_path
-        return widget
-
-    def extract_icon(self, path):
-        large, small = win32gui.ExtractIconEx(path, 0)
-        if not small:
-            return QPixmap(32, 32)  # Return a blank pixmap as a default icon
-        win32gui.DestroyIcon(small[0])
-        hdc = win32ui.CreateDCFromHandle(win32gui.GetDC(0))
-        hbmp = win32ui.CreateBitmap()
-        hbmp.CreateCompatibleBitmap(hdc, 32, 32)
-        hdc = hdc.CreateCompatibleDC()
-        hdc.SelectObject(hbmp)
-        hdc.DrawIcon((0, 0), large[0])
-        win32gui.DestroyIcon(large[0])
-        bmpinfo = hbmp.GetInfo()
-        bmpstr = hbmp.GetBitmapBits(True)
-        img = Image.frombuffer('RGBA', (bmpinfo['bmWidth'], bmpinfo['bmHeight']), bmpstr, 'raw', 'BGRA', 0, 1)
-        qimage = QImage(img.tobytes(), img.width, img.height, QImage.Format_RGBA8888)
-        return QPixmap.fromImage(qimage)
+        self.model.clear()
+        self.append_games(games)
+
+    def append_games(self, games):
+        # Scan results stream in while the dialog is open, the proxy keeps them alphabetical
+        self.model.append_games(games)
+        self.metadata_thread.enqueue(games)
+
+    def set_scanning(self, scanning):
+        self.setWindowTitle("Add Games (scanning...)" if scanning else "Add Games")
+
+    def shown_games(self):
+        return [self.proxy_model.index(row, 0).data(ScanResultsModel.PathRole) for row in range(self.proxy_model.rowCount())]
+
+    def set_shown_checked(self, checked):
+        self.model.set_checked(self.shown_games(), checked)
+
+    def find_duplicates(self):
+        from DuplicatesDialog import DuplicateThread, DuplicatesDialog
+        labels = {normalize_path(path): "In library" for path in self.library_paths}
+        names = dict(self.library_names)
+        for path, name in zip(self.model.paths, self.model.names):
+            labels.setdefault(normalize_path(path), "Found by scan")
+            names.setdefault(normalize_path(path), name)
+        dialog = DuplicatesDialog(self, names, labels)
+        dialog.merge_requested.connect(self.merge_duplicates)
+        thread = DuplicateThread(self.model.paths + self.library_paths, self)
+        thread.duplicates_found.connect(dialog.set_groups)
+        dialog.set_searching(True)
+        thread.start()
+        dialog.exec_()
+        thread.cancel()
+        thread.wait()
+
+    def merge_duplicates(self, merges):
+        # Dropped scan results are unchecked so they aren't added, dropped library games are merged
+        # into the kept copy by whoever owns the library
+        library = {normalize_path(path) for path in self.library_paths}
+        library_merges = []
+        for kept, dropped in merges:
+            self.model.set_checked(dropped, False)
+            if normalize_path(kept) not in library:
+                self.model.set_checked([kept], True)
+            dropped_library = [path for path in dropped if normalize_path(path) in library]
+            if dropped_library:
+                library_merges.append((kept, dropped_library))
+        if library_merges:
+            self.duplicates_merged.emit(library_merges)
+            self.library_paths = [path for path in self.library_paths if all(path not in dropped for _, dropped in library_merges)]
+
+    def sort_key(self, game):
+        return os.path.basename(game).lower()
 
     def add_selected_games(self):
-        selected_games = []
-        for index in range(self.list_widget.count()):
-            item = self.list_widget.item(index)
-            item_widget = self.list_widget.itemWidget(item)
-            if item_widget.checkbox.isChecked():
-                selected_games.append(item_widget.game_path)
-        sorted_selected_games = sorted(selected_games, key=lambda game: os.path.basename(game).lower())  # Sort selected games alphabetically
+        selected_games = self.model.checked_games()
+        sorted_selected_games = sorted(selected_games, key=self.sort_key)  # Sort selected games alphabetically
         self.games_added.emit(sorted_selected_games)  # Emit the signal with the sorted selected games
+        collection = self.collection_combo.currentText().strip()
+        if collection and sorted_selected_games:
+            self.games_tagged.emit(sorted_selected_games, collection)
         self.accept()
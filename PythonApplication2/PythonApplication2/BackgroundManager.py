@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QColor, QImageReader, QPainter, QPixmap
+from PyQt5.QtCore import QEvent, QObject, QPoint, QRect, QSize, Qt, QTimer
+
+class BackgroundManager(QObject):
+    MODES = ("cover", "contain", "tile")
+    RESCALE_DELAY = 120  # Milliseconds of quiet after a resize before the smooth rescale
+    MAX_CACHED_SIZES = 4  # Scaled pixmaps kept, e.g. normal and maximized window
+
+    def __init__(self, widget, image_path=None, mode="cover", color="#f0f0f0"):
+        super().__init__(widget)
+        self.widget = widget
+        self.mode = mode if mode in self.MODES else "cover"
+        self.color = QColor(color)
+        self.source = None  # Decoded once, already shrunk to the screen size
+        self.scaled = OrderedDict()  # (width, height, mode) -> pixmap, least recently used first
+
+        # Resizing draws a cheap stretch of the source, the smooth rescale waits for the drag to stop
+        self.rescale_timer = QTimer(self)
+        self.rescale_timer.setSingleShot(True)
+        self.rescale_timer.setInterval(self.RESCALE_DELAY)
+        self.rescale_timer.timeout.connect(self.rescale)
+
+        self.widget.installEventFilter(self)
+        if image_path:
+            self.set_image(image_path)
+
+    def set_image(self, image_path):
+        self.source = self.decode(image_path)
+        self.scaled.clear()
+        if self.source is None:
+            print(f"Could not load background image {image_path}")
+        self.update_background()
+        return self.source is not None
+
+    def clear(self):
+        self.source = None
+        self.scaled.clear()
+        self.widget.update()
+
+    def set_mode(self, mode):
+        if mode in self.MODES and mode != self.mode:
+            self.mode = mode
+            self.update_background()
+
+    def set_color(self, color):
+        self.color = QColor(color)
+        self.widget.update()
+
+    def decode(self, image_path):
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        screen = self.screen_size()
+        if size.isValid() and (size.width() > screen.width() or size.height() > screen.height()):
+            # No window is ever bigger than the screen, let the decoder drop the extra pixels
+            # (JPEG decodes straight to the smaller size) while keeping enough to cover it
+            reader.setScaledSize(size.scaled(screen, Qt.KeepAspectRatioByExpanding))
+        image = reader.read()
+        if image.isNull():
+            return None
+        return QPixmap.fromImage(image)
+
+    def screen_size(self):
+        screen = self.widget.screen() if hasattr(self.widget, "screen") else QApplication.primaryScreen()
+        if screen is None:
+            return QSize(3840, 2160)
+        ratio = screen.devicePixelRatio()
+        size = screen.size()
+        return QSize(int(size.width() * ratio), int(size.height() * ratio))
+
+    def target_size(self):
+        ratio = self.widget.devicePixelRatioF()
+        return QSize(int(self.widget.width() * ratio), int(self.widget.height() * ratio))
+
+    def cache_key(self, size):
+        return size.width(), size.height(), self.mode
+
+    def update_background(self):
+        if self.source is not None and self.mode != "tile" and self.cache_key(self.target_size()) not in self.scaled:
+            self.rescale_timer.start()
+        self.widget.update()
+
+    def rescale(self):
+        size = self.target_size()
+        key = self.cache_key(size)
+        if self.source is None or self.mode == "tile" or key in self.scaled or size.isEmpty():
+            return
+        aspect = Qt.KeepAspectRatioByExpanding if self.mode == "cover" else Qt.KeepAspectRatio
+        pixmap = self.source.scaled(size, aspect, Qt.SmoothTransformation)
+        pixmap.setDevicePixelRatio(self.widget.devicePixelRatioF())
+        self.scaled[key] = pixmap
+        while len(self.scaled) > self.MAX_CACHED_SIZES:
+            self.scaled.popitem(last=False)
+        self.widget.update()
+
+    def eventFilter(self, watched, event):
+        if watched is self.widget:
+            if event.type() == QEvent.Paint:
+                self.paint(event.rect())
+            elif event.type() == QEvent.Resize:
+                self.update_background()
+        return False
+
+    def paint(self, clip):
+        painter = QPainter(self.widget)
+        painter.setClipRect(clip)
+        rect = self.widget.rect()
+        painter.fillRect(rect, self.color)
+        if self.source is not None:
+            if self.mode == "tile":
+                painter.drawTiledPixmap(rect, self.source)
+            else:
+                key = self.cache_key(self.target_size())
+                pixmap = self.scaled.get(key)
+                if pixmap is not None:
+                    self.scaled.move_to_end(key)
+                    painter.drawPixmap(self.centered(pixmap.size() / pixmap.devicePixelRatio()).topLeft(), pixmap)
+                else:
+                    # Still resizing: stretch the source cheaply until the smooth copy is ready
+                    aspect = Qt.KeepAspectRatioByExpanding if self.mode == "cover" else Qt.KeepAspectRatio
+                    size = self.source.size().scaled(rect.size(), aspect)
+                    painter.drawPixmap(self.centered(size), self.source, self.source.rect())
+        painter.end()
+
+    def centered(self, size):
+        # Cover overflows the window and is cropped evenly on both sides, contain leaves bars of color
+        rect = self.widget.rect()
+        return QRect(QPoint((rect.width() - size.width()) // 2, (rect.height() - size.height()) // 2), size)
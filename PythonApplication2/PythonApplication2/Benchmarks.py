@@ -0,0 +1,374 @@
+"""Headless benchmarks for the launcher's hot paths.
+
+Run from this folder:
+    python Benchmarks.py                      # compare against the stored baseline
+    python Benchmarks.py --save-baseline      # record this machine's numbers
+    python Benchmarks.py --sizes 100 1000 --only grid scan
+
+Every benchmark runs against synthetic libraries, directory trees and generated
+executables in a temporary folder, nothing of the real library is read or written.
+A result slower (or bigger) than the baseline by more than the tolerance is flagged
+and the script exits with status 1. Baselines are per machine, record one before
+starting on a change and compare after.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# Settings, caches and the diagnostics log go to a throwaway folder, set before any launcher module
+# reads the per-user folder location
+USER_HOME = tempfile.mkdtemp(prefix="launcher_bench_home_")
+os.environ["LAUNCHER_HOME"] = USER_HOME
+atexit.register(shutil.rmtree, USER_HOME, ignore_errors=True)
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QSize
+from LauncherPaths import EXECUTED_DIR
+from PEFixtures import build_executable, dib_icon, png_icon
+from SortEngine import use_user_collation
+
+BASELINE_FILE = os.path.join(EXECUTED_DIR, "benchmark_baseline.json")
+DEFAULT_SIZES = [100, 1000, 10000]
+BUTTON_SIZE = QSize(150, 150)
+ZOOM_SIZE = QSize(96, 96)
+
+class Fixtures:
+    # Generated once per run and shared by every benchmark that needs them
+    def __init__(self, root):
+        self.root = root
+        self.icon_sets = {}
+        self.trees = {}
+
+    def games(self, size):
+        return [
+            {"name": f"Synthetic Game {index:05d}", "path": os.path.join(self.root, "missing", f"game{index}.exe")}
+            for index in range(size)
+        ]
+
+    def executables(self, size):
+        # Half carry a 256px PNG icon, half only bare DIB icons, like old and new games do
+        if size not in self.icon_sets:
+            folder = os.path.join(self.root, f"icons_{size}")
+            os.makedirs(folder)
+            png = build_executable([(32, dib_icon(32), 32), (256, png_icon(256, "#3080c0"), 32)])
+            dib = build_executable([(16, dib_icon(16), 32), (48, dib_icon(48), 32)])
+            paths = []
+            for index in range(size):
+                path = os.path.join(folder, f"game{index}.exe")
+                with open(path, 'wb') as file:
+                    file.write(png if index % 2 else dib)
+                paths.append(path)
+            self.icon_sets[size] = paths
+        return self.icon_sets[size]
+
+    def tree(self, size):
+        # Five executables and some data files per game folder, nested two levels deep
+        if size not in self.trees:
+            root = os.path.join(self.root, f"tree_{size}")
+            for index in range(max(1, size // 5)):
+                folder = os.path.join(root, f"publisher{index % 20}", f"game{index}", "bin")
+                os.makedirs(folder)
+                for name in ("game.exe", "launcher.exe", "crash_handler.exe", "unins000.exe", "setup.exe",
+                             "data.pak", "readme.txt", "settings.ini"):
+                    open(os.path.join(folder, name), 'wb').close()
+            self.trees[size] = root
+        return self.trees[size]
+
+class Benchmark:
+    def __init__(self, name, setup, run, teardown=None):
+        self.name = name
+        self.setup = setup  # (fixtures, size, workdir) -> state, not timed
+        self.run = run  # state -> None, timed
+        self.teardown = teardown
+
+def process_events():
+    QApplication.processEvents()
+
+def grid_setup(fixtures, size, workdir):
+    from GameCatalog import GameCatalog
+    from GameGrid import GameGrid
+    from IconCache import IconCache
+    grid = GameGrid(IconCache(os.path.join(workdir, "icons.db")), BUTTON_SIZE)
+    grid.resize(1280, 800)
+    grid.show()
+    return {"grid": grid, "games": list(GameCatalog(fixtures.games(size)))}
+
+def grid_build(state):
+    state["grid"].set_games(state["games"])
+    process_events()
+
+def grid_reload_setup(fixtures, size, workdir):
+    state = grid_setup(fixtures, size, workdir)
+    grid_build(state)
+    return state
+
+def grid_zoom_setup(fixtures, size, workdir):
+    state = grid_reload_setup(fixtures, size, workdir)
+    grid = state["grid"]
+    for game in state["games"]:
+        for zoom in (ZOOM_SIZE, BUTTON_SIZE):
+            grid.icon_cache.get_pixmap(game.path, zoom.width(), zoom.height(), grid.ratio)
+    return state
+
+def grid_zoom(state):
+    # Out one step and back, both atlas levels are already in memory
+    state["grid"].set_tile_size(ZOOM_SIZE)
+    process_events()
+    state["grid"].set_tile_size(BUTTON_SIZE)
+    process_events()
+
+def grid_teardown(state):
+    state["grid"].icon_loader.cancel()
+    state["grid"].icon_loader.pool.waitForDone()
+    state["grid"].close()
+    state["grid"].deleteLater()
+    process_events()
+
+def list_setup(fixtures, size, workdir):
+    from GameCatalog import GameCatalog
+    from IconCache import IconCache
+    from LibraryView import LibraryView
+    view = LibraryView(IconCache(os.path.join(workdir, "icons.db")), BUTTON_SIZE)
+    view.resize(1280, 800)
+    view.show()
+    return {"view": view, "games": list(GameCatalog(fixtures.games(size)))}
+
+def list_build(state):
+    state["view"].set_games(state["games"])
+    process_events()
+
+def list_teardown(state):
+    state["view"].library_model.icons.icon_loader.cancel()
+    state["view"].library_model.icons.icon_loader.pool.waitForDone()
+    state["view"].close()
+    state["view"].deleteLater()
+    process_events()
+
+def icon_extract_setup(fixtures, size, workdir):
+    from IconExtractor import IconExtractor
+    return {"extractor": IconExtractor(), "paths": fixtures.executables(size)}
+
+def icon_extract(state):
+    for path in state["paths"]:
+        state["extractor"].extract_scaled(path, BUTTON_SIZE.width(), BUTTON_SIZE.height())
+
+def icon_cache_setup(fixtures, size, workdir):
+    from IconCache import IconCache
+    cache_file = os.path.join(workdir, "icons.db")
+    paths = fixtures.executables(size)
+    warm = IconCache(cache_file)
+    for path in paths:
+        warm.load_image(path, BUTTON_SIZE.width(), BUTTON_SIZE.height())
+    warm.connection.close()
+    return {"cache": IconCache(cache_file), "paths": paths}
+
+def icon_cache_hit(state):
+    # A fresh process: nothing in memory, every icon comes from the disk cache
+    for path in state["paths"]:
+        state["cache"].load_image(path, BUTTON_SIZE.width(), BUTTON_SIZE.height())
+
+def icon_cache_teardown(state):
+    state["cache"].connection.close()
+
+def scan_setup(fixtures, size, workdir):
+    from GameScanner import GameScanner
+    index_file = os.path.join(workdir, "scan_index.json")
+    return {"scanner": GameScanner(index_file=index_file), "root": fixtures.tree(size), "index_file": index_file}
+
+def scan_cold(state):
+    if os.path.exists(state["index_file"]):
+        os.remove(state["index_file"])
+    state["scanner"].scan(state["root"])
+
+def scan_warm_setup(fixtures, size, workdir):
+    state = scan_setup(fixtures, size, workdir)
+    state["scanner"].scan(state["root"])
+    return state
+
+def scan_warm(state):
+    state["scanner"].scan(state["root"])
+
+def json_store_setup(fixtures, size, workdir):
+    from GameCatalog import GameCatalog
+    from GameStore import JsonGameStore
+    store = JsonGameStore(os.path.join(workdir, "library.json"))
+    games = GameCatalog(fixtures.games(size)).to_dicts()
+    store.save(games)
+    return {"store": store, "games": games}
+
+def library_load(state):
+    from GameCatalog import GameCatalog
+    from LibraryFormat import read_document
+    for _, data in state["store"].load_candidates():
+        GameCatalog(read_document(data))
+        break
+
+def library_save(state):
+    state["store"].save(state["games"])
+
+def sqlite_store_setup(fixtures, size, workdir):
+    from GameCatalog import GameCatalog
+    from GameStore import SqliteGameStore
+    store = SqliteGameStore(os.path.join(workdir, "library.db"))
+    games = GameCatalog(fixtures.games(size)).to_dicts()
+    store.save(games)
+    return {"store": store, "games": games, "renamed": 0}
+
+def library_save_one_change(state):
+    # The common case: one rename in a large library
+    state["renamed"] += 1
+    state["games"][0]["name"] = f"Renamed {state['renamed']}"
+    state["store"].save(state["games"])
+
+def import_setup(fixtures, size, workdir):
+    from LibraryFormat import export_library
+    path = os.path.join(workdir, "import.csv")
+    export_library(fixtures.games(size), path)
+    return {"path": path}
+
+def library_import_csv(state):
+    # Streamed straight into the catalog, no list of dicts is built first
+    from GameCatalog import GameCatalog
+    from LibraryFormat import read_library
+    GameCatalog().add_many(read_library(state["path"]))
+
+def sqlite_store_teardown(state):
+    state["store"].connection.close()
+
+def search_setup(fixtures, size, workdir):
+    from GameCatalog import GameCatalog
+    from SearchIndex import SearchIndex
+    index = SearchIndex(GameCatalog(fixtures.games(size)))
+    return {"index": index}
+
+def search_build(state):
+    state["index"].build()
+
+def search_query_setup(fixtures, size, workdir):
+    state = search_setup(fixtures, size, workdir)
+    state["index"].build()
+    return state
+
+def search_query(state):
+    for query in ("s", "syn", "game 00", "synthetic 0042", "gmae"):
+        state["index"].search(query)
+
+BENCHMARKS = [
+    Benchmark("grid_build", grid_setup, grid_build, grid_teardown),
+    Benchmark("grid_reload", grid_reload_setup, grid_build, grid_teardown),
+    Benchmark("grid_zoom", grid_zoom_setup, grid_zoom, grid_teardown),
+    Benchmark("list_build", list_setup, list_build, list_teardown),
+    Benchmark("icon_extract", icon_extract_setup, icon_extract),
+    Benchmark("icon_cache_hit", icon_cache_setup, icon_cache_hit, icon_cache_teardown),
+    Benchmark("scan_cold", scan_setup, scan_cold),
+    Benchmark("scan_warm", scan_warm_setup, scan_warm),
+    Benchmark("library_load_json", json_store_setup, library_load),
+    Benchmark("library_save_json", json_store_setup, library_save),
+    Benchmark("library_save_sqlite", sqlite_store_setup, library_save_one_change, sqlite_store_teardown),
+    Benchmark("library_import_csv", import_setup, library_import_csv),
+    Benchmark("search_build", search_setup, search_build),
+    Benchmark("search_query", search_query_setup, search_query),
+]
+
+def measure(benchmark, fixtures, size, repeat, root):
+    timings = []
+    peak = 0
+    # The last round runs under tracemalloc, which slows Python down, so it isn't timed
+    for round_index in range(repeat + 1):
+        workdir = tempfile.mkdtemp(dir=root)
+        state = benchmark.setup(fixtures, size, workdir)
+        try:
+            if round_index < repeat:
+                started = time.perf_counter()
+                benchmark.run(state)
+                timings.append(time.perf_counter() - started)
+            else:
+                tracemalloc.start()
+                benchmark.run(state)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        finally:
+            if benchmark.teardown is not None:
+                benchmark.teardown(state)
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {"median_ms": round(statistics.median(timings) * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as file:
+        try:
+            baseline = json.load(file)
+        except json.JSONDecodeError:
+            return {}
+    return baseline if isinstance(baseline, dict) else {}
+
+def regressions(result, previous, tolerance, min_ms=5.0):
+    # Tiny absolute differences are timer noise, however large they are in percent
+    flagged = []
+    if previous is None:
+        return flagged
+    if (result["median_ms"] > previous["median_ms"] * (1 + tolerance)
+            and result["median_ms"] - previous["median_ms"] > min_ms):
+        flagged.append("time")
+    if result["peak_kb"] > previous["peak_kb"] * (1 + tolerance) and result["peak_kb"] - previous["peak_kb"] > 64:
+        flagged.append("memory")
+    return flagged
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the launcher's hot paths on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="library sizes to run")
+    parser.add_argument("--only", nargs="+", help="run benchmarks whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per benchmark, the median is kept")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+    use_user_collation()  # Names are sorted with the collation the launcher uses
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    baseline = load_baseline(args.baseline)
+    results = {}
+    flagged = []
+    benchmarks = [b for b in BENCHMARKS if not args.only or any(part in b.name for part in args.only)]
+
+    root = tempfile.mkdtemp(prefix="launcher_bench_")
+    try:
+        fixtures = Fixtures(root)
+        print(f"{'benchmark':<22}{'size':>7}{'median ms':>12}{'peak KiB':>11}{'baseline ms':>13}  status")
+        for benchmark in benchmarks:
+            for size in args.sizes:
+                key = f"{benchmark.name}[{size}]"
+                result = measure(benchmark, fixtures, size, args.repeat, root)
+                results[key] = result
+                previous = baseline.get(key)
+                problems = regressions(result, previous, args.tolerance)
+                if problems:
+                    flagged.append(key)
+                status = "REGRESSION (" + ", ".join(problems) + ")" if problems else ("ok" if previous else "new")
+                baseline_ms = f"{previous['median_ms']:.1f}" if previous else "-"
+                print(f"{benchmark.name:<22}{size:>7}{result['median_ms']:>12.1f}{result['peak_kb']:>11.0f}{baseline_ms:>13}  {status}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.save_baseline:
+        baseline.update(results)
+        temp_file = args.baseline + ".tmp"
+        with open(temp_file, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        os.replace(temp_file, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    if flagged:
+        print(f"{len(flagged)} regression(s): {', '.join(flagged)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
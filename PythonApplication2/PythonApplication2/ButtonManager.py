@@ -1,30 +1,36 @@
 import os
-import json
-from functools import partial
-from PyQt5.QtWidgets import QAction, QInputDialog, QLineEdit, QMenu, QPushButton, QScrollArea, QVBoxLayout, QWidget, QFileDialog, QGridLayout
-from PyQt5.QtGui import QKeySequence, QIcon, QPixmap, QImage, QPalette, QBrush
-from PyQt5.QtCore import QSize, Qt
-from PIL import Image
-import win32gui
-import win32ui
-from GameLoader import GameLoader
-from AddGamesWindow import AddGamesWindow
-from ScrollingTextEdit import ScrollingTextEdit
+from PyQt5.QtWidgets import QAction, QInputDialog, QLabel, QLineEdit, QMenu, QMessageBox, QFileDialog, QShortcut
+from PyQt5.QtGui import QKeySequence, QPixmap
+from PyQt5.QtCore import Qt, QSize, QTimer
+from GameCatalog import GameCatalog, normalize_path
+from GameLibrary import GameLibrary
+from IconCache import IconCache
+from MarqueeLabel import MarqueeClock
+from BackgroundManager import BackgroundManager
+from LaunchService import LaunchService
+from Diagnostics import Diagnostics
+from SortEngine import SortEngine
+from StartupTimer import StartupTimer
+from LauncherPaths import SNAPSHOT_FILE
+
+TILE_SIZES = (64, 96, 128, 150, 192, 256)  # Zoom steps, icons are drawn at the nearest atlas level below each
+DEFAULT_TILE_SIZE = 150
+LIBRARY_FILE_FILTER = "Game library (*.json);;Spreadsheet (*.csv);;Path list (*.txt)"
 
 class ButtonManager:
-    CONFIG_FILE = "config.json"
-
     def __init__(self, parent_layout, games, parent_widget, main_window):
         self.parent_layout = parent_layout
-        self.games = games
+        # The window is a client of the library, which saves it and owns the search index. Both are
+        # subscribed first, so the index is current when the view refilters
+        self.library = games if isinstance(games, GameLibrary) else GameLibrary(games)
+        self.games = self.library.catalog
+        self.search_index = self.library.search_index
+        self.games.subscribe(self.on_catalog_changed)
         self.parent_widget = parent_widget
         self.main_window = main_window
-        self.button_size = QSize(150, 150)  # Fixed button size
-        self.initialized = False  # Flag to check if buttons are already created
-
-        # Connect to the resize event of the parent widget
-        self.original_resize_event = self.parent_widget.resizeEvent
-        self.parent_widget.resizeEvent = self.on_resize
+        self.icon_cache = IconCache.instance()
+        self.library_view = None  # Created once and reused, reloads only update its tiles
+        self.snapshot_label = None  # Picture of the last session's library shown while the view is built
 
         # Add the reload games action to the menu
         self.add_reload_action_to_menu()
@@ -35,11 +41,46 @@ class ButtonManager:
         # Add the background image selector action to the menu
         self.add_background_image_selector_to_menu()
 
-        # Load the sort order and background image from the configuration file
-        self.sort_order, self.background_image_path = self.load_config()
-
-        # Load games and create buttons initially
-        self.reload_games()
+        # Add the library view switch action to the menu
+        self.add_view_mode_action_to_menu()
+
+        # Add the zoom shortcuts
+        self.add_zoom_actions()
+
+        # Add the watched folder actions to the menu
+        self.add_watch_actions_to_menu()
+
+        # Add the library import and export actions to the menu
+        self.add_import_export_actions_to_menu()
+
+        # Add the search bar above the library
+        self.add_search_bar()
+
+        # Add the diagnostics overlay toggle
+        self.add_diagnostics_action()
+
+        # Load the sort order, background image and library view from the configuration file
+        self.config = self.library.config
+        self.sort_engine = SortEngine.from_config(self.config.get('sort_order'))
+        self.background_image_path = self.config.get('background_image_path', '')
+        self.background_mode = self.config.get('background_mode', 'cover')  # "cover", "contain" or "tile"
+        self.background_manager = BackgroundManager(self.parent_widget, mode=self.background_mode)
+        tile_size = self.config.get('tile_size', DEFAULT_TILE_SIZE)
+        self.button_size = QSize(tile_size, tile_size)  # Changed with Ctrl+wheel over the library
+        self.view_mode = self.config.get('view_mode', 'grid')  # "grid" for widget tiles, "list" for the virtualized view
+        self.collection = self.config.get('collection', '')  # Open collection tab, "" for all games
+        self.library_roots = list(self.config.get('library_roots', []))  # Folders watched for new and moved games
+        self.library_watcher = None  # Started once the library is on screen
+        self.duplicate_thread = None  # Running duplicate search, one at a time
+        self.launch_service = LaunchService(self.games, self.config.get('launch_backend', 'subprocess'), self.main_window)
+        self.library.launcher = self.launch_service
+        self.launch_service.launch_failed.connect(self.on_launch_failed)
+        MarqueeClock.instance().set_mode(self.config.get('marquee', 'always'))  # "always", "hover" or "off"
+
+        # The library was loaded by the caller, show last session's picture of it and build the view
+        # once the window is on screen
+        self.show_snapshot()
+        QTimer.singleShot(0, self.finish_startup)
 
         # Set the background image if it exists, otherwise set a default color
         if self.background_image_path:
@@ -65,181 +106,405 @@ class ButtonManager:
         background_image_action.triggered.connect(self.select_background_image)
         self.main_window.menuBar().addAction(background_image_action)
 
+    def add_view_mode_action_to_menu(self):
+        view_mode_action = QAction("Switch Library View", self.main_window)
+        view_mode_action.setShortcut(QKeySequence("Ctrl+L"))
+        view_mode_action.triggered.connect(self.switch_view_mode)
+        self.main_window.menuBar().addAction(view_mode_action)
+
+    def add_zoom_actions(self):
+        for label, shortcut, steps in (("Zoom In", "Ctrl+=", 1), ("Zoom Out", "Ctrl+-", -1), ("Reset Zoom", "Ctrl+0", 0)):
+            zoom_action = QAction(label, self.main_window)
+            zoom_action.setShortcut(QKeySequence(shortcut))
+            zoom_action.triggered.connect(lambda checked=False, steps=steps: self.zoom(steps))
+            self.main_window.addAction(zoom_action)
+
+    def add_watch_actions_to_menu(self):
+        watch_folder_action = QAction("Watch Folder", self.main_window)
+        watch_folder_action.triggered.connect(self.select_library_root)
+        self.main_window.menuBar().addAction(watch_folder_action)
+
+        self.review_action = QAction("Review New Games", self.main_window)
+        self.review_action.triggered.connect(self.review_new_games)
+        self.review_action.setVisible(False)  # Shown once the watcher has found something
+        self.main_window.menuBar().addAction(self.review_action)
+
+    def add_import_export_actions_to_menu(self):
+        import_action = QAction("Import Library", self.main_window)
+        import_action.triggered.connect(self.import_library)
+        self.main_window.menuBar().addAction(import_action)
+
+        export_action = QAction("Export Library", self.main_window)
+        export_action.triggered.connect(self.export_library)
+        self.main_window.menuBar().addAction(export_action)
+
+        duplicates_action = QAction("Find Duplicate Games", self.main_window)
+        duplicates_action.triggered.connect(lambda: self.find_duplicates())
+        self.main_window.menuBar().addAction(duplicates_action)
+
+    def add_search_bar(self):
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search games")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.apply_search)
+        QShortcut(QKeySequence("Escape"), self.search_edit, self.search_edit.clear)
+        self.parent_layout.addWidget(self.search_edit)
+
+        search_action = QAction("Search Games", self.main_window)
+        search_action.setShortcut(QKeySequence("Ctrl+F"))
+        search_action.triggered.connect(self.search_edit.setFocus)
+        self.main_window.addAction(search_action)
+
+    def add_diagnostics_action(self):
+        self.diagnostics_overlay = None  # Created the first time it's shown
+        diagnostics = Diagnostics.instance()
+        diagnostics.register_gauge("library.games", lambda: len(self.games))
+        diagnostics.register_gauge("icon_cache.memory_hits", lambda: self.icon_cache.memory_hits)
+        diagnostics.register_gauge("icon_cache.disk_hits", lambda: self.icon_cache.disk_hits)
+        diagnostics.register_gauge("icon_cache.misses", lambda: self.icon_cache.misses)
+        diagnostics.register_gauge("icon_cache.memory_items", lambda: len(self.icon_cache.memory))
+        diagnostics.register_gauge("marquee.scrolling", lambda: len(MarqueeClock.instance().labels))
+        diagnostics.register_gauge("launch.running", lambda: len(self.launch_service.running))
+
+        diagnostics_action = QAction("Diagnostics", self.main_window)
+        diagnostics_action.setShortcut(QKeySequence("Ctrl+Shift+D"))
+        diagnostics_action.triggered.connect(self.toggle_diagnostics)
+        self.main_window.addAction(diagnostics_action)
+
+    def toggle_diagnostics(self):
+        if self.diagnostics_overlay is None:
+            from DiagnosticsOverlay import DiagnosticsOverlay
+            self.diagnostics_overlay = DiagnosticsOverlay(self.main_window)
+        self.diagnostics_overlay.toggle()
+
+    def apply_search(self):
+        if self.library_view is not None:
+            self.library_view.set_filter(self.search_index.search(self.search_edit.text()))
+
     def open_add_games_window(self):
         file_dialog = QFileDialog(self.main_window)
         file_dialog.setFileMode(QFileDialog.Directory)
         if file_dialog.exec_():
             folder_path = file_dialog.selectedFiles()[0]
-            games = self.scan_for_games(folder_path)
-            add_games_window = AddGamesWindow(self.main_window, games)
-            add_games_window.games_added.connect(self.add_games)  # Connect the signal
+            # The dialog and scanner aren't needed to show the library, so they're only imported here
+            from ScanThread import ScanThread
+            # Open the dialog straight away and let results stream into it while the scan runs
+            add_games_window = self.create_add_games_window()
+            scan_thread = ScanThread(self.create_scanner(), folder_path)
+            scan_thread.games_found.connect(add_games_window.append_games)
+            scan_thread.finished.connect(lambda: add_games_window.set_scanning(False))
+            add_games_window.set_scanning(True)
+            scan_thread.start()
             add_games_window.exec_()
+            scan_thread.cancel()
+            scan_thread.wait()
+
+    def start_library_watcher(self):
+        if self.library_watcher is not None or not self.library_roots:
+            return
+        from LibraryWatcher import LibraryWatcher
+        self.library_watcher = LibraryWatcher(
+            self.games, self.create_scanner, self.library_roots,
+            self.config.get('watch_mode', 'auto'), self.main_window  # "auto" or "poll" for network drives
+        )
+        self.library_watcher.review_queue_changed.connect(self.on_review_queue_changed)
+        self.library_watcher.files_modified.connect(self.on_files_modified)
+
+    def select_library_root(self):
+        folder_path = QFileDialog.getExistingDirectory(self.main_window, "Watch Folder")
+        if not folder_path or folder_path in self.library_roots:
+            return
+        self.library_roots.append(folder_path)
+        self.save_config()
+        if self.library_watcher is None:
+            self.start_library_watcher()
+        else:
+            self.library_watcher.add_root(folder_path)
+
+    def on_files_modified(self, paths):
+        for path in paths:
+            self.icon_cache.invalidate(path)
+
+    def on_review_queue_changed(self, count):
+        self.review_action.setText(f"Review New Games ({count})")
+        self.review_action.setVisible(count > 0)
+
+    def review_new_games(self):
+        games = self.library_watcher.take_review_queue() if self.library_watcher is not None else []
+        if not games:
+            return
+        self.create_add_games_window(games).exec_()
+
+    def create_add_games_window(self, games=()):
+        from AddGamesWindow import AddGamesWindow
+        add_games_window = AddGamesWindow(self.main_window, games, self.games.tags(), {record.path: record.name for record in self.games})
+        add_games_window.games_added.connect(self.add_games)  # Connect the signal
+        add_games_window.games_tagged.connect(self.tag_games)
+        add_games_window.duplicates_merged.connect(self.merge_duplicates)
+        return add_games_window
+
+    def create_scanner(self):
+        return self.library.create_scanner()
 
     def scan_for_games(self, folder_path):
-        games = []
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                if file.endswith(".exe"):
-                    games.append(os.path.join(root, file))
-        return games
+        return self.library.scan(folder_path)
 
     def add_games(self, new_games):
-        for game in new_games:
-            self.games.append({"name": os.path.basename(game), "path": game})
+        # Named from version info the Add Games window has usually read and cached already
+        self.library.add_paths(new_games)
+
+    def import_library(self):
+        path, _ = QFileDialog.getOpenFileName(self.main_window, "Import Library", "", LIBRARY_FILE_FILTER)
+        if not path:
+            return
+        try:
+            added, reader = self.library.import_library(path)
+        except OSError as e:
+            QMessageBox.warning(self.main_window, "Import Library", f"Could not read {path}:\n{e}")
+            return
+        summary = f"Imported {len(added)} of {reader.count} games from {path}."
+        if reader.count > len(added):
+            summary += f"\n{reader.count - len(added)} were already in the library."
+        message = QMessageBox(QMessageBox.Information, "Import Library", summary, QMessageBox.Ok, self.main_window)
+        if reader.errors:
+            message.setIcon(QMessageBox.Warning)
+            message.setInformativeText(f"{len(reader.errors)} invalid entries were skipped.")
+            message.setDetailedText("\n".join(f"Entry {number}: {error}" for number, error in reader.errors[:100]))
+        message.exec_()
+        if added:
+            self.find_duplicates(quiet=True)  # Libraries from another machine often hold the same game under another path
+
+    def export_library(self):
+        path, _ = QFileDialog.getSaveFileName(self.main_window, "Export Library", "library.json", LIBRARY_FILE_FILTER)
+        if not path:
+            return
+        try:
+            self.library.export_library(path)
+        except OSError as e:
+            QMessageBox.warning(self.main_window, "Export Library", f"Could not write {path}:\n{e}")
+
+    def find_duplicates(self, quiet=False):
+        # Files are compared in the background, a quiet search only opens the dialog if it finds something
+        from DuplicatesDialog import DuplicateThread, DuplicatesDialog
+        if self.duplicate_thread is not None:
+            return
+        dialog = DuplicatesDialog(self.main_window, names={normalize_path(record.path): record.name for record in self.games})
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.merge_requested.connect(self.merge_duplicates)
+        self.duplicate_thread = DuplicateThread([record.path for record in self.games], self.main_window)
+        self.duplicate_thread.duplicates_found.connect(dialog.set_groups)
+        if quiet:
+            self.duplicate_thread.duplicates_found.connect(lambda groups: dialog.show() if groups else dialog.deleteLater())
+        else:
+            dialog.set_searching(True)
+            dialog.show()
+        dialog.rejected.connect(self.duplicate_thread.cancel)
+        self.duplicate_thread.finished.connect(self.on_duplicate_search_finished)
+        self.duplicate_thread.start()
+
+    def on_duplicate_search_finished(self):
+        self.duplicate_thread.deleteLater()
+        self.duplicate_thread = None
+
+    def merge_duplicates(self, merges):
+        self.library.merge_duplicates(merges)
+
+    def tag_games(self, paths, collection):
+        # Runs after add_games, so games that were already in the library are tagged as well
+        records = [self.games.find_by_path(path) for path in paths]
+        self.games.set_tag([record for record in records if record is not None], collection)
+
+    def on_catalog_changed(self, event, records):
+        # Only the tiles of the affected games are touched, the rest of the view stays as it is
+        if self.library_view is not None:
+            if event == GameCatalog.ADDED:
+                self.library_view.add_games(records)
+            elif event == GameCatalog.REMOVED:
+                self.library_view.remove_games(records)
+                self.sort_engine.forget([record.id for record in records])
+            elif event == GameCatalog.CHANGED:
+                for record in records:
+                    self.library_view.update_game(record)
+            elif event == GameCatalog.RESET:
+                self.library_view.set_games(self.sorted_games(), refresh_icons=True)
+            if event in (GameCatalog.REORDERED, GameCatalog.ADDED, GameCatalog.CHANGED):
+                self.apply_sort()  # Added, renamed or just played games may belong somewhere else now
+            if self.search_edit.text():
+                self.apply_search()  # New or renamed games may now match the search, or stop matching
+
+    def create_buttons(self, refresh_icons=False):
+        if self.library_view is None:
+            # One view per collection tab, each built the first time its tab is opened
+            from CollectionTabs import CollectionTabs
+            self.library_view = CollectionTabs(
+                self.create_collection_view, self.collection,
+                self.config.get('warm_collections', CollectionTabs.MAX_WARM_VIEWS)
+            )
+            self.library_view.collection_changed.connect(self.on_collection_changed)
+            self.library_view.zoom_requested.connect(self.zoom)
+            self.library_view.launch_requested.connect(self.on_launch_requested)
+            self.library_view.context_menu_requested.connect(self.show_context_menu)
+            self.library_view.order_changed.connect(self.on_order_changed)
+            self.parent_layout.addWidget(self.library_view)
+        self.populate_grid(refresh_icons)
+        self.apply_search()
+
+    def finish_startup(self):
+        startup = StartupTimer.instance()
+        startup.mark("window shown")
+        if self.library_view is None:
+            self.create_buttons()
+        self.hide_snapshot()
+        startup.mark("library view")
+        startup.report()
+        self.start_library_watcher()
+
+    def show_snapshot(self):
+        if not len(self.games) or not os.path.exists(SNAPSHOT_FILE):
+            return
+        snapshot = QPixmap(SNAPSHOT_FILE)
+        if snapshot.isNull():
+            return
+        self.snapshot_label = QLabel()
+        self.snapshot_label.setPixmap(snapshot)
+        self.snapshot_label.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.parent_layout.addWidget(self.snapshot_label)
+
+    def hide_snapshot(self):
+        if self.snapshot_label is not None:
+            self.parent_layout.removeWidget(self.snapshot_label)
+            self.snapshot_label.deleteLater()
+            self.snapshot_label = None
+
+    def save_snapshot(self):
+        # Called when the window closes, the picture is shown first thing on the next start
+        if self.library_view is None or not self.library_view.isVisible():
+            return
+        if not self.library_view.grab().save(SNAPSHOT_FILE, "PNG"):
+            print(f"Error saving library snapshot to {SNAPSHOT_FILE}")
+
+    def create_collection_view(self):
+        if self.view_mode == 'list':
+            # Virtualized view for very large libraries, only visible tiles are painted
+            from LibraryView import LibraryView
+            return LibraryView(self.icon_cache, self.button_size)
+        from GameGrid import GameGrid
+        return GameGrid(self.icon_cache, self.button_size)
+
+    def zoom(self, steps):
+        # Steps through TILE_SIZES, 0 goes back to the default size
+        size = self.button_size.width()
+        if steps == 0:
+            size = DEFAULT_TILE_SIZE
+        else:
+            index = min(range(len(TILE_SIZES)), key=lambda i: abs(TILE_SIZES[i] - size))
+            size = TILE_SIZES[max(0, min(len(TILE_SIZES) - 1, index + steps))]
+        if size == self.button_size.width():
+            return
+        self.button_size = QSize(size, size)
+        if self.library_view is not None:
+            self.library_view.set_tile_size(self.button_size)
+        self.save_config()
+
+    def on_collection_changed(self, collection):
+        self.collection = collection
+        self.save_config()
+
+    def populate_grid(self, refresh_icons=False):
+        # Existing tiles are reused, only added or removed games create or destroy widgets
+        self.library_view.set_games(self.sorted_games(), refresh_icons)
+
+    def sorted_games(self):
+        return [self.games.get(game_id) for game_id in self.sort_engine.order(self.games)]
+
+    def apply_sort(self):
+        # Existing tiles are only moved, a permutation rather than a rebuild
+        if self.library_view is not None:
+            self.library_view.set_order(self.sort_engine.order(self.games))
+
+    def switch_view_mode(self):
+        self.view_mode = 'grid' if self.view_mode == 'list' else 'list'
+        if self.library_view is not None:
+            self.parent_layout.removeWidget(self.library_view)
+            self.library_view.deleteLater()
+            self.library_view = None
         self.create_buttons()
-        GameLoader().save_games(self.games)  # Save the updated games list
-
-    def create_buttons(self):
-
-        # Temporarily disconnect the resize event
-        self.parent_widget.resizeEvent = None
-
-        # Clear the existing layout
-        while self.parent_layout.count():
-            child = self.parent_layout.takeAt(0)
-            if child.widget():
-                print(f"Deleting widget: {child.widget()}")
-                child.widget().deleteLater()
-
-        # Create a scroll area for the grid layout
-        self.scroll_area = QScrollArea()  # Store reference to QScrollArea
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("background: transparent;")
-        self.scroll_area.setFrameShape(QScrollArea.NoFrame)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_content = QWidget()
-        scroll_content.setStyleSheet("background: transparent;")
-        self.grid_layout = QGridLayout(scroll_content)
-        self.grid_layout.setContentsMargins(0, 0, 10, 0)  # Add right margin to keep distance from scrollbar
-        self.grid_layout.setVerticalSpacing(10)  # Set vertical spacing between rows to 10 pixels
-        scroll_content.setLayout(self.grid_layout)
-        self.scroll_area.setWidget(scroll_content)
-        self.parent_layout.addWidget(self.scroll_area)
-
-        self.populate_grid()
-        self.initialized = True  # Set the flag to True after initial population
-
-        # Reconnect the resize event
-        self.parent_widget.resizeEvent = self.on_resize
-
-    def populate_grid(self):
-        # Clear the existing grid layout
-        while self.grid_layout.count():
-            child = self.grid_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-        created_game_names = set()
-        row, col = 0, 0
-
-        # Calculate the number of columns based on the current width of the scroll area
-        scroll_area_width = self.scroll_area.viewport().width()
-        max_columns = min(20, max(1, scroll_area_width // self.button_size.width()))
-
-
-        for game in self.games:
-            if not isinstance(game, dict):
-                continue
-            if game['name'] in created_game_names:
-                continue
-            created_game_names.add(game['name'])
-
-            icon = self.extract_icon(game["path"])
-            resized_icon = self.resize_icon(icon, self.button_size.width(), self.button_size.height())  # Resize icon to button size
-
-            # Create the button with the icon
-            button = QPushButton()
-            button.setIcon(QIcon(resized_icon))
-            button.setIconSize(self.button_size)  # Set icon size to button size
-            button.setFixedSize(self.button_size)  # Set button size to match icon size
-            button.setStyleSheet("background-color: white; padding: 0px; margin: 0px;")  # Remove padding and margin
-            button.clicked.connect(partial(self.launch_game, game["path"]))
-            button.setContextMenuPolicy(Qt.CustomContextMenu)
-            button.customContextMenuRequested.connect(partial(self.show_context_menu, game, button))
-
-            # Create a scrolling text edit for the game name
-            text_edit = ScrollingTextEdit(game["name"])
-            text_edit.setFixedWidth(self.button_size.width())  # Adjust text edit width to match the icon width
-
-            # Create a container widget to hold the button and text edit
-            container = QWidget()
-            container_layout = QVBoxLayout()
-            container_layout.addWidget(button)
-            container_layout.addWidget(text_edit)
-            container_layout.setSpacing(0)  # Set spacing to 0
-            container_layout.setContentsMargins(0, 0, 0, 0)  # Remove margins
-            container.setLayout(container_layout)
-
-            # Add the container to the grid layout
-            self.grid_layout.addWidget(container, row, col, Qt.AlignTop)  # Align the container to the top
-            col += 1
-            if col >= max_columns:
-                col = 0
-                row += 1
-
-    def on_resize(self, event):
-        if self.initialized:  # Only repopulate grid if already initialized
-            self.populate_grid()
-        if self.original_resize_event:
-            self.original_resize_event(event)
-
-    def extract_icon(self, path):
-        large, small = win32gui.ExtractIconEx(path, 0)
-        if not small:
-            return QPixmap(32, 32)  # Return a blank pixmap as a default icon
-        win32gui.DestroyIcon(small[0])
-        hdc = win32ui.CreateDCFromHandle(win32gui.GetDC(0))
-        hbmp = win32ui.CreateBitmap()
-        hbmp.CreateCompatibleBitmap(hdc, 32, 32)
-        hdc = hdc.CreateCompatibleDC()
-        hdc.SelectObject(hbmp)
-        hdc.DrawIcon((0, 0), large[0])
-        win32gui.DestroyIcon(large[0])
-        bmpinfo = hbmp.GetInfo()
-        bmpstr = hbmp.GetBitmapBits(True)
-        img = Image.frombuffer('RGBA', (bmpinfo['bmWidth'], bmpinfo['bmHeight']), bmpstr, 'raw', 'BGRA', 0, 1)
-        qimage = QImage(img.tobytes(), img.width, img.height, QImage.Format_RGBA8888)
-        return QPixmap.fromImage(qimage)
-
-    def resize_icon(self, pixmap, width, height):
-        return pixmap.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-    def launch_game(self, path):
-        os.startfile(path)
+        self.save_config()
+
+    def on_launch_requested(self, game):
+        self.launch_game(game)
+
+    def launch_game(self, game):
+        # Runs from the exe's folder or the game's working directory with its own arguments, and is ignored
+        # while it's already running
+        self.launch_service.launch(game)
+
+    def on_launch_failed(self, game, error):
+        print(f"Error launching {game.name}: {error}")
 
     def show_context_menu(self, game, button, position):
         context_menu = QMenu(self.main_window)
         remove_action = context_menu.addAction("Remove Game")
-        sort_az_action = context_menu.addAction("Sort A-Z")
-        sort_za_action = context_menu.addAction("Sort Z-A")
+        sort_menu = context_menu.addMenu("Sort By")
+        sort_actions = {}
+        for label, mode, ascending in (
+            ("Manual Order", SortEngine.MANUAL, True),
+            ("Name A-Z", SortEngine.NAME, True),
+            ("Name Z-A", SortEngine.NAME, False),
+            ("Recently Played", SortEngine.RECENT, False),
+            ("Most Played", SortEngine.MOST_PLAYED, False),
+            ("Date Added", SortEngine.DATE_ADDED, False),
+        ):
+            sort_action = sort_menu.addAction(label)
+            sort_action.setCheckable(True)
+            sort_action.setChecked(self.sort_engine.mode == mode and (mode == SortEngine.MANUAL or self.sort_engine.ascending == ascending))
+            sort_actions[sort_action] = (mode, ascending)
+        collection_menu = context_menu.addMenu("Collections")
+        collection_actions = {}
+        for collection in self.games.tags():
+            collection_action = collection_menu.addAction(collection)
+            collection_action.setCheckable(True)
+            collection_action.setChecked(collection in (game.get('tags') or ()))
+            collection_actions[collection_action] = collection
+        collection_menu.addSeparator()
+        new_collection_action = collection_menu.addAction("New Collection...")
         rename_action = context_menu.addAction("Rename Game")
 
         action = context_menu.exec_(button.mapToGlobal(position))
         if action == remove_action:
             self.remove_game(game)
-        elif action == sort_az_action:
-            self.sort_games(ascending=True)
-        elif action == sort_za_action:
-            self.sort_games(ascending=False)
+        elif action in sort_actions:
+            self.sort_games(*sort_actions[action])
+        elif action in collection_actions:
+            self.games.set_tag([game], collection_actions[action], action.isChecked())
+        elif action == new_collection_action:
+            self.add_to_new_collection(game)
         elif action == rename_action:
             self.rename_game(game)
 
     def remove_game(self, game):
-        self.games = [g for g in self.games if g != game]
-        self.create_buttons()
-        GameLoader().save_games(self.games)  # Save the updated games list
+        self.games.remove(game)
 
-    def sort_games(self, ascending=True):
-        self.games = sorted(self.games, key=lambda game: game['name'].lower())
-        self.create_buttons()
+    def sort_games(self, mode=SortEngine.NAME, ascending=True):
+        self.sort_engine.set_mode(mode, ascending)
+        self.apply_sort()
+        self.save_config()
+
+    def on_order_changed(self, game_ids):
+        # Dragging a tile turns whatever is shown into the manual order, with the dragged game moved
+        self.sort_engine.set_mode(SortEngine.MANUAL)
+        self.games.reorder(game_ids)
+        self.save_config()
+
+    def add_to_new_collection(self, game):
+        collection, ok = QInputDialog.getText(self.main_window, "New Collection", "Collection name:")
+        if ok and collection.strip():
+            self.games.set_tag([game], collection.strip())
 
     def rename_game(self, game):
         new_name, ok = QInputDialog.getText(self.main_window, "Rename Game", "Enter new name:", QLineEdit.Normal, game['name'])
         if ok and new_name:
-            game['name'] = new_name
-            self.create_buttons()
-            GameLoader().save_games(self.games)  # Save the updated games list
+            self.games.update(game, name=new_name)
 
     def select_background_image(self):
         file_dialog = QFileDialog(self.main_window)
@@ -251,33 +516,25 @@ class ButtonManager:
             self.save_config()
 
     def set_background_image(self, image_path):
-        self.main_window.setStyleSheet(f"""
-            QMainWindow {{
-                background-image: url({image_path});
-                background-position: center;
-                background-repeat: no-repeat;
-                background-size: cover;
-            }}
-        """)
+        # Decoded once and painted from a pre-scaled pixmap, resizing doesn't reload the file
+        if not self.background_manager.set_image(image_path):
+            self.set_default_background_color()
 
     def set_default_background_color(self):
-        self.main_window.setStyleSheet("QMainWindow { background-color: #f0f0f0; }")
-
-    def load_config(self):
-        if os.path.exists(self.CONFIG_FILE):
-            with open(self.CONFIG_FILE, 'r') as file:
-                config = json.load(file)
-                return config.get('sort_order', []), config.get('background_image_path', '')
-        return [], ''
+        self.background_manager.clear()
 
     def save_config(self):
-        config = {
-            'sort_order': self.sort_order,
-            'background_image_path': self.background_image_path
-        }
-        with open(self.CONFIG_FILE, 'w') as file:
-            json.dump(config, file)
+        # Keys this class doesn't manage are kept so other settings survive a save
+        self.config.update({
+            'sort_order': self.sort_engine.to_config(),
+            'background_image_path': self.background_image_path,
+            'background_mode': self.background_mode,
+            'view_mode': self.view_mode,
+            'collection': self.collection,
+            'tile_size': self.button_size.width(),
+            'library_roots': self.library_roots
+        })
+        self.config.save()
 
     def reload_games(self):
-        self.games = GameLoader().load_games()
-        self.create_buttons()
+        self.library.reload()
@@ -0,0 +1,212 @@
+from collections import OrderedDict
+from PyQt5.QtWidgets import QStackedWidget, QTabBar, QVBoxLayout, QWidget
+from PyQt5.QtCore import Qt, QEvent, QPoint, pyqtSignal
+from SortEngine import natural_key
+from Diagnostics import Diagnostics
+
+ALL_GAMES = ""  # Collection key of the whole library
+
+def game_tags(game):
+    return frozenset(game.get('tags') or ())
+
+class CollectionTabs(QWidget):
+    launch_requested = pyqtSignal(object)
+    context_menu_requested = pyqtSignal(object, object, QPoint)
+    order_changed = pyqtSignal(list)  # Ids of the whole library, in the order the user dragged them into
+    collection_changed = pyqtSignal(str)
+    zoom_requested = pyqtSignal(int)  # Steps, positive to zoom in, from Ctrl+wheel over any view
+
+    MAX_WARM_VIEWS = 3  # Views kept alive for quick switching, the least recently shown one goes first
+
+    def __init__(self, create_view, collection=ALL_GAMES, max_warm_views=MAX_WARM_VIEWS, parent=None):
+        super().__init__(parent)
+        self.create_view = create_view
+        self.max_warm_views = max(1, max_warm_views)
+        self.games = {}  # Game id -> record
+        self.order = []  # Ids of the whole library in display order
+        self.tags = {}  # Game id -> its tags when last seen, records are changed in place
+        self.members = {}  # Collection -> ids tagged with it
+        self.filter_ids = None  # Ids passing the search filter, None when not filtering
+        self.views = OrderedDict()  # Collection -> view, least recently shown first
+        self.loaded = False  # No view is built before the first set_games
+        self.collection = collection
+
+        self.tab_bar = QTabBar()
+        self.tab_bar.setDocumentMode(True)
+        self.tab_bar.setExpanding(False)
+        self.tab_bar.currentChanged.connect(self.on_tab_changed)
+        self.stack = QStackedWidget()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(self.tab_bar)
+        layout.addWidget(self.stack)
+
+    def collections(self):
+        return sorted((tag for tag, ids in self.members.items() if ids), key=natural_key)
+
+    def in_collection(self, collection, game_id):
+        return collection == ALL_GAMES or game_id in self.members.get(collection, ())
+
+    def games_in(self, collection):
+        return [self.games[game_id] for game_id in self.order if self.in_collection(collection, game_id)]
+
+    def set_games(self, games, refresh_icons=False):
+        self.games = {game.id: game for game in games}
+        self.order = [game.id for game in games]
+        self.tags = {game.id: game_tags(game) for game in games}
+        self.members = {}
+        for game_id, tags in self.tags.items():
+            for tag in tags:
+                self.members.setdefault(tag, set()).add(game_id)
+        self.refresh_tabs()
+        # Only views that were built are refilled, the others are built from scratch when opened
+        for collection, view in self.views.items():
+            view.set_games(self.games_in(collection), refresh_icons)
+        self.show_collection(self.collection)
+        self.loaded = True
+
+    def add_games(self, games):
+        for game in games:
+            self.games[game.id] = game
+            self.order.append(game.id)
+            self.tags[game.id] = game_tags(game)
+            for tag in self.tags[game.id]:
+                self.members.setdefault(tag, set()).add(game.id)
+        for collection, view in self.views.items():
+            added = [game for game in games if self.in_collection(collection, game.id)]
+            if added:
+                view.add_games(added)
+        self.refresh_tabs()
+
+    def remove_games(self, games):
+        for collection, view in self.views.items():
+            removed = [game for game in games if self.in_collection(collection, game.id)]
+            if removed:
+                view.remove_games(removed)
+        removed_ids = {game.id for game in games}
+        for game_id in removed_ids:
+            self.games.pop(game_id, None)
+            for tag in self.tags.pop(game_id, ()):
+                self.members[tag].discard(game_id)
+        self.order = [game_id for game_id in self.order if game_id not in removed_ids]
+        self.refresh_tabs()
+
+    def update_game(self, game):
+        old_tags = self.tags.get(game.id)
+        if old_tags is None:
+            return
+        new_tags = game_tags(game)
+        self.tags[game.id] = new_tags
+        for tag in old_tags - new_tags:
+            self.members[tag].discard(game.id)
+            if tag in self.views:
+                self.views[tag].remove_games([game])
+        for tag in new_tags - old_tags:
+            self.members.setdefault(tag, set()).add(game.id)
+            if tag in self.views:
+                self.views[tag].add_games([game])
+                self.views[tag].set_order([game_id for game_id in self.order if game_id in self.members[tag]])
+        for collection, view in self.views.items():
+            if collection not in new_tags - old_tags and self.in_collection(collection, game.id):
+                view.update_game(game)
+        if old_tags != new_tags:
+            self.refresh_tabs()
+
+    def set_order(self, game_ids):
+        self.order = [game_id for game_id in game_ids if game_id in self.games]
+        for collection, view in self.views.items():
+            view.set_order([game_id for game_id in self.order if self.in_collection(collection, game_id)])
+
+    def set_filter(self, game_ids):
+        # Views that aren't shown pick the filter up when they're opened
+        self.filter_ids = game_ids
+        view = self.views.get(self.collection)
+        if view is not None:
+            view.set_filter(game_ids)
+
+    def refresh_tabs(self):
+        collections = [ALL_GAMES] + self.collections()
+        if self.collection not in collections:
+            self.collection = ALL_GAMES  # The last game was taken out of the open collection
+        for collection in [collection for collection in self.views if collection not in collections]:
+            self.evict(collection)
+
+        labels = ["All Games"] + [f"{tag} ({len(self.members[tag])})" for tag in collections[1:]]
+        self.tab_bar.blockSignals(True)
+        if [self.tab_bar.tabData(index) for index in range(self.tab_bar.count())] != collections:
+            while self.tab_bar.count():
+                self.tab_bar.removeTab(0)
+            for collection, label in zip(collections, labels):
+                self.tab_bar.setTabData(self.tab_bar.addTab(label), collection)
+        else:
+            for index, label in enumerate(labels):
+                if self.tab_bar.tabText(index) != label:
+                    self.tab_bar.setTabText(index, label)
+        self.tab_bar.setCurrentIndex(collections.index(self.collection))
+        self.tab_bar.blockSignals(False)
+        self.tab_bar.setVisible(len(collections) > 1)  # A library without collections looks as it always did
+        if self.collection not in self.views and self.loaded:
+            self.show_collection(self.collection)  # Its view may not be built yet, e.g. when the open tab was evicted or emptied
+
+    def on_tab_changed(self, index):
+        collection = self.tab_bar.tabData(index)
+        if collection is not None and collection != self.collection:
+            self.show_collection(collection)
+            self.collection_changed.emit(collection)
+
+    def show_collection(self, collection):
+        self.collection = collection
+        view = self.views.get(collection)
+        if view is None:
+            view = self.build_view(collection)
+        self.views.move_to_end(collection)
+        view.set_filter(self.filter_ids)
+        self.stack.setCurrentWidget(view)
+        while len(self.views) > self.max_warm_views:
+            self.evict(next(iter(self.views)))
+
+    def build_view(self, collection):
+        # Built the first time its tab is opened, not when the library loads
+        with Diagnostics.instance().span("collections.build_view", collection=collection):
+            view = self.create_view()
+            view.launch_requested.connect(self.launch_requested)
+            view.context_menu_requested.connect(self.context_menu_requested)
+            view.order_changed.connect(lambda game_ids: self.merge_order(collection, game_ids))
+            view.set_games(self.games_in(collection))
+            view.viewport().installEventFilter(self)  # Ctrl+wheel zooms instead of scrolling
+            self.stack.addWidget(view)
+            self.views[collection] = view
+        return view
+
+    def set_tile_size(self, button_size):
+        # Views built later are created at the new size by create_view
+        for view in self.views.values():
+            view.set_tile_size(button_size)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Wheel and event.modifiers() & Qt.ControlModifier:
+            steps = event.angleDelta().y() // 120
+            if steps:
+                self.zoom_requested.emit(steps)
+            return True
+        return super().eventFilter(watched, event)
+
+    def evict(self, collection):
+        view = self.views.pop(collection)
+        self.stack.removeWidget(view)
+        view.deleteLater()
+        Diagnostics.instance().count("collections.views_evicted")
+
+    def merge_order(self, collection, game_ids):
+        # A collection's new order fills the places its games had in the whole library,
+        # games outside the collection don't move
+        if collection == ALL_GAMES:
+            self.order_changed.emit(game_ids)
+            return
+        order = list(self.order)
+        places = [index for index, game_id in enumerate(order) if game_id in self.members.get(collection, ())]
+        for index, game_id in zip(places, game_ids):
+            order[index] = game_id
+        self.order_changed.emit(order)
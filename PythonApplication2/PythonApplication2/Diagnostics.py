@@ -0,0 +1,121 @@
+import os
+import json
+import logging
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from LauncherConfig import LauncherConfig
+from LauncherPaths import DIAGNOSTICS_LOG_FILE
+
+class NullSpan:
+    # Shared by every span while diagnostics are off, entering and leaving it does nothing
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Span:
+    def __init__(self, diagnostics, name, fields):
+        self.diagnostics = diagnostics
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.diagnostics.record(self.name, time.perf_counter() - self.started, self.fields)
+        return False
+
+class Diagnostics:
+    MAX_LOG_BYTES = 1024 * 1024
+    LOG_BACKUPS = 3
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            enabled = os.environ.get("LAUNCHER_DIAGNOSTICS") == "1" or bool(LauncherConfig.instance().get('diagnostics', False))
+            cls._instance = cls(enabled)
+        return cls._instance
+
+    def __init__(self, enabled=False, log_file=DIAGNOSTICS_LOG_FILE):
+        self.log_file = log_file
+        self.lock = threading.Lock()
+        self.spans = {}  # Name -> [count, total seconds, max seconds, last seconds]
+        self.counters = {}  # Name -> value
+        self.gauges = {}  # Name -> callable read when a snapshot is taken
+        self.logger = None
+        self.enabled = False
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if self.logger is None:
+            # Structured lines, one JSON object per event, rotated so the file never grows unbounded
+            self.logger = logging.getLogger("launcher.diagnostics")
+            self.logger.propagate = False
+            self.logger.setLevel(logging.INFO)
+            try:
+                handler = RotatingFileHandler(self.log_file, maxBytes=self.MAX_LOG_BYTES, backupCount=self.LOG_BACKUPS)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.logger.addHandler(handler)
+            except OSError as e:
+                print(f"Diagnostics log unavailable: {e}")
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, **fields):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, fields)
+
+    def record(self, name, seconds, fields=None):
+        if not self.enabled:
+            return
+        with self.lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = [0, 0.0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            stats[3] = seconds
+        self.log("span", name=name, ms=round(seconds * 1000, 3), **(fields or {}))
+
+    def count(self, name, delta=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + delta
+
+    def register_gauge(self, name, read):
+        # Values that already exist somewhere (cache hits, widget counts) are read on demand instead of copied
+        self.gauges[name] = read
+
+    def event(self, name, **fields):
+        if self.enabled:
+            self.log("event", name=name, **fields)
+
+    def log(self, kind, **fields):
+        if self.logger is not None and self.logger.handlers:
+            self.logger.info(json.dumps(dict(fields, time=round(time.time(), 3), kind=kind), default=str))
+
+    def snapshot(self):
+        with self.lock:
+            spans = {name: list(stats) for name, stats in self.spans.items()}
+            counters = dict(self.counters)
+        gauges = {}
+        for name, read in list(self.gauges.items()):
+            try:
+                gauges[name] = read()
+            except Exception as e:  # A gauge reading a deleted object must not take the overlay down
+                gauges[name] = f"error: {e}"
+        return spans, counters, gauges
@@ -0,0 +1,73 @@
+from PyQt5.QtWidgets import QApplication, QLabel
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QTimer
+from Diagnostics import Diagnostics
+
+def live_timer_count():
+    # Walks the object tree, only done when the overlay refreshes
+    app = QApplication.instance()
+    roots = [app] + [widget for widget in QApplication.topLevelWidgets()]
+    timers = [timer for root in roots for timer in root.findChildren(QTimer)]
+    return sum(1 for timer in timers if timer.isActive())
+
+class DiagnosticsOverlay(QLabel):
+    REFRESH_INTERVAL = 1000  # Milliseconds between refreshes while visible
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.diagnostics = Diagnostics.instance()
+        self.diagnostics.register_gauge("qt.widgets", lambda: len(QApplication.allWidgets()))
+        self.diagnostics.register_gauge("qt.active_timers", live_timer_count)
+        self.enabled_here = False  # True when the overlay switched collection on and should switch it off again
+
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        font.setPointSize(8)
+        self.setFont(font)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 180); color: #e0e0e0; padding: 6px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.setTextFormat(Qt.PlainText)
+        self.hide()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        parent.installEventFilter(self)
+
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+            self.refresh_timer.stop()
+            if self.enabled_here:
+                self.diagnostics.disable()
+                self.enabled_here = False
+            return
+        if not self.diagnostics.enabled:
+            self.diagnostics.enable()
+            self.enabled_here = True
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.refresh_timer.start()
+
+    def refresh(self):
+        spans, counters, gauges = self.diagnostics.snapshot()
+        lines = [f"{'span':<24}{'count':>7}{'last ms':>10}{'avg ms':>10}{'max ms':>10}"]
+        for name, (count, total, longest, last) in sorted(spans.items()):
+            lines.append(f"{name:<24}{count:>7}{last * 1000:>10.1f}{total / count * 1000:>10.1f}{longest * 1000:>10.1f}")
+        lines.append("")
+        for name, value in sorted(dict(counters, **gauges).items()):
+            lines.append(f"{name:<24}{value!s:>17}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.place()
+
+    def place(self):
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 10, 30)
+
+    def eventFilter(self, watched, event):
+        if watched is self.parentWidget() and event.type() == event.Resize and self.isVisible():
+            self.place()
+        return False
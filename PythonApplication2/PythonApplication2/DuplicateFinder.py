@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from FileHashing import full_hash, partial_hash
+from GameCatalog import normalize_path
+from LauncherPaths import HASH_CACHE_FILE
+from Diagnostics import Diagnostics
+
+def hash_job(job):
+    # Runs in a worker process, so it only takes and returns plain values
+    kind, path, size = job
+    try:
+        return partial_hash(path, size) if kind == "partial" else full_hash(path)
+    except OSError:
+        return None
+
+class DuplicateFinder:
+    POOL_THRESHOLD = 8  # Fewer files than this are hashed in this process, starting workers costs more
+    _cache_lock = threading.Lock()
+
+    def __init__(self, cache_file=HASH_CACHE_FILE, max_workers=None, executor=None):
+        self.cache_file = cache_file
+        self.max_workers = max_workers
+        self.cancelled = threading.Event()
+        # Started on the first batch big enough for it and kept for both hashing stages. A pool
+        # passed in belongs to the caller and isn't shut down here
+        self.executor = executor
+        self.owns_executor = executor is None
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def find(self, paths):
+        # Groups of paths with the same content, each group in the order the paths were given.
+        # Spellings of one file (E:/ and e:\, another drive letter for the same volume) are grouped
+        # without reading it, files of a size nobody else has are never read at all
+        try:
+            return self.group(paths)
+        finally:
+            if self.owns_executor and self.executor is not None:
+                self.executor.shutdown(wait=True, cancel_futures=True)
+                self.executor = None
+
+    def group(self, paths):
+        with Diagnostics.instance().span("duplicates.find", files=len(paths)):
+            files = self.identify(paths)
+            cache = self.load_cache()
+            by_size = {}
+            for file in files.values():
+                by_size.setdefault(file["size"], []).append(file)
+            candidates = [file for group in by_size.values() if len(group) > 1 for file in group]
+
+            # Partial hashes split most same-sized files apart, only what's left is read in full
+            self.hash_files(candidates, "partial", cache)
+            by_partial = {}
+            for file in candidates:
+                if file.get("partial") is not None:
+                    by_partial.setdefault((file["size"], file["partial"]), []).append(file)
+            candidates = [file for group in by_partial.values() if len(group) > 1 for file in group]
+            self.hash_files(candidates, "full", cache)
+            if not self.cancelled.is_set():
+                self.save_cache(cache, files.values())
+
+            by_content = {}
+            for file in candidates:
+                if file.get("full") is not None:
+                    by_content.setdefault((file["size"], file["full"]), []).append(file)
+            groups = [group for group in by_content.values() if len(group) > 1]
+            confirmed = {id(file) for group in groups for file in group}
+            groups += [[file] for file in files.values() if len(file["paths"]) > 1 and id(file) not in confirmed]
+            order = {}
+            for index, path in enumerate(paths):
+                order.setdefault(normalize_path(path), index)
+            result = [sorted((path for file in group for path in file["paths"]), key=lambda path: order[normalize_path(path)]) for group in groups]
+            return sorted(result, key=lambda group: order[normalize_path(group[0])])
+
+    def identify(self, paths):
+        # One entry per file on disk, keyed by device and inode where the OS has them
+        files = {}
+        seen = set()
+        for path in paths:
+            key = normalize_path(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            identity = (stat.st_dev, stat.st_ino) if stat.st_ino else key
+            file = files.get(identity)
+            if file is None:
+                files[identity] = {"key": key, "paths": [path], "size": stat.st_size, "mtime": stat.st_mtime_ns}
+            else:
+                file["paths"].append(path)
+        return files
+
+    def hash_files(self, files, kind, cache):
+        # Hashes are reused while a file keeps its size and modification time
+        jobs = []
+        for file in files:
+            cached = cache.get(file["key"])
+            if cached is not None and cached[:2] == [file["size"], file["mtime"]] and cached[2 if kind == "partial" else 3]:
+                file[kind] = cached[2 if kind == "partial" else 3]
+            elif kind not in file:
+                jobs.append(file)
+        if not jobs or self.cancelled.is_set():
+            return
+        arguments = [(kind, file["paths"][0], file["size"]) for file in jobs]
+        if len(jobs) < self.POOL_THRESHOLD and self.executor is None:
+            results = map(hash_job, arguments)
+        else:
+            # Hashing is CPU bound once the file is in the page cache, processes sidestep the GIL
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            results = self.executor.map(hash_job, arguments, chunksize=4)
+        for file, digest in zip(jobs, results):
+            file[kind] = digest
+            if self.cancelled.is_set():
+                break
+
+    def load_cache(self):
+        try:
+            with open(self.cache_file, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save_cache(self, cache, files):
+        # Only the files just searched are kept, with the hashes that still match their size and
+        # modification time. Removed, replaced and long gone files drop out instead of piling up
+        with self._cache_lock:
+            stored = self.load_cache()  # Another finder may have saved in the meantime
+            stored.update(cache)
+            kept = {}
+            for file in files:
+                previous = stored.get(file["key"])
+                if previous is None or previous[:2] != [file["size"], file["mtime"]]:
+                    previous = [None] * 4
+                partial = file.get("partial") or previous[2]
+                full = file.get("full") or previous[3]
+                if partial is not None or full is not None:
+                    kept[file["key"]] = [file["size"], file["mtime"], partial, full]
+            temp_file = self.cache_file + ".tmp"
+            try:
+                with open(temp_file, 'w') as file:
+                    json.dump(kept, file)
+                os.replace(temp_file, self.cache_file)
+            except OSError:
+                pass  # The cache is only an optimisation
@@ -0,0 +1,126 @@
+import os
+from PyQt5.QtWidgets import QDialog, QHBoxLayout, QLabel, QPushButton, QTreeWidget, QTreeWidgetItem, QVBoxLayout
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from DuplicateFinder import DuplicateFinder
+from GameCatalog import normalize_path
+
+class DuplicateThread(QThread):
+    duplicates_found = pyqtSignal(list)
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = list(paths)
+        self.finder = DuplicateFinder()
+
+    def run(self):
+        self.duplicates_found.emit(self.finder.find(self.paths))
+
+    def cancel(self):
+        self.finder.cancel()
+
+class DuplicatesDialog(QDialog):
+    merge_requested = pyqtSignal(list)  # (kept path, [dropped paths]) per group
+
+    def __init__(self, parent, names=None, labels=None):
+        super().__init__(parent)
+        self.setWindowTitle("Duplicate Games")
+        self.setGeometry(120, 120, 800, 400)
+        self.names = names or {}  # Normalized path -> the game's name in the library or the scan results
+        self.labels = labels or {}  # Normalized path -> where the copy is from, e.g. "In library"
+
+        self.layout = QVBoxLayout()
+        self.status_label = QLabel()
+        self.layout.addWidget(self.status_label)
+
+        # One branch per group of identical files. Checked groups are merged into their checked copy
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Keep", "Name", "Source"])
+        self.tree.setColumnHidden(2, not self.labels)
+        self.tree.setRootIsDecorated(True)
+        self.tree.itemChanged.connect(self.on_item_changed)
+        self.layout.addWidget(self.tree)
+
+        self.button_layout = QHBoxLayout()
+        self.merge_button = QPushButton("Merge")
+        self.close_button = QPushButton("Close")
+        self.button_layout.addStretch()
+        self.button_layout.addWidget(self.merge_button)
+        self.button_layout.addWidget(self.close_button)
+        self.layout.addLayout(self.button_layout)
+        self.setLayout(self.layout)
+
+        self.merge_button.clicked.connect(self.merge)
+        self.close_button.clicked.connect(self.reject)
+        self.set_groups([])
+
+    def set_searching(self, searching):
+        self.setWindowTitle("Duplicate Games (searching...)" if searching else "Duplicate Games")
+        if searching:
+            self.status_label.setText("Comparing files...")
+
+    def set_groups(self, groups):
+        self.set_searching(False)
+        self.tree.blockSignals(True)
+        self.tree.clear()
+        for group in groups:
+            try:
+                size = f"{os.path.getsize(group[0]) / (1024 * 1024):.1f} MB"
+            except OSError:
+                size = "size unknown"
+            same = self.same_game(group)
+            title = f"{os.path.basename(group[0])} ({len(group)} copies, {size})"
+            group_item = QTreeWidgetItem(self.tree, [title if same else f"{title}, different games?"])
+            group_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsUserCheckable)
+            group_item.setCheckState(0, Qt.Checked if same else Qt.Unchecked)
+            for index, path in enumerate(group):
+                item = QTreeWidgetItem(group_item, [path, self.name(path), self.labels.get(normalize_path(path), "")])
+                item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsUserCheckable)
+                item.setCheckState(0, Qt.Checked if index == 0 else Qt.Unchecked)
+            group_item.setExpanded(True)
+        self.tree.blockSignals(False)
+        self.tree.resizeColumnToContents(0)
+        self.tree.resizeColumnToContents(1)
+        self.status_label.setText(
+            f"{len(groups)} groups of identical files. Checked groups are merged into their checked copy, with the "
+            "play history and collections of all of them. Copies under different names in different folders are "
+            "often a stub that games built with the same engine share, those groups are left unchecked."
+            if groups else "No duplicate games found."
+        )
+        self.status_label.setWordWrap(True)
+        self.merge_button.setEnabled(bool(groups))
+
+    def name(self, path):
+        return self.names.get(normalize_path(path)) or os.path.splitext(os.path.basename(path))[0]
+
+    def same_game(self, group):
+        # Identical files are only proposed as one game when the copies share a name or a folder name.
+        # Crash handlers and launcher stubs are byte for byte the same across unrelated games
+        names = {self.name(path).casefold() for path in group}
+        folders = {os.path.basename(os.path.dirname(normalize_path(path))) for path in group}
+        return len(names) == 1 or len(folders) == 1
+
+    def on_item_changed(self, item, column):
+        # Exactly one copy per group is kept
+        group_item = item.parent()
+        if group_item is None or column != 0:
+            return
+        self.tree.blockSignals(True)
+        for index in range(group_item.childCount()):
+            child = group_item.child(index)
+            child.setCheckState(0, Qt.Checked if child is item else Qt.Unchecked)
+        self.tree.blockSignals(False)
+
+    def merges(self):
+        merges = []
+        for group_index in range(self.tree.topLevelItemCount()):
+            group_item = self.tree.topLevelItem(group_index)
+            if group_item.checkState(0) != Qt.Checked:
+                continue
+            paths = [group_item.child(index) for index in range(group_item.childCount())]
+            kept = next(item.text(0) for item in paths if item.checkState(0) == Qt.Checked)
+            merges.append((kept, [item.text(0) for item in paths if item.text(0) != kept]))
+        return merges
+
+    def merge(self):
+        self.merge_requested.emit(self.merges())
+        self.accept()
@@ -0,0 +1,30 @@
+import hashlib
+import os
+
+PARTIAL_BYTES = 64 * 1024  # Read from each end of a file for the quick hash
+FULL_CHUNK = 1024 * 1024
+
+def partial_hash(path, size=None):
+    # Head and tail of the file plus its size: enough to tell executables apart without reading
+    # whole game files, which can be gigabytes
+    if size is None:
+        size = os.path.getsize(path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as file:
+        digest.update(file.read(PARTIAL_BYTES))
+        if size > PARTIAL_BYTES:
+            file.seek(max(PARTIAL_BYTES, size - PARTIAL_BYTES))
+            digest.update(file.read(PARTIAL_BYTES))
+    return digest.hexdigest()
+
+def full_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(FULL_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_signature(path):
+    # [size, mtime in ns, partial hash], stored with a game so it can be found again after a move
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns, partial_hash(path, stat.st_size)]
@@ -0,0 +1,217 @@
+import os
+import time
+
+def normalize_path(path):
+    # Same spelling rules as the OS: E:/Games and e:\games are one file on Windows
+    return os.path.normcase(os.path.normpath(path))
+
+class GameRecord:
+    __slots__ = ("id", "name", "path", "extra")
+
+    def __init__(self, game_id, name, path, extra=None):
+        self.id = game_id
+        self.name = name
+        self.path = path
+        self.extra = extra or {}  # Keys this version doesn't know about are kept as they were
+
+    def __getitem__(self, key):
+        # Dict style access so code written against the old list of dicts keeps working
+        if key in ("id", "name", "path"):
+            return getattr(self, key)
+        return self.extra[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        game = {"id": self.id, "name": self.name, "path": self.path}
+        game.update(self.extra)
+        return game
+
+    def __repr__(self):
+        return f"GameRecord({self.id}, {self.name!r}, {self.path!r})"
+
+class GameCatalog:
+    # Events passed to subscribers together with the affected records
+    ADDED = "added"
+    REMOVED = "removed"
+    CHANGED = "changed"
+    REORDERED = "reordered"
+    RESET = "reset"
+
+    def __init__(self, games=()):
+        self.records = {}  # Id -> record, in display order
+        self.by_path = {}  # Normalized path -> id
+        self.by_name = {}  # Casefolded name -> set of ids
+        self.listeners = []
+        self.next_id = 1
+        self.load(games, notify=False)
+
+    def __iter__(self):
+        return iter(list(self.records.values()))
+
+    def __len__(self):
+        return len(self.records)
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def notify(self, event, records):
+        for callback in list(self.listeners):
+            callback(event, records)
+
+    def get(self, game_id):
+        return self.records.get(game_id)
+
+    def find_by_path(self, path):
+        game_id = self.by_path.get(normalize_path(path))
+        return self.records.get(game_id)
+
+    def find_by_name(self, name):
+        return [self.records[game_id] for game_id in self.by_name.get(name.casefold(), ())]
+
+    def load(self, games, notify=True):
+        self.records.clear()
+        self.by_path.clear()
+        self.by_name.clear()
+        games = [game for game in games if isinstance(game, dict) and "name" in game and "path" in game]
+        # Keep ids that were saved with the library so tiles and references survive a reload
+        self.next_id = max([game["id"] for game in games if isinstance(game.get("id"), int)] + [0]) + 1
+        for game in games:
+            game_id = game.get("id")
+            if not isinstance(game_id, int) or game_id in self.records:
+                game_id = None
+            self.insert(game, game_id)
+        if notify:
+            self.notify(self.RESET, list(self.records.values()))
+
+    def insert(self, game, game_id=None):
+        key = normalize_path(game["path"])
+        if key in self.by_path:
+            return None  # Same executable under another spelling
+        if game_id is None:
+            game_id = self.next_id
+            self.next_id += 1
+        extra = {field: value for field, value in game.items() if field not in ("id", "name", "path")}
+        record = GameRecord(game_id, game["name"], game["path"], extra)
+        self.records[game_id] = record
+        self.by_path[key] = game_id
+        self.by_name.setdefault(record.name.casefold(), set()).add(game_id)
+        return record
+
+    def add(self, name, path, **extra):
+        added = self.add_many([dict(extra, name=name, path=path)])
+        return added[0] if added else None
+
+    def add_many(self, games):
+        # New games remember when they were added, for sorting by date added
+        now = round(time.time())
+        added = [record for record in (self.insert(dict({"added": now}, **game)) for game in games) if record is not None]
+        if added:
+            self.notify(self.ADDED, added)
+        return added
+
+    def remove(self, record):
+        self.remove_many([record])
+
+    def remove_many(self, records):
+        removed = []
+        for record in records:
+            if self.records.pop(record.id, None) is None:
+                continue
+            del self.by_path[normalize_path(record.path)]
+            self.discard_name(record)
+            removed.append(record)
+        if removed:
+            self.notify(self.REMOVED, removed)
+
+    def discard_name(self, record):
+        ids = self.by_name.get(record.name.casefold())
+        if ids is not None:
+            ids.discard(record.id)
+            if not ids:
+                del self.by_name[record.name.casefold()]
+
+    def update(self, record, **fields):
+        if self.apply(record, fields):
+            self.notify(self.CHANGED, [record])
+
+    def update_many(self, changes):
+        # (record, fields) pairs, subscribers hear about them as one change
+        changed = [record for record, fields in changes if self.apply(record, fields)]
+        if changed:
+            self.notify(self.CHANGED, changed)
+
+    def apply(self, record, fields):
+        if record.id not in self.records:
+            return False
+        if "name" in fields and fields["name"] != record.name:
+            self.discard_name(record)
+            record.name = fields["name"]
+            self.by_name.setdefault(record.name.casefold(), set()).add(record.id)
+        if "path" in fields and fields["path"] != record.path:
+            if self.by_path.get(normalize_path(fields["path"]), record.id) != record.id:
+                raise ValueError(f"Another game already uses {fields['path']}")
+            del self.by_path[normalize_path(record.path)]
+            record.path = fields["path"]
+            self.by_path[normalize_path(record.path)] = record.id
+        for key, value in fields.items():
+            if key not in ("id", "name", "path"):
+                if value is None:
+                    record.extra.pop(key, None)
+                else:
+                    record.extra[key] = value
+        return True
+
+    def tags(self):
+        # Every collection some game is tagged with
+        return sorted({tag for record in self.records.values() for tag in record.get("tags") or ()}, key=str.casefold)
+
+    def set_tag(self, records, tag, tagged=True):
+        # Tags are stored as a list next to the name and path, games without any have no "tags" key
+        changes = []
+        for record in records:
+            tags = list(record.get("tags") or ())
+            if tagged == (tag in tags):
+                continue
+            if tagged:
+                tags.append(tag)
+            else:
+                tags.remove(tag)
+            changes.append((record, {"tags": tags or None}))
+        self.update_many(changes)
+
+    def merge(self, record, duplicates):
+        # Copies of one game collapse into record: tags and play history add up, the oldest
+        # "added" wins, then the copies are removed
+        duplicates = [duplicate for duplicate in duplicates if duplicate.id != record.id and duplicate.id in self.records]
+        if not duplicates:
+            return
+        group = [record] + duplicates
+        fields = {}
+        tags = list(dict.fromkeys(tag for game in group for tag in game.get("tags") or ()))
+        if tags:
+            fields["tags"] = tags
+        for key in ("launch_count", "playtime"):
+            if any(game.get(key) for game in group):
+                fields[key] = sum(game.get(key) or 0 for game in group)
+        for key, pick in (("last_played", max), ("added", min)):
+            values = [game.get(key) for game in group if game.get(key) is not None]
+            if values:
+                fields[key] = pick(values)
+        self.remove_many(duplicates)
+        self.update(record, **fields)
+
+    def reorder(self, game_ids):
+        # Ids missing from game_ids keep their relative order after the listed ones
+        ordered = {game_id: self.records[game_id] for game_id in game_ids if game_id in self.records}
+        for game_id, record in self.records.items():
+            ordered.setdefault(game_id, record)
+        self.records = ordered
+        self.notify(self.REORDERED, list(self.records.values()))
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self.records.values()]
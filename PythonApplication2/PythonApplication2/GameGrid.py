@@ -0,0 +1,273 @@
+from PyQt5.QtWidgets import QGridLayout, QScrollArea, QWidget
+from PyQt5.QtGui import QColor, QPixmap
+from PyQt5.QtCore import Qt, QEvent, QPoint, QTimer, pyqtSignal
+from IconLoader import IconLoader
+from GameTile import GameTile, GAME_ID_MIME_TYPE
+from Diagnostics import Diagnostics
+
+class GameGrid(QScrollArea):
+    launch_requested = pyqtSignal(object)
+    context_menu_requested = pyqtSignal(object, object, QPoint)
+    order_changed = pyqtSignal(list)  # Ids in the order the user dragged them into
+
+    MAX_COLUMNS = 20
+    NAME_HEIGHT = 30  # Height of the name label under each button
+    RESIZE_DELAY = 60  # Milliseconds of quiet before a resize reflows the grid
+
+    def __init__(self, icon_cache, button_size, parent=None):
+        super().__init__(parent)
+        self.icon_cache = icon_cache
+        self.button_size = button_size
+        self.icon_loader = IconLoader(icon_cache, self)
+        self.icon_loader.icon_loaded.connect(self.on_icon_loaded)
+        self.tiles = {}  # Game id -> tile, kept alive across reloads and resizes
+        self.order = []  # Tiles in display order
+        self.shown = []  # Tiles in order that pass the search filter, the only ones in the layout
+        self.filter_ids = None  # Ids passing the search filter, None when not filtering
+        self.pending_icons = {}  # Path -> id of tiles still showing the placeholder
+        self.columns = 0
+        self.visible_priority = 1
+        self.ratio = self.devicePixelRatioF()  # Icons are loaded at device pixels on HiDPI screens
+        self.placeholder_icon = QPixmap(button_size)
+        self.placeholder_icon.fill(QColor("lightgrey"))
+
+        self.setWidgetResizable(True)
+        self.setStyleSheet("background: transparent;")
+        self.setFrameShape(QScrollArea.NoFrame)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.content = QWidget()
+        self.content.setStyleSheet("background: transparent;")
+        self.grid_layout = QGridLayout(self.content)
+        self.grid_layout.setContentsMargins(0, 0, 10, 0)  # Add right margin to keep distance from scrollbar
+        self.grid_layout.setVerticalSpacing(10)  # Set vertical spacing between rows to 10 pixels
+        self.grid_layout.setHorizontalSpacing(10)
+        self.grid_layout.setAlignment(Qt.AlignTop | Qt.AlignLeft)  # Keep rows packed instead of spreading them out
+        self.setWidget(self.content)
+        self.content.setAcceptDrops(True)
+        self.content.installEventFilter(self)
+
+        # Dragging the window edge fires a burst of resize events, only the last one reflows
+        self.reflow_timer = QTimer(self)
+        self.reflow_timer.setSingleShot(True)
+        self.reflow_timer.setInterval(self.RESIZE_DELAY)
+        self.reflow_timer.timeout.connect(self.reflow)
+
+        self.verticalScrollBar().valueChanged.connect(self.prioritize_visible_icons)
+
+    def set_games(self, games, refresh_icons=False):
+        with Diagnostics.instance().span("grid.set_games", games=len(games)):
+            order = []
+            for game in games:
+                tile = self.tiles.get(game.id)
+                if tile is None:
+                    tile = self.create_tile(game)
+                else:
+                    tile.set_game(game)
+                order.append(tile)
+
+            # Only tiles whose game disappeared are destroyed
+            kept = {tile.game.id for tile in order}
+            self.destroy_tiles([game_id for game_id in self.tiles if game_id not in kept])
+
+            self.icon_loader.cancel()
+            if refresh_icons:
+                self.pending_icons = {tile.game.path: tile.game.id for tile in order}
+            self.order = order
+            self.apply_filter()
+
+    def set_order(self, game_ids):
+        # A sort only permutes the tiles, nothing is created, destroyed or reloaded
+        order = [self.tiles[game_id] for game_id in game_ids if game_id in self.tiles]
+        if order == self.order:
+            return
+        self.order = order
+        self.apply_filter()
+
+    def set_filter(self, game_ids):
+        # Tiles are only hidden or shown, none are created or destroyed while typing
+        if game_ids == self.filter_ids:
+            return
+        self.filter_ids = game_ids
+        self.apply_filter()
+        self.verticalScrollBar().setValue(0)  # Results start at the top
+
+    def passes_filter(self, tile):
+        return self.filter_ids is None or tile.game.id in self.filter_ids
+
+    def apply_filter(self):
+        shown = []
+        for tile in self.order:
+            visible = self.passes_filter(tile)
+            if visible:
+                shown.append(tile)
+            if tile.isHidden() == visible:
+                tile.setVisible(visible)
+        self.shown = shown
+        self.reflow(force=True)
+        self.request_icons()
+
+    def add_games(self, games):
+        # New tiles go at the end, existing ones keep their place in the layout
+        columns = max(1, self.columns)
+        for game in games:
+            tile = self.create_tile(game)
+            self.order.append(tile)
+            if self.passes_filter(tile):
+                index = len(self.shown)
+                self.shown.append(tile)
+                self.grid_layout.addWidget(tile, index // columns, index % columns)
+            else:
+                tile.hide()
+        self.request_icons()
+
+    def remove_games(self, games):
+        self.destroy_tiles([game.id for game in games])
+        self.order = [tile for tile in self.order if tile.game.id in self.tiles]
+        self.shown = [tile for tile in self.shown if tile.game.id in self.tiles]
+        self.reflow(force=True)
+
+    def update_game(self, game):
+        tile = self.tiles.get(game.id)
+        if tile is None:
+            return
+        old_path = tile.path
+        width, height = self.button_size.width(), self.button_size.height()
+        # A changed path, or an icon dropped from memory because the exe was replaced, is loaded again
+        if tile.set_game(game) or self.icon_cache.cached_pixmap(game.path, width, height, self.ratio) is None:
+            self.pending_icons.pop(old_path, None)
+            self.pending_icons[game.path] = game.id
+            self.request_icons()
+
+    def set_tile_size(self, button_size):
+        # Tiles are resized in place. Icons of the new size come from the atlas level for it,
+        # tiles keep showing their current icon until that level is loaded
+        if button_size == self.button_size:
+            return
+        self.button_size = button_size
+        self.placeholder_icon = QPixmap(button_size)
+        self.placeholder_icon.fill(QColor("lightgrey"))
+        self.icon_loader.cancel()
+        self.pending_icons = {}
+        width, height = button_size.width(), button_size.height()
+        with Diagnostics.instance().span("grid.set_tile_size", tiles=len(self.tiles), size=width):
+            for tile in self.order:
+                icon = self.icon_cache.cached_pixmap(tile.game.path, width, height, self.ratio)
+                if icon is None:
+                    self.pending_icons[tile.game.path] = tile.game.id
+                tile.set_tile_size(button_size, icon)
+            self.reflow(force=True)
+        self.request_icons()
+
+    def destroy_tiles(self, game_ids):
+        for game_id in game_ids:
+            tile = self.tiles.pop(game_id, None)
+            if tile is not None:
+                self.pending_icons.pop(tile.path, None)
+                self.grid_layout.removeWidget(tile)
+                tile.deleteLater()
+                Diagnostics.instance().count("grid.tiles_destroyed")
+
+    def create_tile(self, game):
+        width, height = self.button_size.width(), self.button_size.height()
+        # Show the cached icon straight away, otherwise a placeholder until the loader delivers it
+        icon = self.icon_cache.cached_pixmap(game.path, width, height, self.ratio)
+        if icon is None:
+            self.pending_icons[game.path] = game.id
+        tile = GameTile(game, self.button_size, icon if icon is not None else self.placeholder_icon, self.content)
+        tile.launch_requested.connect(self.launch_requested)
+        tile.context_menu_requested.connect(self.context_menu_requested)
+        self.tiles[game.id] = tile
+        Diagnostics.instance().count("grid.tiles_created")
+        return tile
+
+    def column_count(self):
+        spacing = self.grid_layout.horizontalSpacing()
+        margins = self.grid_layout.contentsMargins()
+        available = self.viewport().width() - margins.left() - margins.right()
+        return min(self.MAX_COLUMNS, max(1, (available + spacing) // (self.button_size.width() + spacing)))
+
+    def row_height(self):
+        return self.button_size.height() + self.NAME_HEIGHT + self.grid_layout.verticalSpacing()
+
+    def reflow(self, force=False):
+        # Re-position the existing tiles, nothing is created or destroyed here
+        columns = self.column_count()
+        if columns == self.columns and not force:
+            return
+        self.columns = columns
+        with Diagnostics.instance().span("grid.reflow", tiles=len(self.shown), columns=columns):
+            while self.grid_layout.count():
+                self.grid_layout.takeAt(0)
+            for index, tile in enumerate(self.shown):
+                self.grid_layout.addWidget(tile, index // columns, index % columns)
+
+    def eventFilter(self, watched, event):
+        # QScrollArea filters its own widgets too, starting inside __init__ before content exists
+        if watched is getattr(self, "content", None):
+            if event.type() in (QEvent.DragEnter, QEvent.DragMove):
+                if event.mimeData().hasFormat(GAME_ID_MIME_TYPE):
+                    event.acceptProposedAction()
+                    return True
+            elif event.type() == QEvent.Drop and event.mimeData().hasFormat(GAME_ID_MIME_TYPE):
+                game_id = int(bytes(event.mimeData().data(GAME_ID_MIME_TYPE)).decode())
+                self.drop_game(game_id, event.pos())
+                event.acceptProposedAction()
+                return True
+        return super().eventFilter(watched, event)
+
+    def drop_game(self, game_id, position):
+        dragged = self.tiles.get(game_id)
+        if dragged is None or not self.shown:
+            return
+        # The cell under the cursor, the dragged tile takes the place of the one there
+        columns = max(1, self.columns)
+        spacing = self.grid_layout.horizontalSpacing()
+        column = min(columns - 1, max(0, position.x() // (self.button_size.width() + spacing)))
+        row = max(0, position.y() // self.row_height())
+        index = row * columns + column
+        shown = [tile for tile in self.shown if tile is not dragged]
+        order = [tile for tile in self.order if tile is not dragged]
+        if index < len(shown):
+            order.insert(order.index(shown[index]), dragged)
+        else:
+            order.insert(order.index(shown[-1]) + 1 if shown else len(order), dragged)
+        self.order_changed.emit([tile.game.id for tile in order])
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.reflow_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.reflow()
+
+    def visible_range(self):
+        first_row = self.verticalScrollBar().value() // self.row_height()
+        rows = self.viewport().height() // self.row_height() + 2
+        return first_row * self.columns, (first_row + rows) * self.columns
+
+    def request_icons(self):
+        width, height = self.button_size.width(), self.button_size.height()
+        first, last = self.visible_range()
+        for index, tile in enumerate(self.shown):
+            path = tile.game.path
+            if path in self.pending_icons:
+                priority = self.visible_priority if first <= index < last else 0
+                self.icon_loader.request(path, width, height, priority, self.ratio)
+
+    def prioritize_visible_icons(self):
+        # Newly scrolled-in tiles jump ahead of everything requested before them
+        self.visible_priority += 1
+        width, height = self.button_size.width(), self.button_size.height()
+        first, last = self.visible_range()
+        for tile in self.shown[first:last]:
+            if tile.game.path in self.pending_icons:
+                self.icon_loader.request(tile.game.path, width, height, self.visible_priority, self.ratio)
+
+    def on_icon_loaded(self, path, width, height, pixmap):
+        if (width, height) != (self.button_size.width(), self.button_size.height()):
+            return
+        tile = self.tiles.get(self.pending_icons.pop(path, None))
+        if tile is not None:
+            tile.set_icon(pixmap)
@@ -1,10 +1,13 @@
+from StartupTimer import StartupTimer
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QAction, QFileDialog, QDialog, QVBoxLayout, QListWidget, QListWidgetItem, QDialogButtonBox, QScrollArea
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPalette, QBrush, QPixmap
-from GameLoader import GameLoader
+from GameLibrary import GameLibrary
 from ButtonManager import ButtonManager
+from SortEngine import use_user_collation
 
 class GameLauncher(QMainWindow):
     def __init__(self):
@@ -17,16 +20,20 @@ class GameLauncher(QMainWindow):
 
         self.layout = QVBoxLayout(self.central_widget)
 
-        self.game_loader = GameLoader()
-        self.games = self.game_loader.load_games()
+        startup = StartupTimer.instance()
+        startup.mark("imports")
 
-        self.background_manager = BackgroundManager(self.central_widget, "C:/Users/rich/Documents/4kimg.jpg")
+        # The library is read once here, the window is a client of it from now on, like the CLI
+        self.library = GameLibrary()
+        self.games = self.library.catalog
+        startup.mark("load library")
 
         # Pass the main window (self) to the ButtonManager
-        self.button_manager = ButtonManager(self.layout, self.games, self.central_widget, self)
-        self.button_manager.create_buttons()
+        self.button_manager = ButtonManager(self.layout, self.library, self.central_widget, self)
+        self.background_manager = self.button_manager.background_manager  # Rescales itself on resize
 
         self.create_menu()
+        startup.mark("window")
 
     def create_menu(self):
         menubar = self.menuBar()
@@ -45,12 +52,7 @@ class GameLauncher(QMainWindow):
                 self.show_exe_selection_dialog(exe_files)
 
     def search_exe_files(self, directory):
-        exe_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".exe"):
-                    exe_files.append(os.path.join(root, file))
-        return exe_files
+        return self.button_manager.scan_for_games(directory)
 
     def show_exe_selection_dialog(self, exe_files):
         dialog = QDialog(self)
@@ -78,26 +80,27 @@ class GameLauncher(QMainWindow):
         for index in range(list_widget.count()):
             item = list_widget.item(index)
             if item.isSelected():
-                file_path = item.data(Qt.UserRole)
-                game_name = os.path.splitext(os.path.basename(file_path))[0]
-                new_games.append({"name": game_name, "path": file_path})
+                new_games.append(item.data(Qt.UserRole))
 
-        # Remove duplicates
-        unique_games = {game["path"]: game for game in self.games + new_games}.values()
-        self.games = sorted(unique_games, key=lambda game: game["name"])
+        # Named from their version info, the catalog skips duplicates and only new tiles are created
+        self.library.add_paths(new_games)
 
-        self.game_loader.save_games(self.games)
-        self.button_manager.create_buttons()
+    def closeEvent(self, event):
+        self.button_manager.save_snapshot()
+        self.button_manager.icon_cache.flush()  # Last uses held back by the icon cache
+        super().closeEvent(event)
 
-    def resizeEvent(self, event):
-        try:
-            self.background_manager.update_background()
-        except Exception as e:
-            print(f"Error during resize event: {e}")
-        super().resizeEvent(event)
-
-if __name__ == "__main__":
+def main():
+    use_user_collation()  # Games are sorted in the user's language order
+    # Layout in logical pixels on HiDPI screens, icons are loaded at device pixels from the atlas
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
     app = QApplication(sys.argv)
     launcher = GameLauncher()
     launcher.show()
-    sys.exit(app.exec_())
+    return app.exec_()
+
+if __name__ == "__main__":
+    # Duplicate detection hashes files in worker processes, which start this script again when frozen
+    multiprocessing.freeze_support()
+    sys.exit(main())
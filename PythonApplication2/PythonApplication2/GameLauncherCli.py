@@ -0,0 +1,163 @@
+import argparse
+import multiprocessing
+import os
+import sys
+from GameLibrary import GameLibrary
+from SortEngine import SortEngine, use_user_collation
+
+def print_games(games, output_format):
+    if output_format in ("json", "csv"):
+        from LibraryFormat import WRITERS
+        WRITERS[output_format]((game.to_dict() for game in games), sys.stdout)
+        return
+    for game in games:
+        if output_format == "paths":
+            print(game.path)
+        else:
+            tags = ", ".join(game.get('tags') or ())
+            print(f"{game.id:>6}  {game.name}  {game.path}" + (f"  [{tags}]" if tags else ""))
+
+def resolve_one(library, reference):
+    # Exactly one game or None. A name several games share is refused rather than guessed
+    found = library.resolve(reference)
+    if not found:
+        print(f"No game matches {reference!r}", file=sys.stderr)
+    elif len(found) > 1:
+        print(f"{reference!r} matches {len(found)} games, use id:<id> or the path:", file=sys.stderr)
+        for game in found:
+            print(f"  id:{game.id}  {game.path}", file=sys.stderr)
+        return None
+    return found[0] if found else None
+
+def without_helpers(paths):
+    # Uninstallers, crash handlers and redistributables found by a scan are never added
+    from GameMetadata import HIDDEN, MetadataReader, helper_rank
+    with MetadataReader() as reader:
+        metadata = reader.read_many(paths)
+    return [path for path in paths if helper_rank(path, metadata[path]) != HIDDEN]
+
+def command_scan(library, args):
+    def on_found(games):
+        for game in games:
+            print(game)
+    games = library.scan(args.root, on_found=None if args.add else on_found)
+    if args.add:
+        added = library.add_paths(without_helpers(games), args.collection)
+        print(f"Found {len(games)} executables, added {len(added)} games")
+    return 0
+
+def command_add(library, args):
+    # Folders are scanned, files are added as they are
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths.extend(without_helpers(library.scan(path)))
+        else:
+            paths.append(os.path.abspath(path))
+    added = library.add_paths(paths, args.collection)
+    for game in added:
+        print(f"Added {game.name} ({game.path})")
+    print(f"Added {len(added)} of {len(paths)} games, the rest were already in the library")
+    return 0
+
+def command_remove(library, args):
+    # Nothing is removed unless every reference names exactly one game
+    games = [resolve_one(library, reference) for reference in args.games]
+    if None in games:
+        return 1
+    if args.missing:
+        games += [game for game in library.catalog if not os.path.exists(game.path)]
+    games = list({game.id: game for game in games}.values())
+    library.remove(games)
+    print(f"Removed {len(games)} games")
+    return 0
+
+def command_list(library, args):
+    sort = SortEngine(args.sort, not args.reverse) if args.sort else None
+    games = library.select(args.query, args.collection, sort)
+    if args.reverse and (sort is None or sort.is_manual()):
+        games.reverse()  # The manual order has no direction of its own
+    print_games(games, args.format)
+    return 0
+
+def command_warm_cache(library, args):
+    def on_progress(stage, done, total):
+        if done == total or done % 500 == 0:
+            print(f"{stage}: {done}/{total}", file=sys.stderr)
+    games = library.select(args.query, args.collection)
+    extracted = library.warm_cache(games, icons=not args.no_icons, metadata=not args.no_metadata, workers=args.workers, on_progress=on_progress)
+    print(f"Warmed caches for {len(games)} games, {extracted} icons extracted")
+    return 0
+
+def command_launch(library, args):
+    game = resolve_one(library, args.game)
+    if game is None:
+        return 1
+    if not library.launch(game):
+        return 1
+    if args.wait:
+        library.launcher.wait()  # Playtime is only recorded once the game exits
+    return 0
+
+COMMANDS = {
+    "scan": command_scan,
+    "add": command_add,
+    "remove": command_remove,
+    "list": command_list,
+    "warm-cache": command_warm_cache,
+    "launch": command_launch,
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="GameLauncherCli", description="Manage the game library without the window.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="list the executables under a folder")
+    scan.add_argument("root")
+    scan.add_argument("--add", action="store_true", help="add what was found, except helper executables")
+    scan.add_argument("--collection", help="collection to put added games in")
+
+    add = commands.add_parser("add", help="add executables, folders are scanned")
+    add.add_argument("paths", nargs="+")
+    add.add_argument("--collection", help="collection to put the games in")
+
+    remove = commands.add_parser("remove", help="remove games by id:<id>, path or name")
+    remove.add_argument("games", nargs="*")
+    remove.add_argument("--missing", action="store_true", help="also remove games whose file no longer exists")
+
+    listing = commands.add_parser("list", help="print the library")
+    listing.add_argument("--query", help="only games matching this search")
+    listing.add_argument("--collection", help="only games in this collection")
+    listing.add_argument("--sort", choices=SortEngine.MODES)
+    listing.add_argument("--reverse", action="store_true")
+    listing.add_argument("--format", choices=("table", "paths", "json", "csv"), default="table")
+
+    warm = commands.add_parser("warm-cache", help="read version info and extract icons ahead of time")
+    warm.add_argument("--query", help="only games matching this search")
+    warm.add_argument("--collection", help="only games in this collection")
+    warm.add_argument("--workers", type=int, help="worker processes and threads, one per core by default")
+    warm.add_argument("--no-icons", action="store_true")
+    warm.add_argument("--no-metadata", action="store_true")
+
+    launch = commands.add_parser("launch", help="start a game by id:<id>, path or name")
+    launch.add_argument("game")
+    launch.add_argument("--wait", action="store_true", help="wait for the game to exit and record its playtime")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    use_user_collation()  # Names are listed in the user's language order
+    library = GameLibrary()
+    try:
+        return COMMANDS[args.command](library, args)
+    except BrokenPipeError:
+        # Output piped into head or similar that stopped reading, not an error
+        sys.stdout = open(os.devnull, 'w')
+        return 0
+    finally:
+        library.save()
+
+if __name__ == "__main__":
+    # Version info and hashing run in worker processes, which start this script again when frozen
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from GameCatalog import GameCatalog
+from GameLoader import GameLoader
+from LauncherConfig import LauncherConfig
+from SearchIndex import SearchIndex
+from SortEngine import SortEngine
+from Diagnostics import Diagnostics
+
+class GameLibrary:
+    # The launcher without its window: the catalog and where it's saved, scanning, version info,
+    # icons and launching. Nothing here imports Qt, the window and the CLI are both clients of it.
+    # Icons are the exception, they're decoded with QtGui's image classes, which need no display
+    def __init__(self, games=None, config=None, loader=None):
+        self.config = config or LauncherConfig.instance()
+        self.loader = loader or GameLoader.instance()
+        if isinstance(games, GameCatalog):
+            self.catalog = games
+        else:
+            self.catalog = GameCatalog(self.loader.load_games() if games is None else games)
+        self.search_index = SearchIndex(self.catalog)
+        self.catalog.subscribe(self.on_catalog_changed)
+        self.launcher = None  # Created on the first launch, the window sets its own LaunchService
+
+    def on_catalog_changed(self, event, records):
+        if event != GameCatalog.RESET:
+            self.loader.schedule_save(self.catalog.to_dicts())  # Written once a burst of changes settles
+
+    def reload(self):
+        self.catalog.load(self.loader.load_games())
+
+    def save(self):
+        # Waits until everything scheduled so far is on disk, for processes that exit straight after
+        self.loader.flush()
+
+    def create_scanner(self):
+        from GameScanner import GameScanner
+        return GameScanner(self.config.get('scan_include'), self.config.get('scan_exclude'))
+
+    def scan(self, root, on_found=None):
+        return self.create_scanner().scan(root, on_found=on_found)
+
+    def select(self, query=None, collection=None, sort=None):
+        # Games matching a search query and in a collection, in library order or sorted
+        games = list(self.catalog)
+        if query:
+            ids = self.search_index.search(query)
+            if ids is not None:
+                games = [game for game in games if game.id in ids]
+        if collection:
+            games = [game for game in games if collection in (game.get('tags') or ())]
+        if sort is not None:
+            order = {game_id: index for index, game_id in enumerate(sort.order(games))}
+            games.sort(key=lambda game: order[game.id])
+        return games
+
+    def sort_engine(self):
+        return SortEngine.from_config(self.config.get('sort_order'))
+
+    ID_PREFIX = "id:"
+
+    def resolve(self, reference):
+        # A game by id ("id:42"), path or name, for callers that take what a user typed. Ids are only
+        # taken with the prefix, a game called "1942" is found by its name
+        if isinstance(reference, int):
+            game = self.catalog.get(reference)
+            return [game] if game is not None else []
+        if reference.startswith(self.ID_PREFIX):
+            game_id = reference[len(self.ID_PREFIX):].strip()
+            game = self.catalog.get(int(game_id)) if game_id.isdigit() else None
+            return [game] if game is not None else []
+        game = self.catalog.find_by_path(reference)
+        if game is not None:
+            return [game]
+        return self.catalog.find_by_name(reference)
+
+    def add_paths(self, paths, collection=None):
+        # Games are named after the product in their version info, which is cached, so names read
+        # while scanning or warming the cache aren't parsed again. Paths already in the library are
+        # skipped, but still put in the collection
+        from GameMetadata import MetadataReader, display_name
+        with MetadataReader() as reader:
+            metadata = reader.read_many(paths)
+        games = []
+        for path in paths:
+            fields = {key: metadata[path][key] for key in ("publisher", "version") if metadata[path].get(key)}
+            games.append(dict(fields, name=display_name(path, metadata[path]), path=path))
+        added = self.catalog.add_many(games)
+        if collection:
+            records = [self.catalog.find_by_path(path) for path in paths]
+            self.catalog.set_tag([record for record in records if record is not None], collection)
+        return added
+
+    def remove(self, games):
+        self.catalog.remove_many(games)
+
+    def import_library(self, path, kind=None):
+        # Returns the games that were added and the reader, whose errors list the skipped entries
+        from LibraryFormat import read_library
+        reader = read_library(path, kind)
+        # Games go from the file straight into the catalog, paths already in the library are skipped
+        return self.catalog.add_many(reader), reader
+
+    def export_library(self, path, kind=None):
+        from LibraryFormat import export_library
+        export_library((record.to_dict() for record in self.catalog), path, kind)
+
+    def find_duplicates(self, paths=None):
+        from DuplicateFinder import DuplicateFinder
+        return DuplicateFinder().find(list(paths) if paths is not None else [game.path for game in self.catalog])
+
+    def merge_duplicates(self, merges):
+        # The kept copy takes over the others' collections and play history. It may be a scan result
+        # that isn't in the library yet
+        for kept, dropped in merges:
+            record = self.catalog.find_by_path(kept)
+            if record is None:
+                added = self.add_paths([kept])
+                record = added[0] if added else None
+            if record is not None:
+                self.catalog.merge(record, [duplicate for duplicate in map(self.catalog.find_by_path, dropped) if duplicate is not None])
+
+    def warm_cache(self, games=None, icons=True, metadata=True, workers=None, on_progress=None):
+        # Reads version info and extracts icons for games that aren't cached yet, so a large library
+        # opens without waiting on either. Version info is parsed in a process pool, icons are
+        # extracted on a thread pool since the image work happens in Qt's C++ with the GIL released
+        paths = [game.path for game in (games if games is not None else self.catalog)]
+        with Diagnostics.instance().span("library.warm_cache", games=len(paths)):
+            if metadata:
+                from GameMetadata import MetadataReader
+                with MetadataReader(max_workers=workers) as reader:
+                    reader.read_many(paths)
+                if on_progress is not None:
+                    on_progress("metadata", len(paths), len(paths))
+            if not icons:
+                return 0
+            from IconCache import IconCache
+            icon_cache = IconCache.instance()
+            extracted = 0
+            with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as executor:
+                for done, fresh in enumerate(executor.map(icon_cache.warm, paths), 1):
+                    extracted += fresh
+                    if on_progress is not None:
+                        on_progress("icons", done, len(paths))
+            return extracted
+
+    def launch(self, game):
+        if self.launcher is None:
+            from ProcessLauncher import ProcessLauncher
+            self.launcher = ProcessLauncher(self.catalog, self.config.get('launch_backend', 'subprocess'))
+        return self.launcher.launch(game)
@@ -1,29 +1,109 @@
-import os
-import json
-
-EXECUTED_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_FILE = os.path.join(EXECUTED_DIR, "games_config.json")
+import atexit
+import threading
+import time
+from GameStore import JsonGameStore, SqliteGameStore
+from LauncherConfig import LauncherConfig
+from LauncherPaths import DATABASE_FILE, LIBRARY_FILE
+from LibraryFormat import read_document
+from Diagnostics import Diagnostics
 
 class GameLoader:
-    def __init__(self):
+    SAVE_DELAY = 0.5  # Seconds of quiet before a burst of changes is written
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls(LauncherConfig.instance().get('library_backend', 'json'))
+        return cls._instance
+
+    def __init__(self, backend='json'):
         self.games = []
+        if backend == 'sqlite':
+            # Large libraries: a save only touches the rows that changed
+            self.store = SqliteGameStore(DATABASE_FILE, import_from=JsonGameStore(LIBRARY_FILE))
+        else:
+            self.store = JsonGameStore(LIBRARY_FILE)
+        self.condition = threading.Condition()
+        self.pending = None  # Latest snapshot waiting to be written
+        self.last_change = 0.0
+        self.writing = False
+        self.flushing = False
+        self.writer = None
+        atexit.register(self.flush)
 
     def load_games(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r') as file:
-                try:
-                    self.games = json.load(file)
-                    if not isinstance(self.games, list):
-                        raise ValueError("Invalid format: games should be a list")
-                    for game in self.games:
-                        if not isinstance(game, dict) or "name" not in game or "path" not in game:
-                            raise ValueError("Invalid format: each game should be a dictionary with 'name' and 'path'")
-                except (json.JSONDecodeError, ValueError) as e:
-                    self.games = []
-        else:
-            self.games = []
+        self.flush()  # Anything still queued is newer than what's on disk
+        with Diagnostics.instance().span("library.load"):
+            return self.read_games()
+
+    def read_games(self):
+        self.games = []
+        for path, data in self.store.load_candidates():
+            try:
+                games = self.validate(data)
+            except ValueError as e:
+                print(f"Ignoring {path}: {e}")
+                continue
+            if path != self.store.path:
+                print(f"Recovered game library from {path}")
+            self.store.mark_loaded(path)
+            self.games = games
+            break
         return self.games
 
+    def validate(self, data):
+        # Older libraries are upgraded to the current format, the games are returned as a list
+        try:
+            return read_document(data)
+        except ValueError as e:
+            raise ValueError(f"Invalid format: {e}") from None
+
     def save_games(self, games):
-        with open(CONFIG_FILE, 'w') as file:
-            json.dump(games, file)
+        self.schedule_save(games)
+        self.flush()
+
+    def schedule_save(self, games):
+        # Snapshot on the caller's thread, write later on the writer thread
+        snapshot = [dict(game) for game in games]
+        with self.condition:
+            self.pending = snapshot
+            self.last_change = time.monotonic()
+            if self.writer is None or not self.writer.is_alive():
+                self.writer = threading.Thread(target=self.write_loop, name="GameLoaderWriter", daemon=True)
+                self.writer.start()
+            self.condition.notify_all()
+
+    def write_loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                # Wait until changes stop arriving so a burst becomes a single write
+                while not self.flushing:
+                    remaining = self.last_change + self.SAVE_DELAY - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                games, self.pending = self.pending, None
+                self.writing = True
+            try:
+                with Diagnostics.instance().span("library.save", games=len(games)):
+                    self.store.save(games)
+            except Exception as e:
+                # sqlite3 errors and bad values aren't OSErrors, the writer must outlive every one of
+                # them or the next flush() waits forever
+                print(f"Error saving games: {e!r}")
+            finally:
+                with self.condition:
+                    self.writing = False
+                    self.condition.notify_all()
+
+    def flush(self):
+        with self.condition:
+            self.flushing = True
+            self.condition.notify_all()
+            while self.pending is not None or self.writing:
+                self.condition.wait()
+            self.flushing = False
@@ -0,0 +1,157 @@
+import json
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PEResources import PEFormatError, PEResources
+from GameCatalog import normalize_path
+from LauncherPaths import METADATA_FILE
+from Diagnostics import Diagnostics
+
+# Version strings worth keeping, under the names the launcher stores them as
+VERSION_FIELDS = {"ProductName": "product", "CompanyName": "publisher", "FileDescription": "description", "ProductVersion": "version"}
+
+# Product names the engine or the toolchain puts in every game built with it
+GENERIC_NAMES = {
+    "unity player", "unityplayer", "ue4game", "ue5game", "bootstrappackagedgame", "game",
+    "microsoft® windows® operating system", "microsoft windows operating system", "godot engine",
+}
+# Folder-like exe names that say nothing about the game, the folder above is a better name
+GENERIC_STEMS = {"game", "launcher", "start", "play", "run", "main", "bin", "win64", "win32", "x64", "x86"}
+
+# Normal: a game. Helper: shown after the games. Hidden: never a game, only listed on request
+NORMAL, HELPER, HIDDEN = 0, 1, 2
+# Matched against whole words, so "Observer" isn't a server and "Fire Distance" isn't a redistributable.
+# Words an exe name runs together ("crashhandler", "vcredist") are spelled with optional spaces
+HIDDEN_PATTERN = re.compile(
+    r"\b(crash ?(handler|report|reporter|pad)|unins|uninst|uninstall|uninstaller|vc ?redist|redist|"
+    r"dx ?setup|dx ?web ?setup|directx|dotnet|prereqs?|installer|setup|easy ?anti ?cheat|battl ?eye|"
+    r"be ?service|cef ?sharp|cef ?subprocess|browser ?subprocess)\b"
+)
+HELPER_PATTERN = re.compile(r"\b(launcher|config|settings|helper|updater|patcher|server|editor|benchmark|tools?)\b")
+# CrashReportClient, BEService, unins000 and UE4PrereqSetup_x64 all split into their words
+WORD_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+def read_metadata(path):
+    # Runs in a worker process. The PE header and resource tree are read through a memory map,
+    # so only the pages holding them are touched however large the exe is
+    try:
+        with PEResources(path) as resources:
+            info = resources.version_info()
+    except (OSError, PEFormatError):
+        return {}
+    metadata = {field: info[key] for key, field in VERSION_FIELDS.items() if info.get(key)}
+    if "version" not in metadata and info.get("FixedProductVersion", "0.0.0.0") != "0.0.0.0":
+        metadata["version"] = info["FixedProductVersion"]
+    return metadata
+
+def display_name(path, metadata):
+    # The product name unless it's the engine's, then the description, then the exe or its folder.
+    # Only the name itself is ranked, a launcher.exe with a proper product name is named after it
+    for field in ("product", "description"):
+        name = " ".join((metadata.get(field) or "").split())
+        if name and name.casefold() not in GENERIC_NAMES and name_rank(name) == NORMAL:
+            return name
+    folder, filename = os.path.split(os.path.normpath(path.replace("\\", "/")))
+    stem = os.path.splitext(filename)[0]
+    while stem.casefold() in GENERIC_STEMS and os.path.basename(folder):
+        folder, stem = os.path.dirname(folder), os.path.basename(folder)
+    return stem
+
+def name_rank(text):
+    words = " ".join(WORD_PATTERN.findall(text)).casefold()
+    if HIDDEN_PATTERN.search(words):
+        return HIDDEN
+    if HELPER_PATTERN.search(words):
+        return HELPER
+    return NORMAL
+
+def helper_rank(path, metadata):
+    # The exe name and each version string are ranked on their own, the most helper-like one counts
+    stem = os.path.splitext(os.path.basename(path.replace("\\", "/")))[0]
+    return max(name_rank(text) for text in (stem, metadata.get("product", ""), metadata.get("description", "")))
+
+class MetadataReader:
+    POOL_THRESHOLD = 16  # Fewer exes than this are read in this process, starting workers costs more
+    _cache_lock = threading.Lock()
+
+    def __init__(self, cache_file=METADATA_FILE, max_workers=None, executor=None):
+        self.cache_file = cache_file
+        self.max_workers = max_workers
+        self.cache = None  # Normalized path -> [size, mtime_ns, metadata], loaded on first use
+        self.cancelled = threading.Event()
+        # Worker processes are started once and reused by every batch, spawning them is the
+        # expensive part on Windows. A pool passed in belongs to the caller and isn't shut down here
+        self.executor = executor
+        self.owns_executor = executor is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def close(self):
+        if self.owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def read_many(self, paths):
+        # Path -> metadata for every path, {} for files without version info or that can't be read.
+        # Results are reused while a file keeps its size and modification time
+        with Diagnostics.instance().span("metadata.read_many", files=len(paths)):
+            if self.cache is None:
+                self.cache = self.load_cache()
+            results = {}
+            stale = []
+            for path in dict.fromkeys(paths):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    results[path] = {}
+                    continue
+                signature = [stat.st_size, stat.st_mtime_ns]
+                cached = self.cache.get(normalize_path(path))
+                if cached is not None and cached[:2] == signature:
+                    results[path] = cached[2]
+                else:
+                    stale.append((path, signature))
+            if not stale or self.cancelled.is_set():
+                return results
+            Diagnostics.instance().count("metadata.parsed", len(stale))
+            if len(stale) < self.POOL_THRESHOLD and self.executor is None:
+                parsed = map(read_metadata, [path for path, _ in stale])
+            else:
+                if self.executor is None:
+                    self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                parsed = self.executor.map(read_metadata, [path for path, _ in stale], chunksize=8)
+            for (path, signature), metadata in zip(stale, parsed):
+                results[path] = metadata
+                self.cache[normalize_path(path)] = signature + [metadata]
+                if self.cancelled.is_set():
+                    break
+            self.save_cache()
+            return results
+
+    def load_cache(self):
+        try:
+            with open(self.cache_file, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save_cache(self):
+        with self._cache_lock:
+            stored = self.load_cache()  # Another reader may have saved in the meantime
+            stored.update(self.cache)
+            temp_file = self.cache_file + ".tmp"
+            try:
+                with open(temp_file, 'w') as file:
+                    json.dump(stored, file)
+                os.replace(temp_file, self.cache_file)
+            except OSError:
+                pass  # The cache is only an optimisation
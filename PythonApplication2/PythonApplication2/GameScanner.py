@@ -0,0 +1,132 @@
+import fnmatch
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from LauncherPaths import SCAN_INDEX_FILE
+from Diagnostics import Diagnostics
+
+class GameScanner:
+    DEFAULT_INCLUDE = ["*.exe"]
+    DEFAULT_EXCLUDE = [
+        "_commonredist", "*redist*", "directx", "unins*.exe", "*uninstall*.exe",
+        "$recycle.bin", "system volume information",
+    ]
+
+    _index_lock = threading.Lock()  # Several scanners may finish at once and share the index file
+
+    def __init__(self, include=None, exclude=None, max_workers=8, index_file=SCAN_INDEX_FILE):
+        # Globs are matched case-insensitively against file and directory names
+        self.include = [pattern.lower() for pattern in (include or self.DEFAULT_INCLUDE)]
+        self.exclude = [pattern.lower() for pattern in (exclude if exclude is not None else self.DEFAULT_EXCLUDE)]
+        self.max_workers = max_workers
+        self.index_file = index_file
+        self.cancelled = threading.Event()
+        self.visited = {}  # Normalized directory -> listing, from the last walk
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def signature(self):
+        # A cached listing is only valid for the filters it was made with
+        return sorted(self.include) + ["|"] + sorted(self.exclude)
+
+    def is_included(self, name):
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.include)
+
+    def is_excluded(self, name):
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.exclude)
+
+    def scan(self, root, on_found=None):
+        root = os.path.abspath(root)
+        with Diagnostics.instance().span("scan", root=root):
+            return self.walk(root, on_found)
+
+    def walk(self, root, on_found):
+        index = self.load_index()
+        visited = {}
+        found = []
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            # Every directory is its own task so sibling subtrees are walked in parallel
+            pending = {executor.submit(self.scan_directory, root, index)}
+            while pending and not self.cancelled.is_set():
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is None:
+                        continue
+                    path, entry = result
+                    visited[os.path.normcase(path)] = entry
+                    games = [os.path.join(path, name) for name in entry["files"]]
+                    if games:
+                        found.extend(games)
+                        if on_found is not None:
+                            on_found(games)
+                    for name in entry["dirs"]:
+                        pending.add(executor.submit(self.scan_directory, os.path.join(path, name), index))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        self.visited = visited
+        if not self.cancelled.is_set():
+            self.save_index(root, visited)
+        return found
+
+    def scan_directory(self, path, index):
+        if self.cancelled.is_set():
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        # A directory's mtime changes when entries are added, removed or renamed in it,
+        # so an unchanged directory can reuse its listing without reading it again
+        cached = index.get(os.path.normcase(path))
+        if cached is not None and cached["mtime"] == mtime:
+            return path, cached
+
+        files, dirs = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name.lower()
+                    if self.is_excluded(name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif self.is_included(name) and entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return path, {"mtime": mtime, "files": files, "dirs": dirs}
+
+    def load_index(self):
+        try:
+            with open(self.index_file, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("signature") != self.signature():
+            return {}
+        return data.get("directories", {})
+
+    def save_index(self, root, visited):
+        prefix = os.path.normcase(os.path.abspath(root)).rstrip("\\/")
+        with self._index_lock:
+            directories = self.load_index()
+            # Forget everything previously recorded under this root, then record this walk
+            for key in [key for key in directories if key == prefix or key.startswith(prefix + os.sep)]:
+                del directories[key]
+            directories.update(visited)
+            temp_file = self.index_file + ".tmp"
+            try:
+                with open(temp_file, 'w') as file:
+                    json.dump({"signature": self.signature(), "directories": directories}, file)
+                os.replace(temp_file, self.index_file)
+            except OSError:
+                pass  # The index is only an optimisation
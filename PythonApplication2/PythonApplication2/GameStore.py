@@ -0,0 +1,107 @@
+import os
+import json
+import sqlite3
+import threading
+from LibraryFormat import LibraryFormatError, read_document, write_json
+
+class JsonGameStore:
+    def __init__(self, path):
+        self.path = path
+        self.backup_path = path + ".bak"
+        self.live_is_good = True  # False while the library in use came from the backup
+
+    def load_candidates(self):
+        # The live file first, then the previous good copy if the live one is missing or corrupt
+        for path in (self.path, self.backup_path):
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r') as file:
+                    yield path, json.load(file)
+            except (OSError, json.JSONDecodeError):
+                continue
+
+    def mark_loaded(self, path):
+        self.live_is_good = path == self.path
+
+    def save(self, games):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            write_json(games, file)
+            file.flush()
+            os.fsync(file.fileno())
+        # Keep the last good file as a backup, then swap the new one in atomically.
+        # A corrupt live file is simply overwritten so it never replaces a good backup
+        if self.live_is_good and os.path.exists(self.path):
+            os.replace(self.path, self.backup_path)
+        os.replace(temp_path, self.path)
+        self.live_is_good = True
+        self.sync_directory()
+
+    def sync_directory(self):
+        try:
+            directory = os.open(os.path.dirname(self.path) or ".", os.O_RDONLY)
+        except OSError:
+            return  # Directories can't be opened on Windows, the rename is already durable there
+        try:
+            os.fsync(directory)
+        except OSError:
+            pass
+        finally:
+            os.close(directory)
+
+class SqliteGameStore:
+    def __init__(self, path, import_from=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.saved = {}  # Path -> (position, game) as last written, used to write only what changed
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS games (path TEXT PRIMARY KEY, position INTEGER NOT NULL, data TEXT NOT NULL)"
+        )
+        self.connection.commit()
+        if import_from is not None and self.is_empty():
+            # First run on this backend, carry the existing library over
+            for _, data in import_from.load_candidates():
+                try:
+                    self.save(read_document(data))
+                    break
+                except LibraryFormatError:
+                    continue
+
+    def is_empty(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 0
+
+    def load_candidates(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT position, data FROM games ORDER BY position").fetchall()
+        games = []
+        for position, data in rows:
+            try:
+                games.append(json.loads(data))
+            except json.JSONDecodeError:
+                continue
+        self.saved = {game["path"]: (position, game) for position, game in enumerate(games) if isinstance(game, dict) and "path" in game}
+        yield self.path, games
+
+    def mark_loaded(self, path):
+        pass  # SQLite journals its own writes
+
+    def save(self, games):
+        current = {}
+        changed = []
+        for position, game in enumerate(games):
+            current[game["path"]] = (position, game)
+            if self.saved.get(game["path"]) != (position, game):
+                changed.append((game["path"], position, json.dumps(game)))
+        removed = [(path,) for path in self.saved if path not in current]
+
+        with self.lock:
+            with self.connection:
+                self.connection.executemany("DELETE FROM games WHERE path = ?", removed)
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO games (path, position, data) VALUES (?, ?, ?)", changed
+                )
+        self.saved = current
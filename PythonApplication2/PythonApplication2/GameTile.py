@@ -0,0 +1,107 @@
+from PyQt5.QtWidgets import QApplication, QGraphicsOpacityEffect, QPushButton, QVBoxLayout, QWidget
+from PyQt5.QtGui import QDrag, QIcon
+from PyQt5.QtCore import Qt, QEvent, QMimeData, QPoint, pyqtSignal
+from MarqueeLabel import MarqueeLabel
+
+GAME_ID_MIME_TYPE = "application/x-launcher-game-id"
+
+class GameTile(QWidget):
+    launch_requested = pyqtSignal(object)
+    context_menu_requested = pyqtSignal(object, object, QPoint)
+
+    def __init__(self, game, button_size, icon, parent=None):
+        super().__init__(parent)
+        self.game = game
+        self.name = game.name
+        self.path = game.path
+
+        # Create the button with the icon
+        self.button = QPushButton()
+        self.button.setIcon(QIcon(icon))
+        self.button.setIconSize(button_size)  # Set icon size to button size
+        self.button.setFixedSize(button_size)  # Set button size to match icon size
+        self.missing = None
+        self.set_missing(bool(game.get('missing')))
+        self.button.clicked.connect(lambda: self.launch_requested.emit(self.game))
+        self.button.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.button.customContextMenuRequested.connect(
+            lambda position: self.context_menu_requested.emit(self.game, self.button, position)
+        )
+        self.press_position = None
+        self.button.installEventFilter(self)  # Dragging the button reorders the library
+
+        # Create a scrolling label for the game name, animated by the shared marquee clock
+        self.name_label = MarqueeLabel(game.name)
+        self.name_label.setFixedWidth(button_size.width())  # Adjust label width to match the icon width
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.button)
+        layout.addWidget(self.name_label)
+        layout.setSpacing(0)  # Set spacing to 0
+        layout.setContentsMargins(0, 0, 0, 0)  # Remove margins
+        self.setLayout(layout)
+
+    def set_game(self, game):
+        # Only the label needs touching when the name changed, returns whether the icon is stale
+        if game.name != self.name:
+            self.name = game.name
+            self.name_label.set_text(self.name)
+        self.game = game
+        path_changed = game.path != self.path
+        self.path = game.path
+        self.set_missing(bool(game.get('missing')))
+        return path_changed
+
+    def set_missing(self, missing):
+        # Games whose exe can't be found are greyed out but kept, the watcher may find them again
+        self.button.setToolTip(f"Missing: {self.path}" if missing else "")
+        if missing == self.missing:
+            return
+        self.missing = missing
+        background = "lightgrey" if missing else "white"
+        self.button.setStyleSheet(f"background-color: {background}; padding: 0px; margin: 0px;")  # Remove padding and margin
+        effect = QGraphicsOpacityEffect(self.button) if missing else None
+        if effect is not None:
+            effect.setOpacity(0.4)
+        self.button.setGraphicsEffect(effect)
+
+    def set_tile_size(self, button_size, icon=None):
+        self.button.setIconSize(button_size)
+        self.button.setFixedSize(button_size)
+        self.name_label.setFixedWidth(button_size.width())
+        if icon is not None:
+            self.set_icon(icon)
+
+    def set_icon(self, pixmap):
+        self.button.setIcon(QIcon(pixmap))
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self.press_position = event.pos()
+        elif event.type() == QEvent.MouseButtonRelease:
+            self.press_position = None
+        elif event.type() == QEvent.MouseMove and self.press_position is not None and event.buttons() & Qt.LeftButton:
+            if (event.pos() - self.press_position).manhattanLength() >= QApplication.startDragDistance():
+                self.press_position = None
+                self.start_drag()
+                return True
+        return False
+
+    def start_drag(self):
+        # The button would otherwise stay pressed and launch the game when the drag ends over it
+        self.button.setDown(False)
+        mime_data = QMimeData()
+        mime_data.setData(GAME_ID_MIME_TYPE, str(self.game.id).encode())
+        drag = QDrag(self)
+        drag.setMimeData(mime_data)
+        drag.setPixmap(self.button.grab())
+        drag.setHotSpot(QPoint(self.button.width() // 2, self.button.height() // 2))
+        drag.exec_(Qt.MoveAction)
+
+    def enterEvent(self, event):
+        super().enterEvent(event)
+        self.name_label.set_hovered(True)
+
+    def leaveEvent(self, event):
+        super().leaveEvent(event)
+        self.name_label.set_hovered(False)
@@ -0,0 +1,32 @@
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt5.QtGui import QImage
+
+LEVELS = (32, 64, 128, 256)  # Sizes in device pixels every icon is stored at, smallest first
+
+def level_for(pixels):
+    # The largest level that fits, so an icon is drawn at its own size and never upscaled on paint
+    fitting = [level for level in LEVELS if level <= pixels]
+    return fitting[-1] if fitting else LEVELS[0]
+
+def build_levels(image):
+    # Scaled once to the top level, then each level is halved from the one above it,
+    # which keeps small levels sharp without rescaling the source again for each of them
+    levels = {}
+    for level in reversed(LEVELS):
+        if max(image.width(), image.height()) != level:
+            image = image.scaled(level, level, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        levels[level] = image
+    return levels
+
+def encode(image):
+    # Stored as PNG, a few KB per level instead of width * height * 4 bytes of raw pixels
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data)
+
+def decode(data):
+    image = QImage.fromData(data, "PNG")
+    return None if image.isNull() else image
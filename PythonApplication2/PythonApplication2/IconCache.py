@@ -0,0 +1,201 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from PyQt5.QtGui import QPixmap
+from LauncherPaths import ICON_CACHE_FILE, prepare_user_directory
+from IconExtractor import IconExtractor
+from IconAtlas import LEVELS, build_levels, decode, encode, level_for
+from Diagnostics import Diagnostics
+
+class IconCache:
+    MAX_DISK_BYTES = 64 * 1024 * 1024  # Evict least recently used icons once the pack grows past this
+    MAX_MEMORY_BYTES = 96 * 1024 * 1024  # Decoded pixmaps kept in the in-memory LRU
+    TOUCH_BATCH = 256  # Hits whose last use is held back and written in one transaction
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            prepare_user_directory()  # The pack lives in the per-user folder
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, cache_file=ICON_CACHE_FILE):
+        self.cache_file = cache_file
+        self.memory = OrderedDict()  # (path, level, device pixel ratio) -> pixmap
+        self.memory_bytes = 0
+        self.extractor = IconExtractor()
+        self.lock = threading.Lock()
+        self.memory_hits = 0  # Pixmaps found in the in-memory LRU
+        self.disk_hits = 0  # Found in the atlas and decoded
+        self.misses = 0  # Extracted from the executable
+        self.touched = {}  # (path, level) -> last use not written yet, only eviction reads it
+        self.connection = sqlite3.connect(self.cache_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("DROP TABLE IF EXISTS icons")  # Raw pixels at one size, from before the atlas
+        # Every icon at each of the atlas levels, PNG encoded
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS atlas ("
+            "path TEXT NOT NULL, level INTEGER NOT NULL, "
+            "file_size INTEGER NOT NULL, mtime INTEGER NOT NULL, "
+            "png BLOB NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (path, level))"
+        )
+        self.connection.commit()
+        self.disk_bytes = self.connection.execute("SELECT COALESCE(SUM(LENGTH(png)), 0) FROM atlas").fetchone()[0]
+
+    def file_key(self, path):
+        # Icons are only valid for the exact executable they were extracted from
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return os.path.normcase(os.path.abspath(path)), stat.st_size, stat.st_mtime_ns
+
+    def level(self, width, height, ratio=1.0):
+        # Any tile size maps to the nearest stored level, zooming never rescales an icon
+        return level_for(round(max(width, height) * ratio))
+
+    def memory_key(self, path, width, height, ratio=1.0):
+        return os.path.normcase(os.path.abspath(path)), self.level(width, height, ratio), ratio
+
+    def cached_pixmap(self, path, width, height, ratio=1.0):
+        # Memory only lookup, safe to call on the UI thread without touching the disk
+        key = self.memory_key(path, width, height, ratio)
+        pixmap = self.memory.get(key)
+        if pixmap is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+        return pixmap
+
+    def store_pixmap(self, path, width, height, pixmap, ratio=1.0):
+        key = self.memory_key(path, width, height, ratio)
+        previous = self.memory.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= self.pixmap_bytes(previous)
+        self.memory[key] = pixmap
+        self.memory_bytes += self.pixmap_bytes(pixmap)
+        while self.memory_bytes > self.MAX_MEMORY_BYTES and len(self.memory) > 1:
+            self.memory_bytes -= self.pixmap_bytes(self.memory.popitem(last=False)[1])
+
+    def pixmap_bytes(self, pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+    def to_pixmap(self, image, ratio=1.0):
+        # On the UI thread only. A HiDPI pixmap keeps its device pixels and reports its size in logical pixels
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(ratio)
+        return pixmap
+
+    def load_image(self, path, width, height, ratio=1.0):
+        # Safe to call from worker threads, QPixmap is only created by the caller on the UI thread
+        level = self.level(width, height, ratio)
+        key = self.file_key(path)
+        if key is None:
+            return self.extractor.blank_image(level)
+        image = self.read_image(key, level)
+        if image is not None:
+            return image
+        # Extracted once at the largest level, every level is stored so other zoom steps are hits too
+        with Diagnostics.instance().span("icon.extract"):
+            levels = build_levels(self.extractor.extract_image(path, LEVELS[-1]))
+        self.write_levels(key, levels)
+        return levels[level]
+
+    def warm(self, path):
+        # Extracts and stores every level unless they're already there, without decoding them.
+        # True if the icon had to be extracted
+        key = self.file_key(path)
+        if key is None:
+            return False
+        with self.lock:
+            cached = self.connection.execute(
+                "SELECT COUNT(*) FROM atlas WHERE path = ? AND file_size = ? AND mtime = ?", key
+            ).fetchone()[0]
+        if cached == len(LEVELS):
+            return False
+        with Diagnostics.instance().span("icon.extract"):
+            levels = build_levels(self.extractor.extract_image(path, LEVELS[-1]))
+        self.write_levels(key, levels)
+        return True
+
+    def get_pixmap(self, path, width, height, ratio=1.0):
+        pixmap = self.cached_pixmap(path, width, height, ratio)
+        if pixmap is None:
+            pixmap = self.to_pixmap(self.load_image(path, width, height, ratio), ratio)
+            self.store_pixmap(path, width, height, pixmap, ratio)
+        return pixmap
+
+    def invalidate(self, path):
+        normalized = os.path.normcase(os.path.abspath(path))
+        for key in [key for key in self.memory if key[0] == normalized]:
+            self.memory_bytes -= self.pixmap_bytes(self.memory.pop(key))
+
+    def read_image(self, key, level):
+        path, file_size, mtime = key
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT file_size, mtime, png FROM atlas WHERE path = ? AND level = ?", (path, level)
+            ).fetchone()
+            if row is None or (row[0], row[1]) != (file_size, mtime):
+                # Not cached, or the executable changed since the icon was
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            # A grid full of hits would otherwise commit once per tile
+            self.touched[(path, level)] = time.time()
+            if len(self.touched) >= self.TOUCH_BATCH:
+                self.write_touched()
+                self.connection.commit()
+        return decode(row[2])
+
+    def write_touched(self):
+        # With the lock held
+        self.connection.executemany(
+            "UPDATE atlas SET last_used = ? WHERE path = ? AND level = ?",
+            [(last_used, path, level) for (path, level), last_used in self.touched.items()],
+        )
+        self.touched.clear()
+
+    def flush(self):
+        with self.lock:
+            if self.touched:
+                self.write_touched()
+                self.connection.commit()
+
+    def write_levels(self, key, levels):
+        path, file_size, mtime = key
+        now = time.time()
+        rows = [(path, level, file_size, mtime, encode(image), now) for level, image in levels.items()]
+        with self.lock:
+            previous = self.connection.execute(
+                "SELECT COALESCE(SUM(LENGTH(png)), 0) FROM atlas WHERE path = ?", (path,)
+            ).fetchone()[0]
+            self.write_touched()  # Eviction goes by last use, so it has to be up to date
+            self.connection.execute("DELETE FROM atlas WHERE path = ?", (path,))
+            self.connection.executemany("INSERT INTO atlas VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.disk_bytes += sum(len(row[4]) for row in rows) - previous
+            self.evict()
+            self.connection.commit()
+
+    def evict(self):
+        # Whole icons go, a game never ends up with some levels cached and others not
+        while self.disk_bytes > self.MAX_DISK_BYTES:
+            rows = self.connection.execute(
+                "SELECT path, SUM(LENGTH(png)) FROM atlas GROUP BY path ORDER BY MAX(last_used) LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self.disk_bytes = 0
+                break
+            for path, size in rows:
+                self.connection.execute("DELETE FROM atlas WHERE path = ?", (path,))
+                self.disk_bytes -= size
+                if self.disk_bytes <= self.MAX_DISK_BYTES:
+                    break
+
+    def clear_memory(self):
+        self.memory.clear()
+        self.memory_bytes = 0
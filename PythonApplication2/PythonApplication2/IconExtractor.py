@@ -0,0 +1,30 @@
+from PyQt5.QtGui import QImage
+from PyQt5.QtCore import Qt
+from PEResources import PEResources, PEFormatError
+
+class IconExtractor:
+    def extract_image(self, path, size=256):
+        # Decode the executable's own icon straight from its resource section, no GDI involved
+        try:
+            with PEResources(path) as resources:
+                found = resources.icon_image(size)
+        except (OSError, PEFormatError):
+            found = None
+        if found is None:
+            return self.blank_image(size)
+        data, image_format = found
+        image = QImage.fromData(data, image_format.upper())
+        if image.isNull():
+            return self.blank_image(size)
+        return image
+
+    def extract_scaled(self, path, width, height):
+        image = self.extract_image(path, max(width, height))
+        if image.width() == width and image.height() == height:
+            return image
+        return image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    def blank_image(self, size):
+        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        return image
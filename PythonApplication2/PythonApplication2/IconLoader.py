@@ -0,0 +1,115 @@
+import heapq
+import itertools
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPixmap
+
+class IconJob(QRunnable):
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+
+    def run(self):
+        # Each job takes whatever request currently has the highest priority
+        item = self.loader.take_next()
+        if item is None:
+            return
+        generation, (path, width, height, ratio) = item
+        image = self.loader.icon_cache.load_image(path, width, height, ratio)
+        self.loader.image_ready.emit(generation, path, width, height, ratio, image)
+
+class IconLoader(QObject):
+    icon_loaded = pyqtSignal(str, int, int, QPixmap)
+    image_ready = pyqtSignal(int, str, int, int, float, QImage)  # Emitted from worker threads
+
+    def __init__(self, icon_cache, parent=None):
+        super().__init__(parent)
+        self.icon_cache = icon_cache
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(4, QThread.idealThreadCount())))
+        self.lock = threading.Lock()
+        self.queue = []
+        self.pending = {}
+        self.counter = itertools.count()
+        self.generation = 0
+        self.image_ready.connect(self.on_image_ready)
+
+    def request(self, path, width, height, priority=0, ratio=1.0):
+        key = (path, width, height, ratio)
+        with self.lock:
+            if key in self.pending and self.pending[key] >= priority:
+                return
+            self.pending[key] = priority
+            heapq.heappush(self.queue, (-priority, next(self.counter), key))
+        self.pool.start(IconJob(self))
+
+    def take_next(self):
+        with self.lock:
+            while self.queue:
+                priority, _, key = heapq.heappop(self.queue)
+                if self.pending.get(key) == -priority:
+                    del self.pending[key]
+                    return self.generation, key
+                # Stale entry left behind when a request was re-prioritised
+        return None
+
+    def cancel(self):
+        # Drop everything queued; jobs already running finish but their results are ignored
+        with self.lock:
+            self.generation += 1
+            self.queue.clear()
+            self.pending.clear()
+        self.pool.clear()
+
+    def on_image_ready(self, generation, path, width, height, ratio, image):
+        if generation != self.generation:
+            return
+        pixmap = self.icon_cache.to_pixmap(image, ratio)
+        self.icon_cache.store_pixmap(path, width, height, pixmap, ratio)
+        self.icon_loaded.emit(path, width, height, pixmap)
+
+class LazyIconProvider(QObject):
+    icon_ready = pyqtSignal(str)
+
+    def __init__(self, icon_cache, icon_size, parent=None, ratio=1.0):
+        super().__init__(parent)
+        self.icon_cache = icon_cache
+        self.icon_size = icon_size
+        self.ratio = ratio  # Device pixel ratio of the screen the icons are shown on
+        self.icon_loader = IconLoader(icon_cache, self)
+        self.icon_loader.icon_loaded.connect(self.on_icon_loaded)
+        self.requested = set()  # Paths with an icon request in flight
+        self.stale = set()  # Paths whose cached icon should be revalidated on next paint
+        self.request_priority = 0
+        self.placeholder_icon = QPixmap(icon_size)
+        self.placeholder_icon.fill(QColor("lightgrey"))
+
+    def set_icon_size(self, icon_size, ratio=1.0):
+        # Icons of the new size that are already in memory show at once, the rest load as they're painted
+        self.icon_size = icon_size
+        self.ratio = ratio
+        self.placeholder_icon = QPixmap(icon_size)
+        self.placeholder_icon.fill(QColor("lightgrey"))
+        self.reset()
+
+    def reset(self, stale_paths=()):
+        self.icon_loader.cancel()
+        self.requested.clear()
+        self.stale = set(stale_paths)
+
+    def icon(self, path):
+        # Views only ask for rows they paint, so icons are loaded for visible rows only
+        width, height = self.icon_size.width(), self.icon_size.height()
+        pixmap = self.icon_cache.cached_pixmap(path, width, height, self.ratio)
+        if (pixmap is None or path in self.stale) and path not in self.requested:
+            self.requested.add(path)
+            self.request_priority += 1  # The most recently painted rows load first
+            self.icon_loader.request(path, width, height, self.request_priority, self.ratio)
+        return pixmap if pixmap is not None else self.placeholder_icon
+
+    def on_icon_loaded(self, path, width, height, pixmap):
+        if (width, height) != (self.icon_size.width(), self.icon_size.height()):
+            return
+        self.requested.discard(path)
+        self.stale.discard(path)
+        self.icon_ready.emit(path)
@@ -0,0 +1,26 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+from ProcessLauncher import ProcessLauncher
+
+class LaunchService(QObject, ProcessLauncher):
+    launched = pyqtSignal(object, float)  # Game, seconds until the process existed
+    exited = pyqtSignal(object, float)  # Game, seconds it ran
+    launch_failed = pyqtSignal(object, str)
+    session_ended = pyqtSignal(int, float)  # Emitted from watcher threads, handled on the GUI thread
+
+    def __init__(self, catalog, backend='subprocess', parent=None):
+        # PyQt passes the keyword arguments QObject doesn't take on to ProcessLauncher
+        super().__init__(parent=parent, catalog=catalog, backend=backend)
+        self.session_ended.connect(self.finish_session)
+
+    def process_exited(self, game_id, duration):
+        # The catalog and the views it notifies belong to the GUI thread
+        self.session_ended.emit(game_id, duration)
+
+    def report_launched(self, game, spawn_time):
+        self.launched.emit(game, spawn_time)
+
+    def report_failed(self, game, error):
+        self.launch_failed.emit(game, error)
+
+    def report_exited(self, game, duration):
+        self.exited.emit(game, duration)
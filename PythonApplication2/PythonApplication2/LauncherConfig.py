@@ -0,0 +1,40 @@
+import os
+import json
+from LauncherPaths import CONFIG_FILE, prepare_user_directory
+
+class LauncherConfig:
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            prepare_user_directory()  # First thing every entry point reads, settings from old locations are copied over
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self.values = self.load()
+
+    def load(self):
+        if os.path.exists(self.config_file):
+            with open(self.config_file, 'r') as file:
+                try:
+                    values = json.load(file)
+                except json.JSONDecodeError:
+                    return {}
+            if isinstance(values, dict):
+                return values
+        return {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def update(self, values):
+        self.values.update(values)
+
+    def save(self):
+        temp_file = self.config_file + ".tmp"
+        with open(temp_file, 'w') as file:
+            json.dump(self.values, file)
+        os.replace(temp_file, self.config_file)
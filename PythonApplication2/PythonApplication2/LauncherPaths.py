@@ -0,0 +1,80 @@
+import os
+import shutil
+import sys
+
+APP_NAME = "CustomGameLauncher"
+EXECUTED_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def user_directory():
+    # LAUNCHER_HOME overrides the location, e.g. for a portable install or a test run
+    override = os.environ.get("LAUNCHER_HOME")
+    if override:
+        return os.path.abspath(override)
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Roaming")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Application Support")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, APP_NAME)
+
+# Settings, the library and every cache live in one per-user folder, never next to the code or in the cwd
+USER_DIR = user_directory()
+CONFIG_FILE = os.path.join(USER_DIR, "config.json")
+LIBRARY_FILE = os.path.join(USER_DIR, "library.json")
+DATABASE_FILE = os.path.join(USER_DIR, "library.db")
+ICON_CACHE_FILE = os.path.join(USER_DIR, "icon_cache.db")
+SCAN_INDEX_FILE = os.path.join(USER_DIR, "scan_index.json")
+HASH_CACHE_FILE = os.path.join(USER_DIR, "hash_cache.json")
+METADATA_FILE = os.path.join(USER_DIR, "metadata.json")
+SNAPSHOT_FILE = os.path.join(USER_DIR, "grid_snapshot.png")
+DIAGNOSTICS_LOG_FILE = os.path.join(USER_DIR, "diagnostics.log")
+
+# Where earlier versions kept their files, first match wins. Only next to the code: a config.json or
+# config.txt in whatever folder the CLI happens to be run from belongs to something else
+LEGACY_CONFIG_FILES = [os.path.join(EXECUTED_DIR, "config.json")]
+LEGACY_LIBRARY_FILE = os.path.join(EXECUTED_DIR, "games_config.json")
+LEGACY_DATABASE_FILE = os.path.join(EXECUTED_DIR, "games_config.db")
+LEGACY_PATH_LISTS = [os.path.join(EXECUTED_DIR, "config.txt")]
+
+_prepared = False
+
+def prepare_user_directory():
+    # Creates the folder and carries files over from the old locations the first time it's used.
+    # The old files are copied rather than moved so an older version still finds them
+    global _prepared
+    if _prepared:
+        return
+    _prepared = True
+    try:
+        os.makedirs(USER_DIR, exist_ok=True)
+        migrate_legacy_files()
+    except OSError as e:
+        print(f"Error preparing {USER_DIR}: {e}")
+
+def migrate_legacy_files():
+    if not os.path.exists(CONFIG_FILE):
+        copy_first(LEGACY_CONFIG_FILES, CONFIG_FILE)
+    if not os.path.exists(DATABASE_FILE) and os.path.exists(LEGACY_DATABASE_FILE):
+        for suffix in ("", "-wal", "-shm"):  # Whatever wasn't checkpointed yet lives in the WAL
+            if os.path.exists(LEGACY_DATABASE_FILE + suffix):
+                shutil.copy2(LEGACY_DATABASE_FILE + suffix, DATABASE_FILE + suffix)
+    if os.path.exists(LIBRARY_FILE):
+        return
+    # Old libraries are read by the new format as they are, they're upgraded on the next save
+    if copy_first([LEGACY_LIBRARY_FILE], LIBRARY_FILE):
+        return
+    path_list = next((path for path in LEGACY_PATH_LISTS if os.path.exists(path)), None)
+    if path_list is not None:
+        from LibraryFormat import export_library, read_library
+        reader = read_library(path_list)
+        export_library(reader, LIBRARY_FILE)
+        print(f"Imported {reader.count} games from {path_list} into {LIBRARY_FILE}")
+
+def copy_first(sources, target):
+    for source in sources:
+        if os.path.exists(source):
+            shutil.copy2(source, target)
+            print(f"Copied {source} to {target}")
+            return True
+    return False
@@ -0,0 +1,269 @@
+import csv
+import json
+import os
+from ProcessLauncher import join_arguments
+
+FORMAT_NAME = "custom-game-launcher-library"
+FORMAT_VERSION = 1  # Version 0 is the bare list of games written before the format had a header
+
+# Optional fields the launcher itself writes and the types they must have. Any other field is kept as it is
+FIELD_TYPES = {
+    "id": (int,),
+    "tags": (list,),
+    "arguments": (str, list),
+    "env": (dict,),
+    "cwd": (str,),
+    "added": (int, float),
+    "last_played": (int, float),
+    "launch_count": (int,),
+    "playtime": (int, float),
+    "last_spawn_ms": (int, float),
+    "missing": (bool,),
+    "file_signature": (list,),
+    "publisher": (str,),
+    "version": (str,),
+}
+CSV_COLUMNS = ["id", "name", "path", "tags", "arguments", "cwd", "added", "last_played", "launch_count", "playtime"]
+CSV_NUMBERS = {"id", "added", "last_played", "launch_count", "playtime"}
+TAG_SEPARATOR = ";"
+
+class LibraryFormatError(ValueError):
+    pass
+
+def validate_game(game):
+    if not isinstance(game, dict):
+        raise LibraryFormatError("each game should be a dictionary")
+    for field in ("name", "path"):
+        if not isinstance(game.get(field), str) or not game[field]:
+            raise LibraryFormatError(f"each game should have a '{field}' string")
+    for field, types in FIELD_TYPES.items():
+        value = game.get(field)
+        # bool is an int subclass, a count or a timestamp of True is still wrong
+        if value is not None and (not isinstance(value, types) or (isinstance(value, bool) and bool not in types)):
+            raise LibraryFormatError(f"'{field}' of {game['path']} should be {' or '.join(t.__name__ for t in types)}")
+    if any(not isinstance(tag, str) for tag in game.get("tags") or ()):
+        raise LibraryFormatError(f"tags of {game['path']} should be strings")
+    if isinstance(game.get("arguments"), list) and any(not isinstance(arg, str) for arg in game["arguments"]):
+        raise LibraryFormatError(f"arguments of {game['path']} should be strings")
+    return game
+
+def check_header(header):
+    if header.get("format", FORMAT_NAME) != FORMAT_NAME:
+        raise LibraryFormatError(f"not a game library ({header.get('format')!r})")
+    version = header.get("version", 0)
+    if not isinstance(version, int) or version > FORMAT_VERSION:
+        raise LibraryFormatError(f"written by a newer version of the launcher (format version {version})")
+    return version
+
+def upgrade_game(game, version):
+    # One step per format version, so a library of any age reaches the current one. Version 1 only
+    # added the header, games from version 0 need no changes
+    if isinstance(game, dict) and "args" in game and "arguments" not in game:
+        # What the launcher read before the format named the field, in libraries of either version
+        game = dict(game, arguments=game["args"])
+        del game["args"]
+    return game
+
+def read_document(data):
+    # A whole library that was already parsed, e.g. by a store. Any invalid game rejects the whole document
+    if isinstance(data, list):
+        version, games = 0, data
+    elif isinstance(data, dict) and isinstance(data.get("games"), list):
+        version, games = check_header(data), data["games"]
+    else:
+        raise LibraryFormatError("games should be a list")
+    return [validate_game(upgrade_game(game, version)) for game in games]
+
+def document_header():
+    return {"format": FORMAT_NAME, "version": FORMAT_VERSION}
+
+class JsonStream:
+    # Pulls one JSON value at a time out of a file so a list of any length is never held in memory at once
+    CHUNK = 64 * 1024
+    decoder = json.JSONDecoder()
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.file.read(self.CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ""
+
+    def take(self, expected):
+        char = self.peek()
+        if char not in expected:
+            raise LibraryFormatError(f"expected {expected!r}, found {char or 'end of file'!r}")
+        self.position += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number cut off at the end of the buffer still decodes, only trust it with more input behind it
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise LibraryFormatError(f"invalid JSON: {e}") from None
+            self.fill()
+
+    def items(self):
+        self.take("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.take(",]") == "]":
+                return
+
+def stream_json(file):
+    # Both the current document and the old bare list. The header is expected before "games",
+    # which is how export_library writes it
+    stream = JsonStream(file)
+    if stream.peek() == "[":
+        yield 0, stream.items()
+        return
+    stream.take("{")
+    header = {}
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.take(":")
+        if key == "games":
+            yield check_header(header), stream.items()
+        else:
+            header[key] = stream.value()
+        if stream.take(",}") == "}":
+            return
+    stream.take("}")
+
+def read_json(file):
+    for version, games in stream_json(file):
+        for game in games:
+            yield upgrade_game(game, version)
+
+def read_csv(file):
+    for row in csv.DictReader(file):
+        game = {}
+        for column, value in row.items():
+            if column is None or value is None or value == "":
+                continue  # Extra cells without a header, or empty ones
+            column = column.strip()
+            if column == "tags":
+                value = [tag.strip() for tag in value.split(TAG_SEPARATOR) if tag.strip()]
+            elif column in CSV_NUMBERS:
+                value = parse_number(value)
+            game[column] = value
+        if "path" in game and "name" not in game:
+            game["name"] = os.path.splitext(os.path.basename(game["path"]))[0]
+        yield game
+
+def parse_number(text):
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            continue
+    return text  # Left as text, validation reports it
+
+def read_path_list(file):
+    # config.txt of the first launcher: one executable per line
+    for line in file:
+        path = line.strip()
+        if path and not path.startswith("#"):
+            yield {"name": os.path.splitext(os.path.basename(path))[0], "path": path}
+
+def library_kind(path):
+    extension = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".txt": "paths"}.get(extension, "json")
+
+class LibraryReader:
+    # Iterates the valid games of a file one at a time. Invalid entries are skipped and noted in errors
+    READERS = {"json": read_json, "csv": read_csv, "paths": read_path_list}
+
+    def __init__(self, path, kind=None):
+        self.path = path
+        self.kind = kind or library_kind(path)
+        self.count = 0
+        self.errors = []  # (entry number, message)
+
+    def __iter__(self):
+        # A file that breaks off halfway still yields the games before the break, the break is an error
+        with open(self.path, 'r', encoding='utf-8-sig', newline='') as file:
+            games = self.READERS[self.kind](file)
+            number = 0
+            while True:
+                number += 1
+                try:
+                    game = next(games)
+                except StopIteration:
+                    return
+                except (LibraryFormatError, csv.Error, UnicodeDecodeError) as e:
+                    self.errors.append((number, str(e)))
+                    return
+                try:
+                    validate_game(game)
+                except LibraryFormatError as e:
+                    self.errors.append((number, str(e)))
+                    continue
+                self.count += 1
+                yield game
+
+def read_library(path, kind=None):
+    return LibraryReader(path, kind)
+
+def write_json(games, file):
+    # Header first, then one game per line, so a stream reader knows the version before the first game
+    header = json.dumps(document_header())[:-1]
+    file.write(header + ', "games": [')
+    for index, game in enumerate(games):
+        file.write(",\n" if index else "\n")
+        file.write(json.dumps(game))
+    file.write("\n]}\n")
+
+def write_csv(games, file):
+    writer = csv.DictWriter(file, CSV_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for game in games:
+        row = dict(game)
+        if "tags" in row:
+            row["tags"] = TAG_SEPARATOR.join(row["tags"])
+        if isinstance(row.get("arguments"), list):
+            row["arguments"] = join_arguments(row["arguments"])  # Split again the same way when launching
+        writer.writerow(row)
+
+def write_path_list(games, file):
+    for game in games:
+        file.write(game["path"] + "\n")
+
+WRITERS = {"json": write_json, "csv": write_csv, "paths": write_path_list}
+
+def export_library(games, path, kind=None):
+    # Games can be any iterable of dicts, they're written as they come. CSV and the path list only
+    # keep the columns they have, JSON keeps every field
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8', newline='') as file:
+        WRITERS[kind or library_kind(path)](games, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
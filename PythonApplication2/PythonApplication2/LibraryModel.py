@@ -0,0 +1,126 @@
+from PyQt5.QtCore import QAbstractListModel, QMimeData, QModelIndex, Qt, pyqtSignal
+from IconLoader import LazyIconProvider
+from GameTile import GAME_ID_MIME_TYPE
+
+class LibraryModel(QAbstractListModel):
+    GameRole = Qt.UserRole + 1
+    order_changed = pyqtSignal(list)  # Ids in the order the user dragged them into
+
+    def __init__(self, icon_cache, icon_size, parent=None, ratio=1.0):
+        super().__init__(parent)
+        self.icons = LazyIconProvider(icon_cache, icon_size, self, ratio)
+        self.icons.icon_ready.connect(self.on_icon_ready)
+        self.games = []
+        self.rows = {}  # Game id -> row
+        self.path_ids = {}  # Path -> game id, to route loaded icons back to their row
+
+    def set_games(self, games, refresh_icons=False):
+        self.beginResetModel()
+        self.games = list(games)
+        self.rows = {game.id: row for row, game in enumerate(self.games)}
+        self.path_ids = {game.path: game.id for game in self.games}
+        self.endResetModel()
+        self.icons.reset([game.path for game in self.games] if refresh_icons else ())
+
+    def add_games(self, games):
+        first = len(self.games)
+        self.beginInsertRows(QModelIndex(), first, first + len(games) - 1)
+        for row, game in enumerate(games, first):
+            self.games.append(game)
+            self.rows[game.id] = row
+            self.path_ids[game.path] = game.id
+        self.endInsertRows()
+
+    def remove_games(self, games):
+        # Remove from the bottom up so earlier row numbers stay valid
+        for row in sorted((self.rows[game.id] for game in games if game.id in self.rows), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.games[row]
+            self.endRemoveRows()
+        self.rows = {game.id: row for row, game in enumerate(self.games)}
+        self.path_ids = {game.path: game.id for game in self.games}
+
+    def update_game(self, game):
+        row = self.rows.get(game.id)
+        if row is not None:
+            if self.path_ids.get(game.path) != game.id:
+                # The executable moved, forget the old path so its icon is loaded afresh
+                self.path_ids = {path: game_id for path, game_id in self.path_ids.items() if game_id != game.id}
+                self.path_ids[game.path] = game.id
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def set_icon_size(self, icon_size, ratio=1.0):
+        self.icons.set_icon_size(icon_size, ratio)
+        if self.games:
+            self.dataChanged.emit(self.index(0), self.index(len(self.games) - 1), [Qt.DecorationRole])
+
+    def set_order(self, game_ids):
+        # A sort is a permutation: rows move, persistent indexes follow, nothing is reset or reloaded
+        games = [self.games[self.rows[game_id]] for game_id in game_ids if game_id in self.rows]
+        if games == self.games:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_ids = [self.games[index.row()].id for index in old_indexes]
+        self.games = games
+        self.rows = {game.id: row for row, game in enumerate(self.games)}
+        self.changePersistentIndexList(old_indexes, [self.index(self.rows[game_id]) for game_id in old_ids])
+        self.layoutChanged.emit()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return super().flags(index) | Qt.ItemIsDragEnabled | Qt.ItemIsDropEnabled
+
+    def mimeTypes(self):
+        return [GAME_ID_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        mime_data = QMimeData()
+        if indexes:
+            mime_data.setData(GAME_ID_MIME_TYPE, str(self.games[indexes[0].row()].id).encode())
+        return mime_data
+
+    def supportedDropActions(self):
+        # Copy, so the view never removes the dragged row itself, the new order comes back through the catalog
+        return Qt.CopyAction
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if not data.hasFormat(GAME_ID_MIME_TYPE):
+            return False
+        game_id = int(bytes(data.data(GAME_ID_MIME_TYPE)).decode())
+        if game_id not in self.rows:
+            return False
+        target = parent.row() if parent.isValid() else (row if row >= 0 else len(self.games))
+        ids = [game.id for game in self.games]
+        target_id = ids[target] if target < len(ids) else None
+        ids.remove(game_id)
+        ids.insert(ids.index(target_id) if target_id in ids else len(ids), game_id)
+        self.order_changed.emit(ids)
+        return True
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.games)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.games):
+            return None
+        game = self.games[index.row()]
+        if role == Qt.DisplayRole:
+            return game.name
+        if role == Qt.DecorationRole:
+            return self.icons.icon(game.path)
+        if role == Qt.ToolTipRole:
+            return f"Missing: {game.path}" if game.get('missing') else game.path
+        if role == self.GameRole:
+            return game
+        return None
+
+    def on_icon_ready(self, path):
+        row = self.rows.get(self.path_ids.get(path))
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
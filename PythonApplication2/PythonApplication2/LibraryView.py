@@ -0,0 +1,136 @@
+from PyQt5.QtWidgets import QListView, QStyle, QStyledItemDelegate
+from PyQt5.QtGui import QColor, QPixmap
+from PyQt5.QtCore import Qt, QPoint, QRect, QSize, pyqtSignal
+from LibraryModel import LibraryModel
+from Diagnostics import Diagnostics
+
+class LibraryDelegate(QStyledItemDelegate):
+    NAME_HEIGHT = 30  # Same height as the name label under grid buttons
+
+    def __init__(self, icon_size, parent=None):
+        super().__init__(parent)
+        self.icon_size = icon_size
+
+    def sizeHint(self, option, index):
+        return QSize(self.icon_size.width(), self.icon_size.height() + self.NAME_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        icon_rect = QRect(rect.x(), rect.y(), self.icon_size.width(), self.icon_size.height())
+        name_rect = QRect(rect.x(), icon_rect.bottom() + 1, self.icon_size.width(), self.NAME_HEIGHT)
+
+        painter.fillRect(icon_rect, QColor("white"))
+        pixmap = index.data(Qt.DecorationRole)
+        if isinstance(pixmap, QPixmap) and not pixmap.isNull():
+            # Icons come at the nearest atlas level already, centre them instead of scaling on paint.
+            # HiDPI pixmaps are measured in logical pixels
+            ratio = pixmap.devicePixelRatioF()
+            x = icon_rect.x() + (icon_rect.width() - round(pixmap.width() / ratio)) // 2
+            y = icon_rect.y() + (icon_rect.height() - round(pixmap.height() / ratio)) // 2
+            painter.drawPixmap(x, y, pixmap)
+        game = index.data(LibraryModel.GameRole)
+        if game is not None and game.get('missing'):
+            painter.fillRect(icon_rect, QColor(255, 255, 255, 160))  # Washed out until the exe is found again
+        if option.state & (QStyle.State_MouseOver | QStyle.State_Selected):
+            painter.fillRect(icon_rect, QColor(0, 120, 215, 40))
+
+        painter.fillRect(name_rect, QColor("lightgrey"))
+        painter.setPen(QColor("black"))
+        name = option.fontMetrics.elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, name_rect.width() - 8)
+        painter.drawText(name_rect.adjusted(4, 0, -4, 0), Qt.AlignVCenter | Qt.AlignLeft, name)
+        painter.restore()
+
+class LibraryView(QListView):
+    launch_requested = pyqtSignal(object)
+    context_menu_requested = pyqtSignal(object, object, QPoint)
+    order_changed = pyqtSignal(list)
+
+    def __init__(self, icon_cache, button_size, parent=None):
+        super().__init__(parent)
+        self.library_model = LibraryModel(icon_cache, button_size, self, self.devicePixelRatioF())
+        self.setModel(self.library_model)
+        self.delegate = LibraryDelegate(button_size, self)
+        self.setItemDelegate(self.delegate)
+
+        # Only the tiles inside the viewport are ever painted or asked for icons
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setSpacing(5)
+        self.setEditTriggers(QListView.NoEditTriggers)
+        self.setSelectionMode(QListView.SingleSelection)
+        self.setMouseTracking(True)
+        self.setFrameShape(QListView.NoFrame)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setStyleSheet("background: transparent;")
+
+        # Dropped games are re-ordered through the catalog, see LibraryModel.dropMimeData
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.setDropIndicatorShown(True)
+        self.setDragDropMode(QListView.DragDrop)
+        self.setDefaultDropAction(Qt.CopyAction)
+        self.library_model.order_changed.connect(self.order_changed)
+
+        self.filter_ids = None  # Ids passing the search filter, None when not filtering
+
+        self.clicked.connect(self.on_clicked)
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.on_context_menu_requested)
+
+    def set_games(self, games, refresh_icons=False):
+        with Diagnostics.instance().span("list.set_games", games=len(games)):
+            self.library_model.set_games(games, refresh_icons)
+            self.apply_filter()  # A model reset forgets which rows were hidden
+
+    def add_games(self, games):
+        first = self.library_model.rowCount()
+        self.library_model.add_games(games)
+        if self.filter_ids is not None:
+            for row, game in enumerate(games, first):
+                self.setRowHidden(row, game.id not in self.filter_ids)
+
+    def set_order(self, game_ids):
+        self.library_model.set_order(game_ids)
+
+    def set_tile_size(self, button_size):
+        if button_size == self.delegate.icon_size:
+            return
+        self.delegate.icon_size = button_size
+        self.library_model.set_icon_size(button_size, self.devicePixelRatioF())
+        self.delegate.sizeHintChanged.emit(self.library_model.index(0))  # Drops the cached uniform item size
+        self.scheduleDelayedItemsLayout()
+
+    def set_filter(self, game_ids):
+        if game_ids == self.filter_ids:
+            return
+        self.filter_ids = game_ids
+        self.apply_filter()
+        self.scrollToTop()
+
+    def apply_filter(self):
+        # Rows are only hidden or shown, only the ones that change are touched
+        for row, game in enumerate(self.library_model.games):
+            hidden = self.filter_ids is not None and game.id not in self.filter_ids
+            if self.isRowHidden(row) != hidden:
+                self.setRowHidden(row, hidden)
+
+    def remove_games(self, games):
+        self.library_model.remove_games(games)
+
+    def update_game(self, game):
+        self.library_model.update_game(game)
+
+    def on_clicked(self, index):
+        self.launch_requested.emit(index.data(LibraryModel.GameRole))
+
+    def on_context_menu_requested(self, position):
+        index = self.indexAt(position)
+        if index.isValid():
+            self.context_menu_requested.emit(index.data(LibraryModel.GameRole), self.viewport(), position)
@@ -0,0 +1,309 @@
+import os
+import threading
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+from FileHashing import file_signature, partial_hash
+from GameCatalog import normalize_path
+from Diagnostics import Diagnostics
+
+def is_under(path, root):
+    return path == root or path.startswith(root.rstrip("\\/") + os.sep)
+
+class LibraryWatcher(QObject):
+    review_queue_changed = pyqtSignal(int)  # Number of new executables waiting to be reviewed
+    files_modified = pyqtSignal(list)  # Paths of games whose exe was replaced in place, e.g. by a patch
+    tree_ready = pyqtSignal(str, object)  # Emitted from worker threads, handled on the GUI thread
+    batch_ready = pyqtSignal(object)
+    signatures_ready = pyqtSignal(object)
+
+    BATCH_DELAY = 1000  # Milliseconds of quiet before queued directory changes are processed
+    POLL_INTERVAL = 30000  # Milliseconds between mtime checks of directories that aren't watched
+    MAX_WATCHED_DIRS = 4096  # Stay well below the default inotify limit, the rest is polled
+    SIGNATURE_BATCH = 200  # Signatures handed to the catalog at once
+
+    def __init__(self, catalog, create_scanner, roots=(), mode='auto', parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.create_scanner = create_scanner
+        self.mode = mode  # "auto" watches and polls what couldn't be watched, "poll" only polls
+        self.roots = []
+        self.listings = {}  # Normalized directory -> {"path", "mtime", "files", "dirs"}
+        self.polled = set()  # Normalized directories checked by the poll timer
+        self.pending = set()  # Normalized directories changed since the last batch
+        self.review_queue = []  # New executables found in watched folders, not yet in the library
+        self.busy = False
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+
+        # Installers and copies touch a folder many times a second, they become a single batch
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(self.BATCH_DELAY)
+        self.batch_timer.timeout.connect(self.process_batch)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(self.POLL_INTERVAL)
+        self.poll_timer.timeout.connect(self.poll)
+
+        self.tree_ready.connect(self.on_tree_ready)
+        self.batch_ready.connect(self.on_batch_ready)
+        self.signatures_ready.connect(self.on_signatures_ready)
+        for root in roots:
+            self.add_root(root)
+
+    def add_root(self, root):
+        root = os.path.abspath(root)
+        if any(is_under(normalize_path(root), normalize_path(known)) for known in self.roots):
+            return
+        self.roots.append(root)
+        # The first walk reuses the scanner's mtime index, a warm start reads almost nothing
+        threading.Thread(target=self.walk_root, args=(root,), name="LibraryWatcherWalk", daemon=True).start()
+
+    def walk_root(self, root):
+        scanner = self.create_scanner()
+        scanner.scan(root)
+        self.tree_ready.emit(root, scanner.visited)
+
+    def on_tree_ready(self, root, visited):
+        self.add_listings(visited)
+        root_key = normalize_path(root)
+        games = [game for game in self.catalog if is_under(normalize_path(game.path), root_key)]
+        known_files = {
+            normalize_path(os.path.join(listing["path"], name))
+            for key, listing in self.listings.items() if is_under(key, root_key)
+            for name in listing["files"]
+        }
+        # Entries whose exe disappeared while the launcher wasn't running
+        changes = []
+        for game in games:
+            missing = normalize_path(game.path) not in known_files and not os.path.exists(game.path)
+            if missing != bool(game.get('missing')):
+                changes.append((game, {'missing': True if missing else None}))
+        self.catalog.update_many(changes)
+
+        stale = [(game.id, game.path, game.get('file_signature')) for game in games if not game.get('missing')]
+        threading.Thread(target=self.compute_signatures, args=(stale,), name="LibraryWatcherHash", daemon=True).start()
+
+    def add_listings(self, visited):
+        paths = []
+        for key, entry in visited.items():
+            path = entry.get("path", key)
+            self.listings[key] = {"path": path, "mtime": entry["mtime"], "files": list(entry["files"]), "dirs": list(entry["dirs"])}
+            paths.append(path)
+        if self.mode == 'poll':
+            self.polled.update(visited)
+        else:
+            room = max(0, self.MAX_WATCHED_DIRS - len(self.watcher.directories()))
+            failed = self.watcher.addPaths(paths[:room]) if room else []
+            # Whatever the OS refused (or didn't fit) is checked by polling its mtime instead
+            self.polled.update(normalize_path(path) for path in failed + paths[room:])
+        if self.polled and not self.poll_timer.isActive():
+            self.poll_timer.start()
+
+    def remove_listings(self, keys):
+        paths = [self.listings[key]["path"] for key in keys if key in self.listings]
+        watched = set(self.watcher.directories())
+        stale = [path for path in paths if path in watched]
+        if stale:
+            self.watcher.removePaths(stale)
+        for key in keys:
+            self.listings.pop(key, None)
+            self.polled.discard(key)
+
+    def compute_signatures(self, games):
+        # Size, mtime and a partial hash per game, so a moved exe can be recognised later.
+        # Only files that changed since their signature was taken are read again
+        batch = []
+        for game_id, path, signature in games:
+            try:
+                stat = os.stat(path)
+                if signature and signature[:2] == [stat.st_size, stat.st_mtime_ns]:
+                    continue
+                batch.append((game_id, file_signature(path)))
+            except OSError:
+                continue
+            if len(batch) >= self.SIGNATURE_BATCH:
+                self.signatures_ready.emit(batch)
+                batch = []
+        if batch:
+            self.signatures_ready.emit(batch)
+
+    def on_signatures_ready(self, batch):
+        changes = [(self.catalog.get(game_id), {'file_signature': signature}) for game_id, signature in batch]
+        self.catalog.update_many([(game, fields) for game, fields in changes if game is not None])
+
+    def on_directory_changed(self, path):
+        self.pending.add(normalize_path(path))
+        self.batch_timer.start()
+
+    def poll(self):
+        for key in list(self.polled):
+            listing = self.listings.get(key)
+            try:
+                mtime = os.stat(listing["path"]).st_mtime_ns if listing else None
+            except OSError:
+                mtime = None
+            if listing is None or mtime != listing["mtime"]:
+                self.pending.add(key)
+        if self.pending:
+            self.process_batch()
+
+    def process_batch(self):
+        if self.busy:
+            self.batch_timer.start()  # Try again once the running batch is done
+            return
+        if not self.pending:
+            return
+        keys, self.pending = self.pending, set()
+        self.busy = True
+        old = {key: self.listings.get(key) for key in keys}
+        # The worker thread never touches the catalog, it gets the signatures it may need up front
+        signatures = [
+            (game.id, normalize_path(game.path), bool(game.get('missing')), game.get('file_signature'))
+            for game in self.catalog if game.get('file_signature')
+        ]
+        # Roots added while the batch runs change self.listings on this thread, the worker gets a copy
+        listings = dict(self.listings)
+        threading.Thread(target=self.scan_batch, args=(old, listings, signatures), name="LibraryWatcherBatch", daemon=True).start()
+
+    def empty_result(self):
+        return {"listings": {}, "removed": [], "appeared": [], "vanished": [], "moves": {}, "modified": []}
+
+    def scan_batch(self, old, listings, signatures):
+        # A result is always sent back, even an empty one, so busy is cleared and later batches run
+        result = self.empty_result()
+        try:
+            with Diagnostics.instance().span("watcher.batch", directories=len(old)):
+                result = self.diff_directories(old, listings)
+                self.match_moves(result, signatures)
+                self.find_modified(result, signatures)
+        except Exception as e:
+            print(f"Error checking watched folders: {e!r}")
+            result = self.empty_result()
+        finally:
+            self.batch_ready.emit(result)
+
+    def diff_directories(self, old, listings):
+        # Only the directories that reported a change are listed again, never the whole tree
+        scanner = self.create_scanner()
+        result = self.empty_result()
+        for key, listing in old.items():
+            if listing is None:
+                continue
+            scanned = scanner.scan_directory(listing["path"], {})
+            if scanned is None:
+                # The directory itself is gone, along with everything that was below it
+                result["removed"].extend(k for k in listings if is_under(k, key))
+                result["vanished"].extend(
+                    os.path.join(listings[k]["path"], name)
+                    for k in listings if is_under(k, key) for name in listings[k]["files"]
+                )
+                continue
+            path, entry = scanned
+            result["listings"][key] = dict(entry, path=path)
+            before = set(listing["files"])
+            after = set(entry["files"])
+            result["appeared"].extend(os.path.join(path, name) for name in sorted(after - before))
+            result["vanished"].extend(os.path.join(path, name) for name in sorted(before - after))
+            for name in set(listing["dirs"]) - set(entry["dirs"]):
+                gone = normalize_path(os.path.join(path, name))
+                result["removed"].extend(k for k in listings if is_under(k, gone))
+                result["vanished"].extend(
+                    os.path.join(listings[k]["path"], file)
+                    for k in listings if is_under(k, gone) for file in listings[k]["files"]
+                )
+            for name in set(entry["dirs"]) - set(listing["dirs"]):
+                # A folder copied or moved in, walk just that subtree
+                subtree = self.create_scanner()
+                result["appeared"].extend(subtree.scan(os.path.join(path, name)))
+                for sub_key, sub_entry in subtree.visited.items():
+                    result["listings"][sub_key] = dict(sub_entry, path=sub_entry.get("path", sub_key))
+        return result
+
+    def match_moves(self, result, signatures):
+        # Games that just vanished or were already missing are paired with appeared files of the
+        # same size, then confirmed with the partial hash. Nothing else is read
+        vanished = {normalize_path(path) for path in result["vanished"]}
+        by_size = {}
+        for game_id, path, missing, signature in signatures:
+            if missing or path in vanished:
+                by_size.setdefault(signature[0], []).append((game_id, signature[2]))
+        if not by_size:
+            return
+        for path in result["appeared"]:
+            try:
+                size = os.path.getsize(path)
+                if size not in by_size:
+                    continue
+                digest = partial_hash(path, size)
+            except OSError:
+                continue
+            for game_id, expected in by_size[size]:
+                if digest == expected and game_id not in result["moves"]:
+                    result["moves"][game_id] = path
+                    break
+
+    def find_modified(self, result, signatures):
+        # Games still in a directory that was listed again, but with another size or mtime than
+        # their signature. Their icons and signatures are stale
+        present = {
+            normalize_path(os.path.join(listing["path"], name))
+            for listing in result["listings"].values() for name in listing["files"]
+        }
+        for game_id, path, missing, signature in signatures:
+            if missing or path not in present:
+                continue
+            try:
+                stat = os.stat(path)
+                if [stat.st_size, stat.st_mtime_ns] != signature[:2]:
+                    result["modified"].append((game_id, file_signature(path)))
+            except OSError:
+                continue
+
+    def on_batch_ready(self, result):
+        self.busy = False
+        self.remove_listings(result["removed"])
+        self.add_listings(result["listings"])
+
+        changes = []
+        modified = [(self.catalog.get(game_id), signature) for game_id, signature in result["modified"]]
+        modified = [(game, signature) for game, signature in modified if game is not None]
+        if modified:
+            # Cached icons go first, so views refreshed by the catalog change load the new ones
+            self.files_modified.emit([game.path for game, _ in modified])
+            changes.extend((game, {'file_signature': signature}) for game, signature in modified)
+        moved_to = set()
+        for game_id, path in result["moves"].items():
+            game = self.catalog.get(game_id)
+            if game is not None and self.catalog.find_by_path(path) is None:
+                changes.append((game, {'path': path, 'missing': None}))
+                moved_to.add(normalize_path(path))
+        moved_ids = {game.id for game, _ in changes}
+        for path in result["vanished"]:
+            game = self.catalog.find_by_path(path)
+            if game is not None and game.id not in moved_ids and not os.path.exists(path):
+                changes.append((game, {'missing': True}))
+        queued = {normalize_path(path) for path in self.review_queue}
+        for path in result["appeared"]:
+            key = normalize_path(path)
+            game = self.catalog.find_by_path(path)
+            if game is not None:
+                if game.get('missing'):
+                    changes.append((game, {'missing': None}))  # Back where it was, e.g. a drive came back
+            elif key not in moved_to and key not in queued:
+                self.review_queue.append(path)
+                queued.add(key)
+        self.catalog.update_many(changes)
+        self.review_queue_changed.emit(len(self.review_queue))
+        if self.pending:
+            self.batch_timer.start()
+
+    def take_review_queue(self):
+        # Paths still on disk and not in the library, the queue is emptied for the reviewer
+        queue = [
+            path for path in self.review_queue
+            if self.catalog.find_by_path(path) is None and os.path.exists(path)
+        ]
+        self.review_queue = []
+        self.review_queue_changed.emit(0)
+        return queue
@@ -0,0 +1,140 @@
+import weakref
+from PyQt5 import sip
+from PyQt5.QtWidgets import QApplication, QWidget
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtCore import QObject, Qt, QTimer
+
+class MarqueeClock(QObject):
+    INTERVAL = 50  # Milliseconds per step, one timer for every label in the launcher
+    MODES = ('always', 'hover', 'off')
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.mode = 'always'
+        self.labels = set()  # Labels that currently want to scroll
+        self.all_labels = weakref.WeakSet()
+        self.application_active = True
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.INTERVAL)
+        self.timer.timeout.connect(self.tick)
+        application = QApplication.instance()
+        if application is not None:
+            application.applicationStateChanged.connect(self.on_application_state_changed)
+
+    def set_mode(self, mode):
+        self.mode = mode if mode in self.MODES else 'always'
+        for label in list(self.all_labels):
+            if not sip.isdeleted(label):
+                label.update_registration()
+
+    def track(self, label):
+        self.all_labels.add(label)
+
+    def register(self, label):
+        self.labels.add(label)
+        self.update_timer()
+
+    def unregister(self, label):
+        self.labels.discard(label)
+        self.update_timer()
+
+    def update_timer(self):
+        if sip.isdeleted(self.timer):
+            return  # Application teardown, labels are being hidden after the timer is gone
+        # Nothing to animate or the launcher is in the background: no wakeups at all
+        running = self.application_active and bool(self.labels)
+        if running and not self.timer.isActive():
+            self.timer.start()
+        elif not running and self.timer.isActive():
+            self.timer.stop()
+
+    def on_application_state_changed(self, state):
+        self.application_active = state == Qt.ApplicationActive
+        self.update_timer()
+
+    def tick(self):
+        for label in list(self.labels):
+            if sip.isdeleted(label):
+                self.labels.discard(label)
+                continue
+            # Tiles scrolled out of the viewport are still "visible" widgets but have nothing on screen
+            if not label.visibleRegion().isEmpty():
+                label.advance()
+        self.update_timer()
+
+class MarqueeLabel(QWidget):
+    STEP = 1  # Pixels moved per clock tick
+    GAP = 30  # Pixels between the end of the text and its repeat
+    PADDING = 4
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(30)  # Set a fixed height for single-line appearance
+        self.text = text
+        self.offset = 0
+        self.hovered = False
+        self.clock = MarqueeClock.instance()
+        self.clock.track(self)
+        self.text_width = self.fontMetrics().horizontalAdvance(text)
+
+    def set_text(self, text):
+        self.text = text
+        self.offset = 0
+        self.text_width = self.fontMetrics().horizontalAdvance(text)
+        self.update_registration()
+        self.update()
+
+    def set_hovered(self, hovered):
+        self.hovered = hovered
+        if not hovered:
+            self.offset = 0
+            self.update()
+        self.update_registration()
+
+    def overflows(self):
+        return self.text_width > self.width() - 2 * self.PADDING
+
+    def update_registration(self):
+        mode = self.clock.mode
+        wants_scroll = self.isVisible() and self.overflows() and (mode == 'always' or (mode == 'hover' and self.hovered))
+        if wants_scroll:
+            self.clock.register(self)
+        else:
+            self.clock.unregister(self)
+
+    def advance(self):
+        self.offset = (self.offset + self.STEP) % (self.text_width + self.GAP)
+        self.update()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_registration()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.clock.unregister(self)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_registration()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("lightgrey"))
+        painter.setPen(QColor("black"))
+        if not self.overflows():
+            painter.drawText(self.rect().adjusted(self.PADDING, 0, -self.PADDING, 0), Qt.AlignVCenter | Qt.AlignLeft, self.text)
+            return
+        metrics = self.fontMetrics()
+        baseline = (self.height() + metrics.ascent() - metrics.descent()) // 2
+        x = self.PADDING - self.offset
+        painter.drawText(x, baseline, self.text)
+        painter.drawText(x + self.text_width + self.GAP, baseline, self.text)
@@ -0,0 +1,43 @@
+import queue
+from PyQt5.QtCore import QThread, pyqtSignal
+from GameMetadata import MetadataReader
+
+class MetadataThread(QThread):
+    metadata_ready = pyqtSignal(dict)  # Path -> metadata
+
+    MAX_BATCH = 256  # Paths read per round, so names update while a large scan is still streaming in
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.reader = MetadataReader()
+        self.queue = queue.Queue()
+
+    def enqueue(self, paths):
+        if paths:
+            self.queue.put(list(paths))
+
+    def run(self):
+        pending = []
+        while True:
+            if not pending:
+                paths = self.queue.get()
+                if paths is None:
+                    return
+                pending.extend(paths)
+            # Everything queued since the last round is read together, the pool works best on big batches
+            while True:
+                try:
+                    paths = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if paths is None:
+                    return
+                pending.extend(paths)
+            batch, pending = pending[:self.MAX_BATCH], pending[self.MAX_BATCH:]
+            self.metadata_ready.emit(self.reader.read_many(batch))
+
+    def stop(self):
+        self.reader.cancel()
+        self.queue.put(None)
+        self.wait()
+        self.reader.close()  # The worker processes lived as long as the thread
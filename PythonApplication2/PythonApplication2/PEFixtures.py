@@ -0,0 +1,117 @@
+"""Minimal executables for the benchmarks and the tests.
+
+Each builder returns the bytes of a PE32 file holding only a resource section, enough for
+PEResources to read icons and version info from without any real program in it.
+"""
+import struct
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PEResources import RT_GROUP_ICON, RT_ICON, VS_FIXEDFILEINFO_SIGNATURE
+
+def png_icon(size, color):
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(QColor(color))
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(data)
+
+def dib_icon(size):
+    # BITMAPINFOHEADER with the doubled height icons use, 32-bit pixels, then the AND mask
+    header = struct.pack("<IiiHHIIiiII", 40, size, size * 2, 1, 32, 0, size * size * 4, 0, 0, 0, 0)
+    return header + b"\x80\x40\x20\xff" * (size * size) + b"\0" * (((size + 31) // 32) * 4 * size)
+
+def build_resources(leaves, base_rva):
+    # leaves: (type, name id, data), laid out as type -> name -> language directories
+    types = {}
+    for type_id, name, data in leaves:
+        types.setdefault(type_id, []).append((name, data))
+    offset = 16 + 8 * len(types)
+    type_dirs = {}
+    for type_id, names in types.items():
+        type_dirs[type_id] = offset
+        offset += 16 + 8 * len(names)
+    keys = [(type_id, name) for type_id, names in types.items() for name, _ in names]
+    language_dirs = {}
+    for key in keys:
+        language_dirs[key] = offset
+        offset += 16 + 8
+    data_entries = {}
+    for key in keys:
+        data_entries[key] = offset
+        offset += 16
+    blobs = {}
+    for type_id, names in types.items():
+        for name, data in names:
+            blobs[(type_id, name)] = offset
+            offset += (len(data) + 3) & ~3
+
+    out = bytearray(offset)
+    def directory(at, entries):
+        struct.pack_into("<HH", out, at + 12, 0, len(entries))
+        for index, (ident, target) in enumerate(entries):
+            struct.pack_into("<II", out, at + 16 + index * 8, ident, target)
+    directory(0, [(type_id, 0x80000000 | type_dirs[type_id]) for type_id in types])
+    for type_id, names in types.items():
+        directory(type_dirs[type_id], [(name, 0x80000000 | language_dirs[(type_id, name)]) for name, _ in names])
+        for name, data in names:
+            key = (type_id, name)
+            directory(language_dirs[key], [(0x409, data_entries[key])])
+            struct.pack_into("<II", out, data_entries[key], base_rva + blobs[key], len(data))
+            out[blobs[key]:blobs[key] + len(data)] = data
+    return bytes(out)
+
+def build_executable(images):
+    # images: (width, data, bit count), the smallest PE32 file PEResources will read icons from
+    group = struct.pack("<HHH", 0, 1, len(images))
+    leaves = []
+    for icon_id, (width, data, bit_count) in enumerate(images, 1):
+        group += struct.pack("<BBBxHHIH", width % 256, width % 256, 0, 1, bit_count, len(data), icon_id)
+        leaves.append((RT_ICON, icon_id, data))
+    leaves.append((RT_GROUP_ICON, 1, group))
+    return build_pe(leaves)
+
+def build_pe(leaves):
+    # A PE32 header and one .rsrc section holding the given resources
+    section_rva, section_offset = 0x1000, 0x200
+    resources = build_resources(leaves, section_rva)
+    headers = bytearray(section_offset)
+    headers[0:2] = b"MZ"
+    struct.pack_into("<I", headers, 0x3C, 0x40)
+    headers[0x40:0x44] = b"PE\0\0"
+    optional_size = 96 + 16 * 8
+    struct.pack_into("<HHIIIHH", headers, 0x44, 0x14C, 1, 0, 0, 0, optional_size, 0x102)
+    optional = 0x58
+    struct.pack_into("<H", headers, optional, 0x10B)
+    struct.pack_into("<I", headers, optional + 92, 16)
+    struct.pack_into("<II", headers, optional + 96 + 2 * 8, section_rva, len(resources))
+    section = optional + optional_size
+    headers[section:section + 8] = b".rsrc\0\0\0"
+    struct.pack_into("<IIII", headers, section + 8, len(resources), section_rva, len(resources), section_offset)
+    return bytes(headers) + resources
+
+def version_block(key, value=b"", text=False, children=()):
+    # length, value length, type, the UTF-16 key, then the value and children each aligned to 4 bytes
+    data = bytearray(6) + (key + "\0").encode('utf-16-le')
+    data += b"\0" * (-len(data) % 4) + value
+    for child in children:
+        data += b"\0" * (-len(data) % 4) + child
+    struct.pack_into("<HHH", data, 0, len(data), len(value) // 2 if text else len(value), 1 if text else 0)
+    return bytes(data)
+
+def version_string(name, text):
+    return version_block(name, (text + "\0").encode('utf-16-le'), text=True)
+
+def version_resource(strings, file_version=(1, 2, 3, 4), product_version=(5, 6, 7, 8)):
+    fixed = struct.pack(
+        "<13I", VS_FIXEDFILEINFO_SIGNATURE, 0x10000,
+        file_version[0] << 16 | file_version[1], file_version[2] << 16 | file_version[3],
+        product_version[0] << 16 | product_version[1], product_version[2] << 16 | product_version[3],
+        0, 0, 0, 0, 0, 0, 0,
+    )
+    table = version_block("040904b0", text=True, children=[version_string(name, text) for name, text in strings.items()])
+    return version_block("VS_VERSION_INFO", fixed, children=[
+        version_block("StringFileInfo", text=True, children=[table]),
+        version_block("VarFileInfo", text=True, children=[version_block("Translation", struct.pack("<HH", 0x409, 1200))]),
+    ])
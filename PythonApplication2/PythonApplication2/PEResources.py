@@ -0,0 +1,222 @@
+import mmap
+import struct
+
+RT_ICON = 3
+RT_GROUP_ICON = 14
+RT_VERSION = 16
+
+VS_FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class PEFormatError(ValueError):
+    pass
+
+def align4(offset):
+    return (offset + 3) & ~3
+
+class PEResources:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self.file.close()
+            raise PEFormatError(f"Empty file: {path}")
+        try:
+            self.sections = []
+            self.resource_offset = self.read_headers()
+            self.resource_tree = self.read_directory(self.resource_offset, 0) if self.resource_offset is not None else {}
+        except (struct.error, IndexError) as e:
+            self.close()
+            raise PEFormatError(f"Truncated PE file: {path}") from e
+        except PEFormatError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if not self.data.closed:
+            self.data.close()
+        self.file.close()
+
+    def read_headers(self):
+        if self.data[:2] != b"MZ":
+            raise PEFormatError(f"Not an executable: {self.path}")
+        pe_offset = struct.unpack_from("<I", self.data, 0x3C)[0]
+        if self.data[pe_offset:pe_offset + 4] != b"PE\0\0":
+            raise PEFormatError(f"Missing PE signature: {self.path}")
+        section_count, optional_size = struct.unpack_from("<2xH12xH2x", self.data, pe_offset + 4)
+        optional_offset = pe_offset + 24
+        magic = struct.unpack_from("<H", self.data, optional_offset)[0]
+        if magic == 0x10B:
+            directory_count_offset = optional_offset + 92
+        elif magic == 0x20B:
+            directory_count_offset = optional_offset + 108
+        else:
+            raise PEFormatError(f"Unknown optional header magic {magic:#x}: {self.path}")
+
+        section_offset = optional_offset + optional_size
+        for index in range(section_count):
+            virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from(
+                "<8xIIII", self.data, section_offset + index * 40
+            )
+            self.sections.append((virtual_address, max(virtual_size, raw_size), raw_pointer))
+
+        directory_count = struct.unpack_from("<I", self.data, directory_count_offset)[0]
+        if directory_count < 3:
+            return None
+        resource_rva, resource_size = struct.unpack_from("<II", self.data, directory_count_offset + 4 + 2 * 8)
+        if not resource_rva or not resource_size:
+            return None
+        return self.rva_to_offset(resource_rva)
+
+    def rva_to_offset(self, rva):
+        for virtual_address, size, raw_pointer in self.sections:
+            if virtual_address <= rva < virtual_address + size:
+                return rva - virtual_address + raw_pointer
+        raise PEFormatError(f"RVA {rva:#x} is outside every section: {self.path}")
+
+    def read_directory(self, offset, depth):
+        # Resource trees are type -> name -> language, anything deeper is malformed
+        if depth > 2:
+            raise PEFormatError(f"Resource tree is too deep: {self.path}")
+        named_count, id_count = struct.unpack_from("<12xHH", self.data, offset)
+        entries = {}
+        for index in range(named_count + id_count):
+            name, target = struct.unpack_from("<II", self.data, offset + 16 + index * 8)
+            if name & 0x80000000:
+                name = self.read_name(name & 0x7FFFFFFF)
+            if target & 0x80000000:
+                entries[name] = self.read_directory(self.resource_offset + (target & 0x7FFFFFFF), depth + 1)
+            else:
+                data_rva, size = struct.unpack_from("<II", self.data, self.resource_offset + target)
+                entries[name] = (self.rva_to_offset(data_rva), size)
+        return entries
+
+    def read_name(self, offset):
+        length = struct.unpack_from("<H", self.data, self.resource_offset + offset)[0]
+        start = self.resource_offset + offset + 2
+        return self.data[start:start + length * 2].decode('utf-16-le', 'replace')
+
+    def resources(self, type_id):
+        # Flatten name -> language into an ordered list of (name, offset, size)
+        found = []
+        for name, languages in self.resource_tree.get(type_id, {}).items():
+            if isinstance(languages, tuple):
+                found.append((name, *languages))
+                continue
+            for entry in languages.values():
+                if isinstance(entry, tuple):
+                    found.append((name, *entry))
+                    break  # One language per resource is enough
+        return found
+
+    def resource_bytes(self, offset, size):
+        return self.data[offset:offset + size]
+
+    def group_icons(self):
+        groups = []
+        for name, offset, size in self.resources(RT_GROUP_ICON):
+            count = struct.unpack_from("<4xH", self.data, offset)[0]
+            entries = []
+            for index in range(count):
+                width, height, colors, planes, bit_count, byte_size, icon_id = struct.unpack_from(
+                    "<BBBxHHIH", self.data, offset + 6 + index * 14
+                )
+                entries.append({
+                    "width": width or 256,
+                    "height": height or 256,
+                    "colors": colors,
+                    "planes": planes,
+                    "bit_count": bit_count,
+                    "size": byte_size,
+                    "id": icon_id,
+                })
+            groups.append((name, entries))
+        return groups
+
+    def best_icon_entry(self, entries, size):
+        # Prefer the smallest image that covers the requested size, then the deepest colour
+        covering = [entry for entry in entries if entry["width"] >= size]
+        if covering:
+            return min(covering, key=lambda entry: (entry["width"], -entry["bit_count"]))
+        return max(entries, key=lambda entry: (entry["width"], entry["bit_count"]))
+
+    def icon_image(self, size=256):
+        # Returns (bytes, format) for the main application icon, format being "png" or "ico"
+        groups = self.group_icons()
+        if not groups:
+            return None
+        icons = {name: (offset, length) for name, offset, length in self.resources(RT_ICON)}
+        entries = [entry for entry in groups[0][1] if entry["id"] in icons]
+        if not entries:
+            return None
+        entry = self.best_icon_entry(entries, size)
+        offset, length = icons[entry["id"]]
+        if self.data[offset:offset + 8] == PNG_SIGNATURE:
+            return self.resource_bytes(offset, length), "png"
+
+        # RT_ICON holds a bare DIB, wrap it in a single image .ico container for the decoder
+        header = struct.pack(
+            "<HHHBBBBHHII", 0, 1, 1,
+            entry["width"] % 256, entry["height"] % 256, entry["colors"], 0,
+            entry["planes"], entry["bit_count"], length, 6 + 16,
+        )
+        return header + self.resource_bytes(offset, length), "ico"
+
+    def version_block(self, offset, end):
+        # VS_VERSIONINFO and everything in it share one layout: length, value length, type, a
+        # NUL terminated UTF-16 key, then the value and the child blocks, each aligned to 4 bytes
+        length, value_length, value_type = struct.unpack_from("<HHH", self.data, offset)
+        block_end = min(offset + length, end)
+        if length < 6:
+            raise PEFormatError(f"Invalid version block: {self.path}")
+        key_end = offset + 6
+        while key_end + 1 < block_end and self.data[key_end:key_end + 2] != b"\0\0":
+            key_end += 2
+        key = self.data[offset + 6:key_end].decode('utf-16-le', 'replace')
+        value_offset = align4(key_end + 2)
+        value_size = value_length * 2 if value_type == 1 else value_length  # Text values count characters
+        value = self.data[value_offset:min(value_offset + value_size, block_end)]
+        return key, value, align4(value_offset + value_size), block_end
+
+    def version_children(self, offset, end):
+        while offset + 6 <= end:
+            key, value, children, block_end = self.version_block(offset, end)
+            yield key, value, children, block_end
+            offset = align4(block_end)
+
+    def version_info(self):
+        # The strings of the first RT_VERSION resource ("ProductName", "CompanyName", ...) plus
+        # "FixedFileVersion" and "FixedProductVersion" from VS_FIXEDFILEINFO. Empty without one
+        found = self.resources(RT_VERSION)
+        if not found:
+            return {}
+        _, offset, size = found[0]
+        info = {}
+        try:
+            key, value, children, end = self.version_block(offset, offset + size)
+            if len(value) >= 52 and struct.unpack_from("<I", value)[0] == VS_FIXEDFILEINFO_SIGNATURE:
+                file_ms, file_ls, product_ms, product_ls = struct.unpack_from("<8xIIII", value)
+                info["FixedFileVersion"] = f"{file_ms >> 16}.{file_ms & 0xFFFF}.{file_ls >> 16}.{file_ls & 0xFFFF}"
+                info["FixedProductVersion"] = f"{product_ms >> 16}.{product_ms & 0xFFFF}.{product_ls >> 16}.{product_ls & 0xFFFF}"
+            for key, _, tables, tables_end in self.version_children(children, end):
+                if key != "StringFileInfo":
+                    continue  # VarFileInfo only lists translations
+                # One table per language, the first one that has a string wins
+                for _, _, strings, strings_end in self.version_children(tables, tables_end):
+                    for name, text, _, _ in self.version_children(strings, strings_end):
+                        text = bytes(text).decode('utf-16-le', 'replace').split("\0", 1)[0].strip()
+                        if text:
+                            info.setdefault(name, text)
+        except (struct.error, IndexError) as e:
+            raise PEFormatError(f"Truncated version resource: {self.path}") from e
+        return info
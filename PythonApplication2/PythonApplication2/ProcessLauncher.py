@@ -0,0 +1,169 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from Diagnostics import Diagnostics
+
+class SubprocessBackend:
+    # Returns a handle that can be waited on, so the session length is known
+    def spawn(self, path, args, cwd, env):
+        options = {}
+        if os.name == 'nt':
+            options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options['start_new_session'] = True  # Closing the launcher's terminal doesn't take the game down
+        return subprocess.Popen(
+            [path] + args, cwd=cwd, env=env,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            **options
+        )
+
+class StartfileBackend:
+    # The Windows shell launch the launcher used before, follows file associations but can't be tracked
+    def spawn(self, path, args, cwd, env):
+        os.startfile(path, arguments=subprocess.list2cmdline(args), cwd=cwd)
+        return None
+
+def split_arguments(text):
+    # A game's arguments typed as one string, split the way the Windows C runtime splits a command
+    # line on every platform, so a library moves between machines unchanged. Backslashes are only
+    # special before a quote, "" inside quotes is a quote
+    args = []
+    current = []
+    in_token = quoted = False
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            backslashes = len(text) - index - len(text[index:].lstrip("\\"))
+            index += backslashes
+            if index < len(text) and text[index] == '"':
+                current.append("\\" * (backslashes // 2))
+                if backslashes % 2:
+                    current.append('"')
+                    index += 1
+            else:
+                current.append("\\" * backslashes)
+            in_token = True
+            continue
+        if char == '"':
+            if quoted and text[index + 1:index + 2] == '"':
+                current.append('"')
+                index += 1
+            else:
+                quoted = not quoted
+            in_token = True
+        elif char in " \t" and not quoted:
+            if in_token:
+                args.append("".join(current))
+                current = []
+                in_token = False
+        else:
+            current.append(char)
+            in_token = True
+        index += 1
+    if in_token:
+        args.append("".join(current))
+    return args
+
+def join_arguments(args):
+    # The inverse of split_arguments, for storing a list of arguments as one string
+    return subprocess.list2cmdline([str(arg) for arg in args])
+
+BACKENDS = {
+    'subprocess': SubprocessBackend,
+    'startfile': StartfileBackend,
+}
+
+class ProcessLauncher:
+    # Starts games and records their sessions in the catalog, without Qt. LaunchService reports the
+    # same events as signals for the window, the CLI uses this directly
+    def __init__(self, catalog, backend='subprocess'):
+        self.catalog = catalog
+        if backend == 'startfile' and not hasattr(os, 'startfile'):
+            backend = 'subprocess'  # os.startfile only exists on Windows, a config copied elsewhere still launches
+        self.backend = BACKENDS.get(backend, SubprocessBackend)()
+        self.running = {}  # Game id -> process handle
+        self.watchers = []
+
+    def is_running(self, game):
+        return game.id in self.running
+
+    def launch(self, game):
+        # A double click or an impatient second click must not start the game twice
+        if self.is_running(game):
+            self.report_failed(game, "already running")
+            return False
+        path = game.path
+        # Many games look for their data next to the exe. A working directory of their own is relative to it
+        cwd = os.path.join(os.path.dirname(os.path.abspath(path)), game.get('cwd') or "")
+        started = time.perf_counter()
+        try:
+            process = self.backend.spawn(path, self.arguments(game), cwd, self.environment(game))
+        except (OSError, ValueError) as e:
+            self.report_failed(game, str(e))
+            return False
+        spawn_time = time.perf_counter() - started
+        Diagnostics.instance().record("launch.spawn", spawn_time, {"game": game.name})
+
+        self.catalog.update(
+            game,
+            last_played=time.time(),
+            launch_count=game.get('launch_count', 0) + 1,
+            last_spawn_ms=round(spawn_time * 1000, 1)
+        )
+        self.report_launched(game, spawn_time)
+        if process is not None:
+            self.running[game.id] = process
+            watcher = threading.Thread(target=self.watch, args=(game.id, process), name="LaunchWatcher", daemon=True)
+            self.watchers = [thread for thread in self.watchers if thread.is_alive()] + [watcher]
+            watcher.start()
+        return True
+
+    def arguments(self, game):
+        args = game.get('arguments') or []
+        if isinstance(args, str):
+            return split_arguments(args)
+        return [str(arg) for arg in args]
+
+    def environment(self, game):
+        env = game.get('env')
+        if not env:
+            return None  # Inherit the launcher's environment unchanged
+        merged = dict(os.environ)
+        merged.update({str(key): str(value) for key, value in env.items()})
+        return merged
+
+    def watch(self, game_id, process):
+        started = time.monotonic()
+        process.wait()
+        self.process_exited(game_id, time.monotonic() - started)
+
+    def process_exited(self, game_id, duration):
+        # Called on the watcher thread. Without an event loop the session is recorded right here
+        self.finish_session(game_id, duration)
+
+    def finish_session(self, game_id, duration):
+        self.running.pop(game_id, None)
+        Diagnostics.instance().event("launch.exit", game_id=game_id, seconds=round(duration, 1))
+        game = self.catalog.get(game_id)
+        if game is None:
+            return  # Removed from the library while it was running
+        self.catalog.update(game, playtime=round(game.get('playtime', 0) + duration, 1))
+        self.report_exited(game, duration)
+
+    def wait(self):
+        # Until every game started by this launcher has exited and its playtime is recorded
+        for watcher in list(self.watchers):
+            watcher.join()
+        self.watchers.clear()
+
+    def report_launched(self, game, spawn_time):
+        pass
+
+    def report_failed(self, game, error):
+        print(f"Error launching {game.name}: {error}", file=sys.stderr)
+
+    def report_exited(self, game, duration):
+        pass
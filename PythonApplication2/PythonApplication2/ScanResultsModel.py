@@ -0,0 +1,144 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QSize, QSortFilterProxyModel, Qt
+from IconLoader import LazyIconProvider
+from GameCatalog import normalize_path
+from GameMetadata import HIDDEN, display_name, helper_rank
+from SortEngine import natural_key
+
+class ScanResultsModel(QAbstractListModel):
+    PathRole = Qt.UserRole + 1
+    RankRole = Qt.UserRole + 2  # NORMAL, HELPER or HIDDEN from GameMetadata
+
+    def __init__(self, icon_cache, icon_size=QSize(32, 32), parent=None):
+        super().__init__(parent)
+        self.icons = LazyIconProvider(icon_cache, icon_size, self)
+        self.icons.icon_ready.connect(self.on_icon_ready)
+        self.paths = []
+        self.names = []
+        self.ranks = []
+        self.metadata = {}  # Normalized path -> version info, filled in as it's read
+        self.rows = {}  # Normalized path -> row, also used to drop duplicates from overlapping scans
+        self.checked = set()
+
+    def append_games(self, games):
+        # E:/Games/x.exe and e:\games\x.exe from two overlapping roots are one row
+        new_games = {}
+        for game in games:
+            key = normalize_path(game)
+            if key not in self.rows and key not in new_games:
+                new_games[key] = game
+        if not new_games:
+            return
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_games) - 1)
+        for row, (key, game) in enumerate(new_games.items(), first):
+            self.rows[key] = row
+            self.paths.append(game)
+            # Named from the file until its version info is read
+            self.names.append(display_name(game, {}))
+            self.ranks.append(helper_rank(game, {}))
+        self.endInsertRows()
+
+    def clear(self):
+        self.icons.reset()
+        self.beginResetModel()
+        self.paths, self.names, self.ranks, self.rows = [], [], [], {}
+        self.metadata = {}
+        self.checked.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.paths)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.paths):
+            return None
+        path = self.paths[index.row()]
+        if role == Qt.DisplayRole:
+            return self.names[index.row()]
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if path in self.checked else Qt.Unchecked
+        if role == Qt.DecorationRole:
+            return self.icons.icon(path)
+        if role == Qt.ToolTipRole:
+            metadata = self.metadata.get(normalize_path(path), {})
+            details = [metadata[field] for field in ("publisher", "version") if metadata.get(field)]
+            return "\n".join([path] + [", ".join(details)] if details else [path])
+        if role == self.PathRole:
+            return path
+        if role == self.RankRole:
+            return self.ranks[index.row()]
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        path = self.paths[index.row()]
+        if value == Qt.Checked:
+            self.checked.add(path)
+        else:
+            self.checked.discard(path)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def set_checked(self, paths, checked):
+        if checked:
+            self.checked.update(paths)
+        else:
+            self.checked.difference_update(paths)
+        if self.paths:
+            self.dataChanged.emit(self.index(0), self.index(len(self.paths) - 1), [Qt.CheckStateRole])
+
+    def checked_games(self):
+        return [path for path in self.paths if path in self.checked]
+
+    def set_metadata(self, results):
+        rows = []
+        for path, metadata in results.items():
+            key = normalize_path(path)
+            row = self.rows.get(key)
+            if row is None:
+                continue
+            self.metadata[key] = metadata
+            self.names[row] = display_name(path, metadata)
+            self.ranks[row] = helper_rank(path, metadata)
+            if self.ranks[row] == HIDDEN:
+                self.checked.discard(self.paths[row])  # Checked before it turned out to be an uninstaller
+            rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), [Qt.DisplayRole, Qt.ToolTipRole, Qt.CheckStateRole, self.RankRole])
+
+    def on_icon_ready(self, path):
+        row = self.rows.get(normalize_path(path))
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+class ScanResultsProxy(QSortFilterProxyModel):
+    # Games first and helpers after them, each alphabetical. Crash handlers, uninstallers and
+    # redistributables are left out unless asked for
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.show_hidden = False
+
+    def set_show_hidden(self, show_hidden):
+        self.show_hidden = show_hidden
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        if not self.show_hidden and model.ranks[source_row] == HIDDEN:
+            return False
+        # The typed filter matches the name shown, which may come from the version info, or the path
+        pattern = self.filterRegExp()
+        return pattern.indexIn(model.names[source_row]) != -1 or pattern.indexIn(model.paths[source_row]) != -1
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        return (model.ranks[left.row()], natural_key(model.names[left.row()])) < (model.ranks[right.row()], natural_key(model.names[right.row()]))
@@ -0,0 +1,36 @@
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+
+class ScanThread(QThread):
+    games_found = pyqtSignal(list)
+    scan_finished = pyqtSignal(list)
+
+    BATCH_INTERVAL = 0.1  # Seconds between batches handed to the UI thread
+
+    def __init__(self, scanner, folder_path, parent=None):
+        super().__init__(parent)
+        self.scanner = scanner
+        self.folder_path = folder_path
+        self.batch = []
+        self.last_emit = 0.0
+
+    def run(self):
+        games = self.scanner.scan(self.folder_path, on_found=self.on_found)
+        self.flush()
+        self.scan_finished.emit(games)
+
+    def on_found(self, games):
+        # Coalesce per-directory results so the dialog isn't flooded with tiny updates
+        self.batch.extend(games)
+        now = time.monotonic()
+        if now - self.last_emit >= self.BATCH_INTERVAL:
+            self.flush()
+            self.last_emit = now
+
+    def flush(self):
+        if self.batch:
+            self.games_found.emit(self.batch)
+            self.batch = []
+
+    def cancel(self):
+        self.scanner.cancel()
@@ -0,0 +1,117 @@
+import os
+import re
+from collections import Counter
+from GameCatalog import GameCatalog
+
+SEPARATORS = re.compile(r"[\s_\-.()\[\]]+")
+
+def search_text(game):
+    # The name plus the exe and the folder it's in, "Witcher" should find bin_x64\witcher3.exe,
+    # and the publisher from the exe's version info
+    folder, filename = os.path.split(game.path.replace("\\", "/"))
+    parts = [game.name, os.path.splitext(filename)[0], os.path.basename(folder), game.get("publisher") or ""]
+    return " ".join(SEPARATORS.sub(" ", part.casefold()).strip() for part in parts)
+
+def grams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+class SearchIndex:
+    GRAM = 3  # Longest n-gram indexed, shorter query words are looked up directly
+    TYPO_RATIO = 0.6  # Share of a word's trigrams a name must have when nothing matches exactly
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.texts = {}  # Id -> indexed text
+        self.postings = {}  # N-gram of length 1 to GRAM -> set of ids
+        self.built = False
+        catalog.subscribe(self.on_catalog_changed)
+
+    def build(self):
+        # Done on the first search rather than at startup, most sessions never search
+        self.texts.clear()
+        self.postings.clear()
+        for game in self.catalog:
+            self.add(game)
+        self.built = True
+
+    def add(self, game):
+        text = search_text(game)
+        self.texts[game.id] = text
+        for size in range(1, self.GRAM + 1):
+            for gram in grams(text, size):
+                self.postings.setdefault(gram, set()).add(game.id)
+
+    def discard(self, game_id):
+        text = self.texts.pop(game_id, None)
+        if text is None:
+            return
+        for size in range(1, self.GRAM + 1):
+            for gram in grams(text, size):
+                ids = self.postings.get(gram)
+                if ids is not None:
+                    ids.discard(game_id)
+                    if not ids:
+                        del self.postings[gram]
+
+    def on_catalog_changed(self, event, records):
+        if not self.built:
+            return
+        if event == GameCatalog.RESET:
+            self.built = False
+        elif event == GameCatalog.ADDED:
+            for game in records:
+                self.add(game)
+        elif event == GameCatalog.REMOVED:
+            for game in records:
+                self.discard(game.id)
+        elif event == GameCatalog.CHANGED:
+            for game in records:
+                if self.texts.get(game.id) != search_text(game):
+                    self.discard(game.id)
+                    self.add(game)
+
+    def search(self, query):
+        # Ids of the games matching every word of the query, None when the query is empty
+        words = SEPARATORS.sub(" ", query.casefold()).split()
+        if not words:
+            return None
+        if not self.built:
+            self.build()
+        # Longest word first through the index, the rest are checked against its few candidates' text
+        words.sort(key=len, reverse=True)
+        matches = self.match_word(words[0])
+        for word in words[1:]:
+            matches = {game_id for game_id in matches if word in self.texts[game_id]}
+        if not matches:
+            matches = self.match_typos(words)
+        return matches
+
+    def match_word(self, word):
+        if len(word) <= self.GRAM:
+            return set(self.postings.get(word, ()))
+        postings = sorted((self.postings.get(gram, set()) for gram in grams(word, self.GRAM)), key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                return candidates
+        # Every trigram being present doesn't mean they're in sequence, check the text itself
+        return {game_id for game_id in candidates if word in self.texts[game_id]}
+
+    def match_typos(self, words):
+        # Nothing matched exactly: accept names sharing most trigrams with each long word, so "witchr" still finds Witcher
+        matches = None
+        for word in words:
+            if len(word) <= self.GRAM:
+                ids = set(self.postings.get(word, ()))
+            else:
+                word_grams = grams(word, self.GRAM)
+                counts = Counter()
+                for gram in word_grams:
+                    counts.update(self.postings.get(gram, ()))
+                needed = max(1, int(len(word_grams) * self.TYPO_RATIO))
+                ids = {game_id for game_id, count in counts.items() if count >= needed}
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return set()
+        return matches
@@ -0,0 +1,39 @@
+import time
+
+PROCESS_START = time.perf_counter()  # Import this module first so the import phase is measured too
+
+class StartupTimer:
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, start=PROCESS_START):
+        self.start = start
+        self.last = start
+        self.phases = []  # (phase, seconds) in the order they finished
+        self.reported = False
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self):
+        # Printed once per run so a slow phase shows up next to the ones that didn't change
+        if self.reported:
+            return
+        self.reported = True
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases)
+        print(f"Startup took {self.total() * 1000:.0f} ms: {phases}")
+        from Diagnostics import Diagnostics
+        Diagnostics.instance().event(
+            "startup", ms=round(self.total() * 1000, 1),
+            phases={phase: round(seconds * 1000, 1) for phase, seconds in self.phases}
+        )
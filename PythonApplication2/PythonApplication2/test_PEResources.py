@@ -0,0 +1,134 @@
+"""Tests for reading icons and version info out of executables.
+
+Run from this folder:
+    python -m unittest test_PEResources
+
+The executables are generated with the builders the benchmarks use too.
+"""
+import os
+import struct
+import tempfile
+import unittest
+from PEFixtures import build_executable, build_pe, dib_icon, png_icon, version_resource
+from PEResources import PNG_SIGNATURE, RT_VERSION, PEFormatError, PEResources
+from IconExtractor import IconExtractor
+
+class ExecutableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+    def write(self, data, name="game.exe"):
+        path = os.path.join(self.folder.name, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+class IconTests(ExecutableTestCase):
+    def test_group_icon_is_wrapped_in_an_ico(self):
+        dib_16, dib_48 = dib_icon(16), dib_icon(48)
+        path = self.write(build_executable([(16, dib_16, 32), (48, dib_48, 32)]))
+        with PEResources(path) as resources:
+            data, image_format = resources.icon_image(32)
+        self.assertEqual(image_format, "ico")
+        # The smallest image covering the size asked for, behind a one entry directory
+        reserved, kind, count, width, height, _, _, planes, bit_count, size, offset = struct.unpack_from("<HHHBBBBHHII", data)
+        self.assertEqual((reserved, kind, count), (0, 1, 1))
+        self.assertEqual((width, height, planes, bit_count), (48, 48, 1, 32))
+        self.assertEqual((size, offset), (len(dib_48), 22))
+        self.assertEqual(bytes(data[22:]), dib_48)
+
+    def test_largest_icon_when_none_covers_the_size(self):
+        path = self.write(build_executable([(16, dib_icon(16), 32), (48, dib_icon(48), 32)]))
+        with PEResources(path) as resources:
+            data, _ = resources.icon_image(256)
+        self.assertEqual(data[6], 48)
+
+    def test_png_icon_is_returned_as_is(self):
+        png = png_icon(256, "#3080c0")
+        path = self.write(build_executable([(32, dib_icon(32), 32), (256, png, 32)]))
+        with PEResources(path) as resources:
+            data, image_format = resources.icon_image(256)
+        self.assertEqual(image_format, "png")
+        self.assertTrue(data.startswith(PNG_SIGNATURE))
+        self.assertEqual(bytes(data), png)
+
+    def test_extractor_decodes_both_formats(self):
+        extractor = IconExtractor()
+        png = self.write(build_executable([(256, png_icon(256, "#3080c0"), 32)]), "png.exe")
+        dib = self.write(build_executable([(48, dib_icon(48), 32)]), "dib.exe")
+        image = extractor.extract_image(png, 256)
+        self.assertEqual((image.width(), image.height()), (256, 256))
+        self.assertEqual(image.pixelColor(128, 128).name(), "#3080c0")
+        image = extractor.extract_image(dib, 48)
+        self.assertEqual((image.width(), image.height()), (48, 48))
+        self.assertNotEqual(image.pixelColor(24, 24).alpha(), 0)
+
+    def test_executable_without_icons(self):
+        path = self.write(build_pe([(RT_VERSION, 1, version_resource({}))]))
+        with PEResources(path) as resources:
+            self.assertIsNone(resources.icon_image())
+
+class MalformedTests(ExecutableTestCase):
+    def assert_rejected(self, data):
+        path = self.write(data)
+        with self.assertRaises(PEFormatError):
+            PEResources(path)
+        # The extractor never raises, it falls back to a blank icon
+        image = IconExtractor().extract_image(path, 32)
+        self.assertEqual((image.width(), image.height()), (32, 32))
+        self.assertEqual(image.pixelColor(16, 16).alpha(), 0)
+
+    def test_empty_file(self):
+        self.assert_rejected(b"")
+
+    def test_garbage(self):
+        self.assert_rejected(os.urandom(64).replace(b"M", b"N"))
+        self.assert_rejected(b"not an executable at all" * 100)
+
+    def test_missing_pe_signature(self):
+        data = bytearray(build_executable([(16, dib_icon(16), 32)]))
+        data[0x40:0x44] = b"NE\0\0"
+        self.assert_rejected(bytes(data))
+
+    def test_truncated_headers(self):
+        self.assert_rejected(build_executable([(16, dib_icon(16), 32)])[:0x100])
+
+    def test_truncated_resource_section(self):
+        self.assert_rejected(build_executable([(16, dib_icon(16), 32)])[:0x210])
+
+    def test_resource_outside_every_section(self):
+        data = bytearray(build_executable([(16, dib_icon(16), 32)]))
+        struct.pack_into("<I", data, 0x58 + 96 + 2 * 8, 0x9000)
+        self.assert_rejected(bytes(data))
+
+class VersionInfoTests(ExecutableTestCase):
+    def test_strings_and_fixed_versions(self):
+        strings = {"ProductName": "Synthetic Game", "CompanyName": "Example Studio", "ProductVersion": "1.0 beta"}
+        path = self.write(build_pe([(RT_VERSION, 1, version_resource(strings))]))
+        with PEResources(path) as resources:
+            info = resources.version_info()
+        self.assertEqual(info, dict(strings, FixedFileVersion="1.2.3.4", FixedProductVersion="5.6.7.8"))
+
+    def test_empty_strings_are_skipped(self):
+        path = self.write(build_pe([(RT_VERSION, 1, version_resource({"ProductName": "  ", "FileDescription": "Game"}))]))
+        with PEResources(path) as resources:
+            info = resources.version_info()
+        self.assertNotIn("ProductName", info)
+        self.assertEqual(info["FileDescription"], "Game")
+
+    def test_no_version_resource(self):
+        path = self.write(build_executable([(16, dib_icon(16), 32)]))
+        with PEResources(path) as resources:
+            self.assertEqual(resources.version_info(), {})
+
+    def test_invalid_version_block(self):
+        resource = bytearray(version_resource({"ProductName": "Synthetic Game"}))
+        struct.pack_into("<H", resource, 0, 2)
+        path = self.write(build_pe([(RT_VERSION, 1, bytes(resource))]))
+        with PEResources(path) as resources:
+            with self.assertRaises(PEFormatError):
+                resources.version_info()
+
+if __name__ == "__main__":
+    unittest.main()